@@ -7,20 +7,14 @@ from urllib.parse import quote_plus, unquote
 from django.contrib.contenttypes.models import ContentType
 from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import Avg, Count, Q
+from django.db.models import Avg, Q
+from django.http import HttpResponse
 from django.utils import timezone
 from ninja import File, Query, Router, UploadedFile
 from ninja.responses import codes_4xx, codes_5xx
 
 from articles.cache import generate_articles_cache_key, invalidate_articles_cache
-from articles.models import (
-    Article,
-    ArticlePDF,
-    Discussion,
-    Reaction,
-    Review,
-    ReviewComment,
-)
+from articles.models import Article, ArticleMeta, ArticlePDF, RelatedArticle, Review
 from articles.schemas import (
     ArticleBasicOut,
     ArticleCreateSchema,
@@ -37,14 +31,27 @@ from articles.schemas import (
     PaginatedArticlesResponse,
     ReviewExcerpt,
 )
+from articles.seo import ARTICLE_META_CACHE_CONTROL, article_meta_surrogate_keys
+from articles.stats import (
+    get_article_daily_stats,
+    get_article_stats,
+    get_article_stats_map,
+)
+from articles.visibility import refresh_article_visibility
 from communities.models import Community, CommunityArticle
+from communities.roles import is_community_member
+from communities.stats import record_community_article_submitted
 from myapp.cache import get_cache, set_cache
+from myapp.conditional import conditional_response, updated_at_conditional_response
 from myapp.constants import FIFTEEN_MINUTES
+from myapp.feature_flags import MAX_STATS_WINDOW_DAYS
+from myapp.loaders import SchemaLoaders
 from myapp.schemas import FilterType
 from myapp.utils import validate_tags
 from users.auth import JWTAuth, OptionalJWTAuth
 from users.common_api import get_content_type_for_model
-from users.models import Bookmark, Hashtag, HashtagRelation, Notification, User
+from users.models import Bookmark, Hashtag, HashtagRelation, User
+from users.notification_fanout import notify_recipients
 
 router = Router(tags=["Articles"])
 
@@ -141,6 +148,8 @@ def create_article(
                         community=community,
                         status=community_article_status,
                     )
+                    record_community_article_submitted(community_article)
+                    refresh_article_visibility([article.id])
 
                     # Auto-subscribe admins and the submitter when article is immediately published
                     # Only for private/hidden communities as enforced in the model method
@@ -157,19 +166,26 @@ def create_article(
                             f"Auto-subscription creation failed for article {article.id} in community {community.id}: {e}"
                         )
 
-                    # Send notification to the community admin
+                    # Notify the community admins
                     try:
-                        Notification.objects.create(
-                            user=community.admins.first(),
-                            community=community,
-                            category="communities",
-                            notification_type="article_submitted",
-                            message=(
-                                f"New article submitted in {community.name}"
-                                f" by {request.auth.username}"
-                            ),
-                            link=f"/community/{community.name}/submissions",
-                            content=article.title,
+                        notify_recipients(
+                            {
+                                "community_id": community.id,
+                                "article_id": article.id,
+                                "category": "communities",
+                                "notification_type": "article_submitted",
+                                "message": (
+                                    f"New article submitted in {community.name}"
+                                    f" by {request.auth.username}"
+                                ),
+                                "link": f"/community/{community.name}/submissions",
+                                "content": article.title,
+                            },
+                            {
+                                "community_id": community.id,
+                                "roles": ["admins"],
+                                "exclude_user_ids": [request.auth.id],
+                            },
                         )
                     except Exception:
                         # Continue even if notification creation fails
@@ -236,6 +252,7 @@ def create_article(
 )
 def get_article(
     request,
+    response: HttpResponse,
     article_slug: str,
     community_name: Optional[str] = None,
     community_id: Optional[int] = None,
@@ -322,30 +339,28 @@ def get_article(
         if community_article and community_article.status == "rejected":
             return 403, {"message": "This article is not available in this community."}
 
+        not_modified = conditional_response(
+            request,
+            response,
+            f"article:{article.id}",
+            f"community:{community.id}" if community else "",
+        )
+        if not_modified:
+            return not_modified
+
         # Use the custom method to create the ArticleOut instance
         try:
             # article_data = ArticleOut.from_orm_with_custom_fields(
             #     article, community, request.auth
             # )
             # return 200, article_data
-            # Ratings (for this community or globally)
-            if community:
-                reviews_qs = Review.objects.filter(article=article, community=community)
-            else:
-                reviews_qs = Review.objects.filter(
-                    article=article, community__isnull=True
-                )
-
-            total_reviews = reviews_qs.count()
-            total_ratings = round(
-                reviews_qs.aggregate(avg_rating=Avg("rating"))["avg_rating"] or 0, 1
-            )
-
-            # Discussions and comments counts (example; adjust models if needed)
-            total_discussions = Discussion.objects.filter(article=article).count()
-            total_comments = ReviewComment.objects.filter(
-                review__article=article
-            ).count()
+            # Ratings are scoped to this community (or to reviews made outside
+            # communities), discussions and comments are counted across scopes
+            stats = get_article_stats(article.id, community.id if community else None)
+            total_reviews = stats["review_count"]
+            total_ratings = stats["average_rating"]
+            total_discussions = stats["total_discussion_count"]
+            total_comments = stats["total_comment_count"]
 
             # PDFs — assumed external, mocked as empty list for now
             # article_pdf_urls = []  # You can load this from storage/S3 if needed
@@ -385,47 +400,43 @@ def get_article(
 
 @router.get(
     "/article-meta/{article_slug}",
-    response={200: ArticleMetaOut, codes_4xx: Message},
+    response={200: ArticleMetaOut, codes_4xx: Message, codes_5xx: Message},
     auth=OptionalJWTAuth,
 )
-def get_article_meta(request, article_slug: str):
+def get_article_meta(request, response: HttpResponse, article_slug: str):
     """Return basic public metadata for an article.
 
     This endpoint is intended for SEO and crawlers. It only exposes
     articles that are publicly visible. Private articles or articles
     that belong exclusively to hidden/private communities are filtered
     out to avoid unintentionally leaking private content.
+
+    The metadata is read from the precomputed ArticleMeta record, which only
+    exists for exposable articles, and is served with shared-cache headers
+    and a surrogate key so a CDN can absorb bot traffic.
     """
     try:
         try:
-            # Only fetch articles that are Public submissions
-            article = Article.objects.get(slug=article_slug, submission_type="Public")
-        except Article.DoesNotExist:
-            return 404, {"message": "Article not found."}
-        except Exception as e:
-            logger.error(f"Error retrieving article: {e}")
-            return 500, {"message": "Error retrieving article. Please try again."}
-
-        # Ensure the article is not tied to a hidden/private community and
-        # that it is published/accepted within the community context.
-        try:
-            community_article = (
-                CommunityArticle.objects.select_related("community")
-                .filter(article=article)
-                .first()
-            )
-            if community_article:
-                if community_article.community.type in ["hidden", "private"]:
-                    return 404, {"message": "Article not found."}
-                if community_article.status not in ["published", "accepted"]:
-                    return 404, {"message": "Article not found."}
+            meta = ArticleMeta.objects.filter(slug=article_slug).first()
         except Exception as e:
-            logger.error(f"Error validating community article: {e}")
+            logger.error(f"Error retrieving article metadata: {e}")
             return 500, {
-                "message": "Error validating community article. Please try again."
+                "message": "Error retrieving article metadata. Please try again."
             }
+        if not meta:
+            return 404, {"message": "Article not found."}
 
-        return 200, ArticleMetaOut.from_orm(article)
+        response.headers["Surrogate-Key"] = article_meta_surrogate_keys(meta.article_id)
+        not_modified = updated_at_conditional_response(
+            request,
+            response,
+            meta.updated_at,
+            cache_control=ARTICLE_META_CACHE_CONTROL,
+        )
+        if not_modified:
+            return not_modified
+
+        return 200, ArticleMetaOut.from_orm(meta)
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
         return 500, {"message": "An unexpected error occurred. Please try again later."}
@@ -511,19 +522,12 @@ def update_article(
                         pdf.external_url if pdf.external_url else pdf.pdf_file_url.url
                     )
 
-                # Get counts for output (you may skip these counts if unnecessary for update)
-                total_reviews = Review.objects.filter(article=article).count()
-                total_ratings = round(
-                    Review.objects.filter(article=article).aggregate(
-                        avg_rating=Avg("rating")
-                    )["avg_rating"]
-                    or 0,
-                    1,
-                )
-                total_discussions = Discussion.objects.filter(article=article).count()
-                total_comments = ReviewComment.objects.filter(
-                    review__article=article
-                ).count()
+                # Get counts for output from the denormalized stats table
+                stats = get_article_stats(article.id)
+                total_reviews = stats["total_review_count"]
+                total_ratings = stats["total_average_rating"]
+                total_discussions = stats["total_discussion_count"]
+                total_comments = stats["total_comment_count"]
 
                 # Final output
                 response_data = ArticleOut.from_orm_with_custom_fields(
@@ -611,8 +615,8 @@ def get_articles(
 
                 # If the community is hidden and the user is not a member,
                 # return an empty queryset
-                if community.type == "hidden" and (
-                    not current_user or not community.is_member(current_user)
+                if community.type == "hidden" and not is_community_member(
+                    current_user, community.id
                 ):
                     return 403, {"message": "You don't have access to this community."}
 
@@ -638,9 +642,7 @@ def get_articles(
         else:
             # Just do not display articles that belong to hidden communities
             try:
-                articles = articles.exclude(
-                    communityarticle__community__type="hidden",
-                )
+                articles = articles.filter(is_hidden=False)
             except Exception as e:
                 logger.error(f"Error filtering articles: {e}")
                 return 500, {"message": "Error filtering articles. Please try again."}
@@ -798,8 +800,13 @@ Article Stats Endpoints
     },
     auth=JWTAuth(),
 )
-def get_article_official_stats(request, article_slug: str):
+def get_article_official_stats(request, article_slug: str, days: int = 7):
     try:
+        if not 1 <= days <= MAX_STATS_WINDOW_DAYS:
+            return 400, {
+                "message": f"days must be between 1 and {MAX_STATS_WINDOW_DAYS}."
+            }
+
         try:
             article = Article.objects.get(slug=article_slug)
         except Article.DoesNotExist:
@@ -809,76 +816,34 @@ def get_article_official_stats(request, article_slug: str):
             return 500, {"message": "Error retrieving article. Please try again."}
 
         try:
-            # Get discussions count
-            discussions_count = Discussion.objects.filter(article=article).count()
-
-            # Get likes count
-            likes_count = Reaction.objects.filter(
-                content_type__model="article", object_id=article.id, vote=Reaction.LIKE
-            ).count()
-
-            # Get reviews count
-            reviews_count = Review.objects.filter(article=article).count()
+            # Discussions, likes, reviews and rating come from the stats table
+            stats = get_article_stats(article.id)
+            discussions_count = stats["total_discussion_count"]
+            likes_count = stats["like_count"]
+            reviews_count = stats["total_review_count"]
 
             # Get recent reviews
             recent_reviews = Review.objects.filter(article=article).order_by(
                 "-created_at"
             )[:3]
 
-            # Get reviews and likes over time (last 7 days)
-            end_date = timezone.now().date()
-            start_date = end_date - timedelta(days=6)
-            date_range = [start_date + timedelta(days=i) for i in range(7)]
+            # Reviews and likes over time (last `days` days) from the daily rollups
+            end_date = timezone.localdate()
+            start_date = end_date - timedelta(days=days - 1)
+            daily_stats = get_article_daily_stats(article.id, start_date, end_date)
 
-            # Reviews over time
-            reviews_over_time = (
-                Review.objects.filter(
-                    article=article, created_at__date__range=[start_date, end_date]
-                )
-                .values("created_at__date")
-                .annotate(count=Count("id"))
+            reviews_over_time = DateCount.cumulative(
+                start_date,
+                end_date,
+                {day: row["total_review_count"] for day, row in daily_stats.items()},
             )
-
-            reviews_dict = {
-                item["created_at__date"]: item["count"] for item in reviews_over_time
-            }
-
-            reviews_over_time = [
-                DateCount(
-                    date=date,
-                    count=sum(reviews_dict.get(d, 0) for d in date_range if d <= date),
-                )
-                for date in date_range
-            ]
-
-            # Likes over time
-            likes_over_time = (
-                Reaction.objects.filter(
-                    content_type__model="article",
-                    object_id=article.id,
-                    vote=Reaction.LIKE,
-                    created_at__date__range=[start_date, end_date],
-                )
-                .values("created_at__date")
-                .annotate(count=Count("id"))
+            likes_over_time = DateCount.cumulative(
+                start_date,
+                end_date,
+                {day: row["like_count"] for day, row in daily_stats.items()},
             )
 
-            likes_dict = {
-                item["created_at__date"]: item["count"] for item in likes_over_time
-            }
-
-            likes_over_time = [
-                DateCount(
-                    date=date,
-                    count=sum(likes_dict.get(d, 0) for d in date_range if d <= date),
-                )
-                for date in date_range
-            ]
-
-            # Get average rating
-            average_rating = Review.objects.filter(article=article).aggregate(
-                Avg("rating")
-            )["rating__avg"]
+            average_rating = stats["total_average_rating"]
 
             response_data = OfficialArticleStatsResponse(
                 title=article.title,
@@ -918,8 +883,13 @@ def get_article_official_stats(request, article_slug: str):
     },
     auth=JWTAuth(),
 )
-def get_community_article_stats(request, article_slug: str):
+def get_community_article_stats(request, article_slug: str, days: int = 7):
     try:
+        if not 1 <= days <= MAX_STATS_WINDOW_DAYS:
+            return 400, {
+                "message": f"days must be between 1 and {MAX_STATS_WINDOW_DAYS}."
+            }
+
         try:
             article = Article.objects.get(slug=article_slug)
         except Article.DoesNotExist:
@@ -948,76 +918,40 @@ def get_community_article_stats(request, article_slug: str):
             }
 
         try:
-            # Get discussions count
-            discussions_count = Discussion.objects.filter(
-                article=article, community=community
-            ).count()
+            # Discussions, likes, reviews and rating come from the stats table
+            stats = get_article_stats(article.id, community.id if community else None)
+            discussions_count = stats["discussion_count"]
+            likes_count = stats["like_count"]
+            reviews_count = stats["review_count"]
 
-            # Get likes count
-            likes_count = Reaction.objects.filter(
-                content_type__model="article", object_id=article.id, vote=Reaction.LIKE
-            ).count()
-
-            # Get reviews count and data
             reviews = Review.objects.filter(article=article, community=community)
-            reviews_count = reviews.count()
 
             # Get recent reviews
             recent_reviews = reviews.order_by("-created_at")[:3]
 
-            # Get reviews and likes over time (last 7 days)
-            end_date = timezone.now().date()
-            start_date = end_date - timedelta(days=6)
-            date_range = [start_date + timedelta(days=i) for i in range(7)]
-
-            # Reviews over time
-            reviews_over_time = (
-                reviews.filter(created_at__date__range=[start_date, end_date])
-                .values("created_at__date")
-                .annotate(count=Count("id"))
+            # Reviews and likes over time (last `days` days) from the daily rollups
+            end_date = timezone.localdate()
+            start_date = end_date - timedelta(days=days - 1)
+            daily_stats = get_article_daily_stats(
+                article.id,
+                start_date,
+                end_date,
+                community_id=community.id if community else None,
             )
 
-            reviews_dict = {
-                item["created_at__date"]: item["count"] for item in reviews_over_time
-            }
-
-            reviews_over_time = [
-                DateCount(
-                    date=date,
-                    count=sum(reviews_dict.get(d, 0) for d in date_range if d <= date),
-                )
-                for date in date_range
-            ]
-
-            # Likes over time
-            likes_over_time = (
-                Reaction.objects.filter(
-                    content_type__model="article",
-                    object_id=article.id,
-                    vote=Reaction.LIKE,
-                    created_at__date__range=[start_date, end_date],
-                )
-                .values("created_at__date")
-                .annotate(count=Count("id"))
+            reviews_over_time = DateCount.cumulative(
+                start_date,
+                end_date,
+                {day: row["review_count"] for day, row in daily_stats.items()},
             )
-
-            likes_dict = {
-                item["created_at__date"]: item["count"] for item in likes_over_time
-            }
-
-            likes_over_time = [
-                DateCount(
-                    date=date,
-                    count=sum(likes_dict.get(d, 0) for d in date_range if d <= date),
-                )
-                for date in date_range
-            ]
-
-            # Get average rating
-            average_rating = round(
-                reviews.aggregate(Avg("rating"))["rating__avg"] or 0, 1
+            likes_over_time = DateCount.cumulative(
+                start_date,
+                end_date,
+                {day: row["like_count"] for day, row in daily_stats.items()},
             )
 
+            average_rating = stats["average_rating"]
+
             response_data = CommunityArticleStatsResponse(
                 title=article.title,
                 submission_date=submission_date.date(),
@@ -1071,50 +1005,56 @@ def get_relevant_articles(
             return 500, {"message": "Error retrieving article. Please try again."}
 
         try:
-            # Get hashtags of the base article
-            base_hashtags = base_article.hashtags.values_list("hashtag_id", flat=True)
-
-            # Query for relevant articles
-            queryset = Article.objects.exclude(id=article_id).exclude(
-                communityarticle__community__type="hidden"
+            # Related articles are precomputed by rebuild_related_articles, so
+            # this is a lookup of at most RELATED_ARTICLES_TOP_K rows
+            queryset = (
+                RelatedArticle.objects.filter(article=base_article)
+                .filter(related_article__is_hidden=False)
+                .select_related("related_article__submitter")
+                .order_by("-score")
             )
 
-            # Calculate relevance score based on shared hashtagsY
-            queryset = queryset.annotate(
-                relevance_score=Count(
-                    "hashtags", filter=Q(hashtags__hashtag_id__in=base_hashtags)
+            if filters.community_id:
+                queryset = queryset.filter(
+                    related_article__communityarticle__community_id=filters.community_id
                 )
-            ).filter(relevance_score__gt=0)
 
-            if filters.community_id:
-                try:
-                    queryset = queryset.filter(
-                        communityarticle__community_id=filters.community_id,
-                        communityarticle__community__type__ne="hidden",
-                    )
-                except Exception as e:
-                    logger.error(f"Error filtering by community: {e}")
-                    return 500, {
-                        "message": "Error filtering by community. Please try again."
-                    }
+            related = list(queryset)
+            stats_map = get_article_stats_map(
+                entry.related_article_id for entry in related
+            )
 
             if filters.filter_type == FilterType.POPULAR:
-                queryset = queryset.annotate(
-                    popularity_score=Count("reviews") + Count("discussions")
-                ).order_by("-popularity_score", "-relevance_score")
+                related.sort(
+                    key=lambda entry: (
+                        stats_map[entry.related_article_id]["review_count"]
+                        + stats_map[entry.related_article_id]["discussion_count"],
+                        entry.score,
+                    ),
+                    reverse=True,
+                )
             elif filters.filter_type == FilterType.RECENT:
-                queryset = queryset.order_by("-created_at", "-relevance_score")
-            else:  # "relevant" is the default
-                queryset = queryset.order_by("-relevance_score", "-created_at")
+                related.sort(
+                    key=lambda entry: (entry.related_article.created_at, entry.score),
+                    reverse=True,
+                )
 
-            try:
-                articles = queryset[filters.offset : filters.offset + filters.limit]
-            except Exception:
+            if filters.offset < 0 or filters.limit < 0:
                 return 400, {"message": "Invalid pagination parameters."}
+            articles = [
+                entry.related_article
+                for entry in related[filters.offset : filters.offset + filters.limit]
+            ]
 
             try:
+                loaders = SchemaLoaders.for_request(request)
+                for article in articles:
+                    loaders.article_stats.prime(article.id, stats_map[article.id])
+                ArticleBasicOut.queue_lookups(articles, loaders)
                 result = [
-                    ArticleBasicOut.from_orm_with_custom_fields(article, request.auth)
+                    ArticleBasicOut.from_orm_with_custom_fields(
+                        article, request.auth, loaders=loaders
+                    )
                     for article in articles
                 ]
                 return 200, result
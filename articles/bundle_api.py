@@ -0,0 +1,209 @@
+import logging
+from typing import Optional
+from urllib.parse import unquote
+
+from ninja import Router
+from ninja.responses import codes_4xx, codes_5xx
+
+from articles.discussion_api import article_discussions, serialize_discussions
+from articles.models import Article, ArticlePDF, Reaction
+from articles.reaction_counts import get_reaction_counts
+from articles.review_api import article_reviews, serialize_reviews
+from articles.schemas import (
+    ArticleBundleOut,
+    ArticleBundleSection,
+    ArticleBundleStats,
+    ArticleOut,
+    Message,
+    PaginatedDiscussionSchema,
+    PaginatedReviewSchema,
+)
+from articles.stats import get_article_stats
+from communities.models import Community, CommunityArticle
+from myapp.loaders import SchemaLoaders
+from users.auth import JWTAuth
+from users.common_api import get_content_type_for_model
+from users.models import Bookmark
+from users.schemas import ReactionCountOut, VoteEnum
+
+router = Router(tags=["Articles"])
+
+# Module-level logger
+logger = logging.getLogger(__name__)
+
+MAX_BUNDLE_PAGE_SIZE = 50
+
+
+@router.get(
+    "/article/{article_slug}/bundle",
+    response={200: ArticleBundleOut, codes_4xx: Message, codes_5xx: Message},
+    auth=JWTAuth(),
+)
+def get_article_bundle(
+    request,
+    article_slug: str,
+    community_name: Optional[str] = None,
+    community_id: Optional[int] = None,
+    include: Optional[str] = None,
+    size: int = 10,
+):
+    """
+    Everything the article page needs in one request: the article, the first
+    page of reviews and discussions, the counters and the viewer's reaction.
+
+    The article, community and access are resolved once for all sections.
+    ``include`` is a comma separated list of sections (article, reviews,
+    discussions, stats, reactions) and defaults to all of them.
+    """
+    try:
+        try:
+            if include:
+                sections = {
+                    ArticleBundleSection(section.strip())
+                    for section in include.split(",")
+                    if section.strip()
+                }
+            else:
+                sections = set(ArticleBundleSection)
+        except ValueError:
+            valid = ", ".join(section.value for section in ArticleBundleSection)
+            return 400, {"message": f"Invalid include. Valid sections: {valid}."}
+
+        if not 1 <= size <= MAX_BUNDLE_PAGE_SIZE:
+            return 400, {
+                "message": f"size must be between 1 and {MAX_BUNDLE_PAGE_SIZE}."
+            }
+
+        try:
+            article = Article.objects.select_related("submitter").get(slug=article_slug)
+        except Article.DoesNotExist:
+            return 404, {"message": "Article not found."}
+        except Exception as e:
+            logger.error(f"Error retrieving article: {e}")
+            return 500, {"message": "Error retrieving article. Please try again."}
+
+        user = request.auth
+        community = None
+        community_article = None
+
+        # Prefer community_id over community_name, but don't consider both at same time
+        if community_id or community_name:
+            try:
+                community_filter = (
+                    {"community_id": community_id}
+                    if community_id
+                    else {"community__name": unquote(community_name)}
+                )
+                community_article = CommunityArticle.objects.select_related(
+                    "community", "article"
+                ).get(article=article, **community_filter)
+                community = community_article.community
+            except CommunityArticle.DoesNotExist:
+                return 404, {"message": "Article not found in this community."}
+            except Exception as e:
+                logger.error(f"Error processing community information: {e}")
+                return 500, {
+                    "message": "Error processing community information. Please try again."
+                }
+
+            if (
+                community.type in [Community.HIDDEN, Community.PRIVATE]
+                and not community.members.filter(id=user.id).exists()
+            ):
+                return 403, {
+                    "message": (
+                        "You don't have access to this article in this community."
+                        " Please request access from the community admin."
+                    )
+                }
+            if community_article.status == CommunityArticle.REJECTED:
+                return 403, {
+                    "message": "This article is not available in this community."
+                }
+        elif article.submission_type == "Private" and article.submitter != user:
+            return 403, {"message": "You don't have access to this article."}
+
+        bundle = ArticleBundleOut()
+        loaders = SchemaLoaders.for_request(request)
+
+        try:
+            # One query covers the counters of every section
+            stats = get_article_stats(article.id, community.id if community else None)
+
+            if ArticleBundleSection.STATS in sections:
+                bundle.stats = ArticleBundleStats(
+                    reviews_count=stats["review_count"],
+                    average_rating=stats["average_rating"],
+                    discussions_count=stats["discussion_count"],
+                    comments_count=stats["total_comment_count"],
+                    likes=stats["like_count"],
+                )
+
+            if ArticleBundleSection.ARTICLE in sections:
+                article_ct = get_content_type_for_model(Article)
+                bundle.article = ArticleOut.from_orm_with_custom_fields(
+                    article=article,
+                    pdf_urls=[
+                        pdf.get_url()
+                        for pdf in ArticlePDF.objects.filter(article=article)
+                    ],
+                    total_reviews=stats["review_count"],
+                    total_ratings=stats["average_rating"],
+                    total_discussions=stats["total_discussion_count"],
+                    total_comments=stats["total_comment_count"],
+                    community_article=community_article,
+                    current_user=user,
+                    is_bookmarked=Bookmark.objects.filter(
+                        user=user, content_type=article_ct, object_id=article.id
+                    ).exists(),
+                )
+
+            # Totals come from the scoped counters, so the first pages only
+            # need the slice query
+            if ArticleBundleSection.REVIEWS in sections:
+                reviews = list(
+                    article_reviews(article).filter(community=community)[:size]
+                )
+                bundle.reviews = PaginatedReviewSchema(
+                    items=serialize_reviews(article, reviews, user, loaders),
+                    total=stats["review_count"],
+                    page=1,
+                    size=size,
+                )
+
+            if ArticleBundleSection.DISCUSSIONS in sections:
+                discussions = list(article_discussions(article, community)[:size])
+                bundle.discussions = PaginatedDiscussionSchema(
+                    items=serialize_discussions(
+                        article, community, discussions, user, loaders
+                    ),
+                    total=stats["discussion_count"],
+                    page=1,
+                    per_page=size,
+                )
+
+            if ArticleBundleSection.REACTIONS in sections:
+                article_ct = get_content_type_for_model(Article)
+                counts = get_reaction_counts(article_ct.id, [article.id])[article.id]
+                user_vote = (
+                    Reaction.objects.filter(
+                        content_type=article_ct, object_id=article.id, user=user
+                    )
+                    .values_list("vote", flat=True)
+                    .first()
+                )
+                bundle.reactions = ReactionCountOut(
+                    likes=counts["like_count"],
+                    dislikes=counts["dislike_count"],
+                    user_reaction=(
+                        VoteEnum(user_vote) if user_vote is not None else None
+                    ),
+                )
+
+            return 200, bundle
+        except Exception as e:
+            logger.error(f"Error preparing article bundle: {e}")
+            return 500, {"message": "Error preparing article bundle. Please try again."}
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        return 500, {"message": "An unexpected error occurred. Please try again later."}
@@ -4,11 +4,11 @@ from typing import List, Optional
 from django.core.paginator import Paginator
 from django.db import transaction
 from django.db.models import Count
+from django.http import HttpResponse
 from ninja import Router
 from ninja.responses import codes_4xx, codes_5xx
 
 from articles.models import (
-    AnonymousIdentity,
     Article,
     Discussion,
     DiscussionComment,
@@ -34,12 +34,16 @@ from articles.schemas import (
     SubscriptionStatusSchema,
     UserSubscriptionsOut,
 )
+from articles.stats import record_discussion_created
 from communities.models import Community, CommunityArticle
+from myapp.conditional import conditional_response
+from myapp.content_types import content_type_id
+from myapp.loaders import SchemaLoaders
 from myapp.realtime import RealtimeEventPublisher
-from myapp.schemas import Message, UserStats
+from myapp.schemas import Message
 from myapp.upload_api import process_content_images_async
 from users.auth import JWTAuth, OptionalJWTAuth
-from users.models import Reputation, User
+from users.models import User
 
 router = Router(tags=["Discussions"])
 logger = logging.getLogger(__name__)
@@ -111,6 +115,7 @@ def create_discussion(
                     content=discussion_data.content,
                     is_pseudonymous=is_pseudonymous,
                 )
+                record_discussion_created(discussion)
             except Exception as e:
                 logger.error(f"Error creating discussion: {e}")
                 return 500, {"message": "Error creating discussion. Please try again."}
@@ -143,7 +148,9 @@ def create_discussion(
                 logger.error(f"Failed to queue image reference processing: {e}")
 
         try:
-            return 201, DiscussionOut.from_orm(discussion, user)
+            return 201, DiscussionOut.from_orm(
+                discussion, user, loaders=SchemaLoaders.for_request(request)
+            )
         except Exception as e:
             logger.error(f"Error formatting discussion data: {e}")
             return 500, {
@@ -154,13 +161,99 @@ def create_discussion(
         return 500, {"message": "An unexpected error occurred. Please try again later."}
 
 
+def article_discussions(article: Article, community: Optional[Community]):
+    """Discussions of an article in a scope, newest first, with comment counts."""
+    return (
+        Discussion.objects.filter(article=article, community=community)
+        .select_related("author", "article", "community")
+        # Use the correct related_name "discussion_comments" configured on
+        # the DiscussionComment model.
+        .annotate(comments_count=Count("discussion_comments"))
+        .order_by("-created_at")
+    )
+
+
+def serialize_discussions(
+    article: Article,
+    community: Optional[Community],
+    discussions_list: List[Discussion],
+    current_user: Optional[User],
+    loaders: Optional[SchemaLoaders] = None,
+) -> List[DiscussionOut]:
+    """
+    Build DiscussionOut items for a page of discussions, batching the
+    per-row lookups and fetching the viewer's flags in bulk.
+    """
+    loaders = loaders or SchemaLoaders()
+    DiscussionOut.queue_lookups(discussions_list, loaders)
+
+    # Prefetch all flags for discussions in one query (avoids N+1)
+    # Returns dict: {discussion_id: ["unread", "pinned"], ...}
+    flags_by_discussion_id = {}
+    discussions_with_unread_comments = set()
+    if current_user:
+        discussion_ids = [d.id for d in discussions_list]
+        flags_by_discussion_id = UserFlag.objects.get_flags_for_entities(
+            user_id=current_user.id,
+            entity_type="discussion",
+            entity_ids=discussion_ids,
+        )
+
+        # Check for unread comments within these discussions
+        # Get all comment IDs for these discussions
+        comment_ids_by_discussion = {}
+        comments = DiscussionComment.objects.filter(
+            discussion_id__in=discussion_ids
+        ).values_list("id", "discussion_id")
+        all_comment_ids = []
+        for comment_id, disc_id in comments:
+            all_comment_ids.append(comment_id)
+            if disc_id not in comment_ids_by_discussion:
+                comment_ids_by_discussion[disc_id] = []
+            comment_ids_by_discussion[disc_id].append(comment_id)
+
+        # Get unread comment IDs in one query
+        if all_comment_ids:
+            unread_comment_ids = UserFlag.objects.get_flagged_entity_ids(
+                user_id=current_user.id,
+                flag_type="unread",
+                entity_type="comment",
+                entity_ids=all_comment_ids,
+            )
+
+            # Map unread comments back to their discussions
+            for disc_id, comment_ids in comment_ids_by_discussion.items():
+                if any(cid in unread_comment_ids for cid in comment_ids):
+                    discussions_with_unread_comments.add(disc_id)
+
+    items = []
+    for discussion in discussions_list:
+        # Get flags for this discussion (empty list if none)
+        flags = list(flags_by_discussion_id.get(discussion.id, []))
+
+        # Add "unread_comment" flag if discussion has unread comments/replies
+        if discussion.id in discussions_with_unread_comments:
+            flags.append("unread_comment")
+
+        items.append(
+            DiscussionOut.from_orm(discussion, current_user, flags, loaders=loaders)
+        )
+
+    return items
+
+
 @router.get(
     "/{article_id}/discussions/",
     response={200: PaginatedDiscussionSchema, codes_4xx: Message, codes_5xx: Message},
     auth=OptionalJWTAuth,
 )
 def list_discussions(
-    request, article_id: int, community_id: int = None, page: int = 1, size: int = 10
+    request,
+    response: HttpResponse,
+    article_id: int,
+    community_id: int = None,
+    page: int = 1,
+    size: int = 10,
 ):
     try:
         try:
@@ -181,15 +274,17 @@ def list_discussions(
             if not community.is_member(request.auth) and community.type == "hidden":
                 return 403, {"message": "You are not a member of this community."}
 
-        # Filter discussions and annotate with comments count
-        discussions = (
-            Discussion.objects.filter(article=article, community=community)
-            .select_related("author", "article", "community")
-            # Use the correct related_name "discussion_comments" configured on
-            # the DiscussionComment model.
-            .annotate(comments_count=Count("discussion_comments"))
-            .order_by("-created_at")
+        not_modified = conditional_response(
+            request,
+            response,
+            f"article:{article.id}",
+            f"community:{community.id}" if community else "",
         )
+        if not_modified:
+            return not_modified
+
+        # Filter discussions and annotate with comments count
+        discussions = article_discussions(article, community)
 
         try:
             paginator = Paginator(discussions, size)
@@ -202,119 +297,9 @@ def list_discussions(
         current_user: Optional[User] = None if not request.auth else request.auth
 
         try:
-            discussions_list = list(page_obj.object_list)
-
-            # Prefetch reputations in one query
-            author_ids = set(d.author_id for d in discussions_list)
-            reputations = {
-                rep.user_id: rep
-                for rep in Reputation.objects.filter(user_id__in=author_ids)
-            }
-
-            # Prefetch pseudonyms in one query (for only pseudonymous discussions)
-            pseudonym_map = {}
-            pseudonym_needed = [d for d in discussions_list if d.is_pseudonymous]
-            if pseudonym_needed:
-                pseudonyms = AnonymousIdentity.objects.filter(
-                    article=article,
-                    user_id__in=[d.author_id for d in pseudonym_needed],
-                    community=community,
-                )
-                for p in pseudonyms:
-                    pseudonym_map[(p.user_id, p.article_id, p.community_id)] = p
-
-            current_user = request.auth if request.auth else None
-
-            # Prefetch all flags for discussions in one query (avoids N+1)
-            # Returns dict: {discussion_id: ["unread", "pinned"], ...}
-            flags_by_discussion_id = {}
-            discussions_with_unread_comments = set()
-            if current_user:
-                discussion_ids = [d.id for d in discussions_list]
-                flags_by_discussion_id = UserFlag.objects.get_flags_for_entities(
-                    user_id=current_user.id,
-                    entity_type="discussion",
-                    entity_ids=discussion_ids,
-                )
-
-                # Check for unread comments within these discussions
-                # Get all comment IDs for these discussions
-                comment_ids_by_discussion = {}
-                comments = DiscussionComment.objects.filter(
-                    discussion_id__in=discussion_ids
-                ).values_list("id", "discussion_id")
-                all_comment_ids = []
-                for comment_id, disc_id in comments:
-                    all_comment_ids.append(comment_id)
-                    if disc_id not in comment_ids_by_discussion:
-                        comment_ids_by_discussion[disc_id] = []
-                    comment_ids_by_discussion[disc_id].append(comment_id)
-
-                # Get unread comment IDs in one query
-                if all_comment_ids:
-                    unread_comment_ids = UserFlag.objects.get_flagged_entity_ids(
-                        user_id=current_user.id,
-                        flag_type="unread",
-                        entity_type="comment",
-                        entity_ids=all_comment_ids,
-                    )
-
-                    # Map unread comments back to their discussions
-                    for disc_id, comment_ids in comment_ids_by_discussion.items():
-                        if any(cid in unread_comment_ids for cid in comment_ids):
-                            discussions_with_unread_comments.add(disc_id)
-
-            items = []
-            for discussion in discussions_list:
-                reputation = reputations.get(discussion.author_id)
-                # Use basic user details and attach prefetched reputation to avoid
-                # additional DB queries (UserStats.from_model doesn’t accept a
-                # "reputation" kwarg).
-                user = UserStats.from_model(
-                    discussion.author,
-                    basic_details=True,
-                )
-
-                if reputation:
-                    user.reputation_score = reputation.score
-                    user.reputation_level = reputation.level
-
-                if discussion.is_pseudonymous:
-                    key = (
-                        discussion.author_id,
-                        discussion.article_id,
-                        community.id if community else None,
-                    )
-                    pseudonym = pseudonym_map.get(key)
-                    if pseudonym:
-                        user.username = pseudonym.fake_name
-                        user.profile_pic_url = pseudonym.identicon
-
-                # Get flags for this discussion (empty list if none)
-                flags = list(flags_by_discussion_id.get(discussion.id, []))
-
-                # Add "unread_comment" flag if discussion has unread comments/replies
-                if discussion.id in discussions_with_unread_comments:
-                    flags.append("unread_comment")
-
-                items.append(
-                    DiscussionOut(
-                        id=discussion.id,
-                        topic=discussion.topic,
-                        content=discussion.content,
-                        created_at=discussion.created_at,
-                        updated_at=discussion.updated_at,
-                        deleted_at=discussion.deleted_at,
-                        user=user,
-                        is_author=(discussion.author == current_user),
-                        article_id=article.id,
-                        comments_count=discussion.comments_count,
-                        is_pseudonymous=discussion.is_pseudonymous,
-                        is_resolved=discussion.is_resolved,
-                        flags=flags,
-                    )
-                )
-
+            items = serialize_discussions(
+                article, community, list(page_obj.object_list), current_user
+            )
             return 200, PaginatedDiscussionSchema(
                 items=items,
                 total=paginator.count,
@@ -652,7 +637,12 @@ def get_discussion(request, discussion_id: int):
                 )
                 flags = flags_dict.get(discussion.id, [])
 
-            response_data = DiscussionOut.from_orm(discussion, user, flags=flags)
+            response_data = DiscussionOut.from_orm(
+                discussion,
+                user,
+                flags=flags,
+                loaders=SchemaLoaders.for_request(request),
+            )
             return 200, response_data
         except Exception as e:
             logger.error(f"Error formatting discussion data: {e}")
@@ -702,7 +692,9 @@ def update_discussion(
             return 500, {"message": "Error updating discussion. Please try again."}
 
         try:
-            response_data = DiscussionOut.from_orm(discussion, user)
+            response_data = DiscussionOut.from_orm(
+                discussion, user, loaders=SchemaLoaders.for_request(request)
+            )
             return 201, response_data
         except Exception as e:
             logger.error(f"Error formatting discussion data: {e}")
@@ -809,7 +801,9 @@ def toggle_discussion_resolved(request, discussion_id: int):
 
         # Return the updated discussion
         try:
-            response_data = DiscussionOut.from_orm(discussion, user)
+            response_data = DiscussionOut.from_orm(
+                discussion, user, loaders=SchemaLoaders.for_request(request)
+            )
             return 200, response_data
         except Exception as e:
             logger.error(f"Error formatting discussion data: {e}")
@@ -1127,7 +1121,8 @@ def delete_comment(request, comment_id: int):
 
             # Delete reactions associated with the comment
             Reaction.objects.filter(
-                content_type__model="discussioncomment", object_id=comment.id
+                content_type_id=content_type_id(DiscussionComment),
+                object_id=comment.id,
             ).delete()
 
             # Logically delete the comment by clearing its content and marking it as deleted
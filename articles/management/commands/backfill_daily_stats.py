@@ -0,0 +1,73 @@
+"""
+Django management command to backfill the ArticleDailyStats and
+CommunityDailyStats rollup tables behind the trend charts
+
+Usage:
+    python manage.py backfill_daily_stats  # Last 365 days
+    python manage.py backfill_daily_stats --days 30
+    python manage.py backfill_daily_stats --dry-run  # Report row counts only
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from articles.stats import compute_article_daily_stats, rebuild_article_daily_stats
+from communities.stats import (
+    compute_community_daily_stats,
+    rebuild_community_daily_stats,
+)
+from myapp.feature_flags import MAX_STATS_WINDOW_DAYS
+
+
+class Command(BaseCommand):
+    help = "Rebuild the article and community daily stats rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=MAX_STATS_WINDOW_DAYS,
+            help="Number of days (ending today) to rebuild article rollups for",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many rollup rows would be written without writing",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        days = max(1, options["days"])
+
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=days - 1)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'[DRY RUN] ' if dry_run else ''}Backfilling daily stats "
+                f"for {start_date} - {end_date}..."
+            )
+        )
+
+        # Community charts show running totals since the community was
+        # created, so their rollups are always rebuilt in full.
+        if dry_run:
+            article_rows = len(compute_article_daily_stats(start_date, end_date))
+            community_rows = len(compute_community_daily_stats())
+        else:
+            article_rows = rebuild_article_daily_stats(start_date, end_date)
+            community_rows = rebuild_community_daily_stats()
+
+        self.stdout.write(f"  Article daily stats rows: {article_rows}")
+        self.stdout.write(f"  Community daily stats rows: {community_rows}")
+
+        if dry_run:
+            self.stdout.write(
+                self.style.WARNING(
+                    "\nThis was a dry run. Run without --dry-run to write the rollups."
+                )
+            )
+        else:
+            self.stdout.write(self.style.SUCCESS("\nBackfill complete!"))
@@ -0,0 +1,74 @@
+"""
+Django management command to rewrite review version history stored as full
+text into deltas (see articles/review_history.py)
+
+Only rows that are not due a periodic snapshot are rewritten.
+
+Usage:
+    python manage.py compact_review_history
+    python manage.py compact_review_history --review-id 123  # Specific review only
+    python manage.py compact_review_history --dry-run  # Report without writing
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from articles.models import Review, ReviewVersion
+from articles.review_history import compact_review_versions
+
+
+class Command(BaseCommand):
+    help = "Store review version history as deltas with periodic snapshots"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--review-id",
+            type=int,
+            help="Only compact the history of this review ID",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report what would be compacted without writing anything",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        reviews = Review.objects.filter(versions__content_delta__isnull=True).distinct()
+        if options.get("review_id"):
+            reviews = reviews.filter(id=options["review_id"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'[DRY RUN] ' if dry_run else ''}Compacting review history..."
+            )
+        )
+
+        compacted = 0
+        bytes_saved = 0
+        for review in reviews.only("id", "content").iterator(chunk_size=500):
+            versions = list(review.versions.order_by("-version"))
+            full_sizes = {
+                version.id: len(version.content.encode()) for version in versions
+            }
+            changed = compact_review_versions(review, versions)
+            if not changed:
+                continue
+
+            bytes_saved += sum(
+                full_sizes[version.id] - len(version.content_delta)
+                for version in changed
+            )
+            compacted += len(changed)
+            if not dry_run:
+                with transaction.atomic():
+                    ReviewVersion.objects.bulk_update(
+                        changed, ["content", "content_delta"]
+                    )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n{'[DRY RUN] ' if dry_run else ''}Compaction complete! "
+                f"{compacted} versions stored as deltas, about {bytes_saved} bytes saved."
+            )
+        )
@@ -0,0 +1,430 @@
+"""
+Django management command to bulk ingest articles from a JSONL, CSV or BibTeX
+file
+
+Records are read in streaming batches. Each batch allocates unique slugs in
+memory against a single prefetch of the slugs already taken, then inserts its
+articles, PDF links and community links with one bulk_create per table.
+
+Recognised fields are title, abstract, authors, article_link and pdf_link
+(BibTeX: title, abstract, author, url or doi, pdf). In CSV files authors are
+separated by ";". Records without a title or abstract, with values longer than
+their columns or with malformed links are skipped.
+
+Reruns skip records already ingested: those whose article_link exists, and
+link-less ones whose title the submitter already has. A run that stopped
+halfway can therefore simply be started again.
+
+Usage:
+    python manage.py ingest_articles corpus.jsonl --submitter admin
+    python manage.py ingest_articles corpus.csv --submitter admin --community "Test Community"
+    python manage.py ingest_articles refs.bib --submitter admin --batch-size 1000
+    python manage.py ingest_articles corpus.jsonl --submitter admin --dry-run  # Parse only
+"""
+
+import csv
+import json
+import re
+import time
+import uuid
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.validators import URLValidator
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from articles.models import Article, ArticlePDF
+from articles.seo import refresh_article_meta
+from articles.visibility import refresh_article_visibility
+from communities.models import Community, CommunityArticle
+from communities.stats import bump_community_daily_stats
+from myapp.conditional import bump_content_versions
+from users.counters import bump_user_counters
+from users.models import User
+
+FORMATS = ("jsonl", "csv", "bibtex")
+EXTENSION_FORMATS = {".jsonl": "jsonl", ".csv": "csv", ".bib": "bibtex"}
+SLUG_MAX_LENGTH = Article._meta.get_field("slug").max_length
+TITLE_MAX_LENGTH = Article._meta.get_field("title").max_length
+ARTICLE_LINK_MAX_LENGTH = Article._meta.get_field("article_link").max_length
+PDF_LINK_MAX_LENGTH = ArticlePDF._meta.get_field("external_url").max_length
+# Room for the "-<8 hex chars>" suffix added to taken slugs
+SLUG_SUFFIX_LENGTH = 9
+
+
+validate_url = URLValidator()
+
+
+def _valid_link(link, max_length):
+    if link is None:
+        return True
+    if len(link) > max_length:
+        return False
+    try:
+        validate_url(link)
+    except ValidationError:
+        return False
+    return True
+
+
+def _split_authors(authors, separator):
+    if isinstance(authors, str):
+        authors = authors.split(separator)
+    return [name.strip() for name in authors or [] if name and name.strip()]
+
+
+def read_jsonl(stream):
+    for line in stream:
+        if line.strip():
+            record = json.loads(line)
+            record["authors"] = _split_authors(record.get("authors"), ";")
+            yield record
+
+
+def read_csv(stream):
+    for record in csv.DictReader(stream):
+        record["authors"] = _split_authors(record.get("authors"), ";")
+        yield record
+
+
+BIBTEX_ENTRY_RE = re.compile(r"@\s*(\w+)\s*\{")
+BIBTEX_FIELD_RE = re.compile(r"\s*,?\s*([\w-]+)\s*=\s*")
+BIBTEX_BARE_VALUE_RE = re.compile(r"[^,}\s]+")
+
+
+def _read_bibtex_value(text, pos):
+    """Read a {braced}, "quoted" or bare value starting at pos."""
+    if text[pos] == "{":
+        depth, start = 0, pos + 1
+        while pos < len(text):
+            if text[pos] == "{":
+                depth += 1
+            elif text[pos] == "}":
+                depth -= 1
+                if depth == 0:
+                    return text[start:pos], pos + 1
+            pos += 1
+        raise ValueError("Unterminated BibTeX value")
+    if text[pos] == '"':
+        end = text.index('"', pos + 1)
+        return text[pos + 1 : end], end + 1
+    match = BIBTEX_BARE_VALUE_RE.match(text, pos)
+    return match.group(0), match.end()
+
+
+def _parse_bibtex_entry(body):
+    fields = {}
+    # Skip the citation key
+    pos = body.find(",")
+    while 0 <= pos < len(body):
+        match = BIBTEX_FIELD_RE.match(body, pos)
+        if not match or match.end() >= len(body):
+            break
+        value, pos = _read_bibtex_value(body, match.end())
+        fields[match.group(1).lower()] = " ".join(
+            value.replace("{", "").replace("}", "").split()
+        )
+    return fields
+
+
+def read_bibtex(stream):
+    """Yield one record per entry, buffering only the entry being read."""
+    buffer = ""
+    for line in stream:
+        buffer += line
+        while True:
+            match = BIBTEX_ENTRY_RE.search(buffer)
+            if not match:
+                buffer = ""
+                break
+            if match.group(1).lower() in ("comment", "preamble", "string"):
+                buffer = buffer[match.end() :]
+                continue
+            # Find the brace closing the entry
+            depth, pos = 1, match.end()
+            while pos < len(buffer) and depth:
+                depth += {"{": 1, "}": -1}.get(buffer[pos], 0)
+                pos += 1
+            if depth:
+                buffer = buffer[match.start() :]
+                break
+            fields = _parse_bibtex_entry(buffer[match.end() : pos - 1])
+            buffer = buffer[pos:]
+
+            article_link = fields.get("url")
+            if not article_link and fields.get("doi"):
+                article_link = f"https://doi.org/{fields['doi']}"
+            yield {
+                "title": fields.get("title"),
+                "abstract": fields.get("abstract"),
+                "authors": _split_authors(
+                    re.split(r"\s+and\s+", fields.get("author", "")), ";"
+                ),
+                "article_link": article_link,
+                "pdf_link": fields.get("pdf"),
+            }
+
+
+READERS = {"jsonl": read_jsonl, "csv": read_csv, "bibtex": read_bibtex}
+
+
+class SlugAllocator:
+    """
+    Hands out slugs following Article.save (slugified title, with a short
+    random suffix when taken) without a query per candidate.
+    """
+
+    def __init__(self):
+        self.allocated = set()
+
+    def allocate(self, titles):
+        bases = [
+            slugify(title)[: SLUG_MAX_LENGTH - SLUG_SUFFIX_LENGTH] for title in titles
+        ]
+        taken = set(
+            Article.objects.filter(slug__in=set(bases)).values_list("slug", flat=True)
+        )
+
+        slugs = []
+        suffixed = set()
+        for base in bases:
+            slug = base
+            if slug in taken or slug in self.allocated:
+                slug = self._suffixed(base)
+                suffixed.add(slug)
+            self.allocated.add(slug)
+            slugs.append(slug)
+
+        # Random suffixes practically never collide, but make sure
+        collisions = set(
+            Article.objects.filter(slug__in=suffixed).values_list("slug", flat=True)
+        )
+        for index, slug in enumerate(slugs):
+            if slug in collisions:
+                slugs[index] = self._suffixed(bases[index])
+                self.allocated.add(slugs[index])
+        return slugs
+
+    def _suffixed(self, base):
+        while True:
+            slug = f"{base}-{uuid.uuid4().hex[:8]}"
+            if slug not in self.allocated:
+                return slug
+
+
+class Command(BaseCommand):
+    help = "Bulk ingest articles from a JSONL, CSV or BibTeX file"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to ingest")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Input format, guessed from the file extension by default",
+        )
+        parser.add_argument(
+            "--submitter",
+            required=True,
+            help="Username recorded as the submitter of every article",
+        )
+        parser.add_argument(
+            "--community",
+            help="Name of a community to publish the articles to",
+        )
+        parser.add_argument(
+            "--submission-type",
+            choices=["Public", "Private"],
+            default="Public",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of records to insert per transaction",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Parse and validate the file without writing anything",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        file_format = options["format"]
+        if not file_format:
+            extension = path[path.rfind(".") :].lower()
+            file_format = EXTENSION_FORMATS.get(extension)
+            if not file_format:
+                raise CommandError(f"Cannot guess the format of {path}, pass --format.")
+
+        try:
+            submitter = User.objects.get(username=options["submitter"])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['submitter']}' not found.")
+
+        community = None
+        if options["community"]:
+            try:
+                community = Community.objects.get(name=options["community"])
+            except Community.DoesNotExist:
+                raise CommandError(f"Community '{options['community']}' not found.")
+
+        self.dry_run = options["dry_run"]
+        self.submitter = submitter
+        self.community = community
+        self.submission_type = options["submission_type"]
+        self.slugs = SlugAllocator()
+        self.seen_links = set()
+        # Titles of link-less articles inserted by this run
+        self.ingested_titles = set()
+        batch_size = max(1, options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'[DRY RUN] ' if self.dry_run else ''}Ingesting {path} "
+                f"as {file_format}..."
+            )
+        )
+
+        created = 0
+        skipped = 0
+        started = time.monotonic()
+
+        with open(path, newline="", encoding="utf-8") as stream:
+            records = READERS[file_format](stream)
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                batch_created, batch_skipped = self._ingest_batch(batch)
+                created += batch_created
+                skipped += batch_skipped
+
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f"  {created} articles ingested, {skipped} skipped "
+                    f"({created / elapsed if elapsed else 0:.0f} rows/s)"
+                )
+
+        elapsed = time.monotonic() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n{'[DRY RUN] ' if self.dry_run else ''}Ingest complete! "
+                f"{created} articles, {skipped} skipped in {elapsed:.1f}s "
+                f"({created / elapsed if elapsed else 0:.0f} rows/s)."
+            )
+        )
+        if created and not self.dry_run:
+            self.stdout.write(
+                "Run rebuild_related_articles to include the new articles in "
+                "related article suggestions"
+                + (
+                    ", and backfill_auto_subscriptions for private/hidden "
+                    "communities."
+                    if community
+                    else "."
+                )
+            )
+
+    def _ingest_batch(self, batch):
+        records = []
+        skipped = 0
+        for record in batch:
+            title = (record.get("title") or "").strip()
+            abstract = (record.get("abstract") or "").strip()
+            article_link = (record.get("article_link") or "").strip() or None
+            record["pdf_link"] = (record.get("pdf_link") or "").strip() or None
+            if (
+                not title
+                or not abstract
+                or len(title) > TITLE_MAX_LENGTH
+                or not _valid_link(article_link, ARTICLE_LINK_MAX_LENGTH)
+                or not _valid_link(record["pdf_link"], PDF_LINK_MAX_LENGTH)
+                or article_link in self.seen_links
+            ):
+                skipped += 1
+                continue
+            if article_link:
+                self.seen_links.add(article_link)
+            records.append((title, abstract, article_link, record))
+
+        existing_links = set(
+            Article.objects.filter(
+                article_link__in=[link for _, _, link, _ in records if link]
+            ).values_list("article_link", flat=True)
+        )
+        # Link-less records are matched on title, except against the
+        # articles inserted by this run, so repeated titles all go in
+        existing_titles = set(
+            Article.objects.filter(
+                submitter=self.submitter,
+                title__in=[title for title, _, link, _ in records if not link],
+            ).values_list("title", flat=True)
+        ).difference(self.ingested_titles)
+        if existing_links or existing_titles:
+            kept = [
+                (title, abstract, link, record)
+                for title, abstract, link, record in records
+                if (
+                    link not in existing_links if link else title not in existing_titles
+                )
+            ]
+            skipped += len(records) - len(kept)
+            records = kept
+
+        if self.dry_run or not records:
+            return len(records), skipped
+
+        slugs = self.slugs.allocate(title for title, _, _, _ in records)
+        articles = [
+            Article(
+                title=title,
+                abstract=abstract,
+                authors=[{"value": name, "label": name} for name in record["authors"]],
+                article_link=article_link,
+                submission_type=self.submission_type,
+                submitter=self.submitter,
+                slug=slug,
+            )
+            for (title, abstract, article_link, record), slug in zip(records, slugs)
+        ]
+
+        with transaction.atomic():
+            Article.objects.bulk_create(articles)
+            # bulk_create skips the receivers that move the profile counters
+            bump_user_counters(self.submitter.id, articles=len(articles))
+            ArticlePDF.objects.bulk_create(
+                [
+                    ArticlePDF(article=article, external_url=record["pdf_link"])
+                    for article, (_, _, _, record) in zip(articles, records)
+                    if record.get("pdf_link")
+                ]
+            )
+            if self.community:
+                CommunityArticle.objects.bulk_create(
+                    [
+                        CommunityArticle(
+                            article=article,
+                            community=self.community,
+                            status=CommunityArticle.PUBLISHED,
+                            published_at=timezone.now(),
+                        )
+                        for article in articles
+                    ]
+                )
+                bump_community_daily_stats(
+                    self.community.id, articles_submitted=len(articles)
+                )
+                # bulk_create skips the signals that move the listing validators
+                bump_content_versions("communities", f"community:{self.community.id}")
+                if self.community.type == Community.HIDDEN:
+                    refresh_article_visibility(article.id for article in articles)
+            refresh_article_meta(article.id for article in articles)
+
+        self.ingested_titles.update(
+            article.title for article in articles if not article.article_link
+        )
+        return len(articles), skipped
@@ -0,0 +1,42 @@
+"""
+Django management command to rebuild the Redis reputation leaderboards,
+global and per community, from the Reputation and Membership tables
+
+Usage:
+    python manage.py rebuild_leaderboards
+    python manage.py rebuild_leaderboards --batch-size 10000
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from users.leaderboard import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Rebuild the global and per-community reputation leaderboards"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Number of scores to send to Redis per command",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS("Rebuilding leaderboards..."))
+
+        try:
+            ranked = rebuild_leaderboards(batch_size=batch_size)
+        except Exception as e:
+            raise CommandError(f"Could not rebuild leaderboards: {e}")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nRebuild complete! {ranked['users']} users and "
+                f"{ranked['communities']} communities ranked, "
+                f"{ranked['repaired']} re-read after changes during the rebuild."
+            )
+        )
@@ -0,0 +1,46 @@
+"""
+Django management command to rebuild the precomputed RelatedArticle table
+from hashtag co-occurrence and title/abstract TF-IDF similarity
+
+Usage:
+    python manage.py rebuild_related_articles
+    python manage.py rebuild_related_articles --article-id 123  # Specific article only
+    python manage.py rebuild_related_articles --batch-size 1000
+"""
+
+from django.core.management.base import BaseCommand
+
+from articles.related import rebuild_related_articles
+
+
+class Command(BaseCommand):
+    help = "Rebuild the top-K related articles of every article"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--article-id",
+            type=int,
+            help="Only rebuild the related articles of this article ID",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of articles to write per transaction",
+        )
+
+    def handle(self, *args, **options):
+        article_id = options.get("article_id")
+        batch_size = max(1, options["batch_size"])
+
+        self.stdout.write(self.style.SUCCESS("Rebuilding related articles..."))
+
+        rows_written = rebuild_related_articles(
+            [article_id] if article_id else None, batch_size=batch_size
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nRebuild complete! {rows_written} related article rows written."
+            )
+        )
@@ -0,0 +1,118 @@
+"""
+Django management command to rebuild the denormalized ArticleStats table
+from reviews, discussions, review comments and reactions
+
+Usage:
+    python manage.py recompute_article_stats
+    python manage.py recompute_article_stats --dry-run  # Report drifted articles only
+    python manage.py recompute_article_stats --article-id 123  # Specific article only
+    python manage.py recompute_article_stats --batch-size 1000
+"""
+
+from django.core.management.base import BaseCommand
+
+from articles.models import Article, ArticleStats
+from articles.stats import STAT_FIELDS, compute_article_stats, rebuild_article_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute article statistics from source tables and repair any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report articles whose stored stats differ without writing anything",
+        )
+        parser.add_argument(
+            "--article-id",
+            type=int,
+            help="Only process this specific article ID",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of articles to recompute per transaction",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        article_id = options.get("article_id")
+        batch_size = max(1, options["batch_size"])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'[DRY RUN] ' if dry_run else ''}Starting article stats recompute..."
+            )
+        )
+
+        articles = Article.objects.order_by("id")
+        if article_id:
+            articles = articles.filter(id=article_id)
+        article_ids = list(articles.values_list("id", flat=True))
+
+        if not article_ids:
+            self.stdout.write(self.style.WARNING("No articles found."))
+            return
+
+        processed = 0
+        drifted = 0
+        rows_written = 0
+
+        for start in range(0, len(article_ids), batch_size):
+            batch = article_ids[start : start + batch_size]
+
+            if dry_run:
+                drifted += self._count_drift(batch)
+            else:
+                rows_written += rebuild_article_stats(batch)
+
+            processed += len(batch)
+            self.stdout.write(f"  Processed {processed}/{len(article_ids)} articles")
+
+        if dry_run:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"\n[DRY RUN] Recompute complete! "
+                    f"{drifted} of {processed} articles have drifted stats."
+                )
+            )
+            self.stdout.write(
+                self.style.WARNING(
+                    "\nThis was a dry run. Run without --dry-run to repair the stats."
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"\nRecompute complete! {processed} articles processed, "
+                    f"{rows_written} stats rows written."
+                )
+            )
+
+    def _count_drift(self, article_ids):
+        expected = {
+            key: values
+            for key, values in compute_article_stats(article_ids).items()
+            if any(values.values())
+        }
+        stored = {
+            (row["article_id"], row["community_id"]): {
+                field: row[field] for field in STAT_FIELDS
+            }
+            for row in ArticleStats.objects.filter(article_id__in=article_ids).values(
+                "article_id", "community_id", *STAT_FIELDS
+            )
+            if any(row[field] for field in STAT_FIELDS)
+        }
+
+        drifted_articles = {
+            article_id
+            for article_id, community_id in set(expected) | set(stored)
+            if expected.get((article_id, community_id))
+            != stored.get((article_id, community_id))
+        }
+        for article_id in sorted(drifted_articles):
+            self.stdout.write(f"    Article {article_id} has drifted stats")
+        return len(drifted_articles)
@@ -0,0 +1,96 @@
+"""
+Django management command to rebuild the ReactionCount table from the
+Reaction table, e.g. after pending counters were lost with a Redis flush
+
+Usage:
+    python manage.py recompute_reaction_counts
+    python manage.py recompute_reaction_counts --model articles.reviewcomment
+    python manage.py recompute_reaction_counts --dry-run  # Report drifted objects only
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+
+from articles.models import ReactionCount
+from articles.reaction_counts import (
+    COUNT_FIELDS,
+    compute_reaction_counts,
+    flush_reaction_counts,
+    rebuild_reaction_counts,
+)
+
+
+class Command(BaseCommand):
+    help = "Recompute reaction counters from the Reaction table and repair any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            help="Only process reactions on this model, as app_label.model",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report objects whose stored counters differ without writing anything",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        content_type_id = None
+        if options.get("model"):
+            try:
+                app_label, model = options["model"].lower().split(".")
+                content_type_id = ContentType.objects.get(
+                    app_label=app_label, model=model
+                ).id
+            except (ValueError, ContentType.DoesNotExist):
+                raise CommandError(f"Unknown model: {options['model']}")
+
+        if dry_run:
+            # Compare against flushed totals only
+            try:
+                flush_reaction_counts()
+            except Exception as e:
+                self.stdout.write(
+                    self.style.WARNING(f"Could not flush pending counters: {e}")
+                )
+            drifted = self._count_drift(content_type_id)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"[DRY RUN] {drifted} objects have drifted reaction counts."
+                )
+            )
+            return
+
+        rows = rebuild_reaction_counts(content_type_id)
+        self.stdout.write(
+            self.style.SUCCESS(f"Recompute complete! {rows} counter rows written.")
+        )
+
+    def _count_drift(self, content_type_id):
+        expected = {
+            key: values
+            for key, values in compute_reaction_counts(content_type_id).items()
+            if any(values.values())
+        }
+        stored = ReactionCount.objects.all()
+        if content_type_id is not None:
+            stored = stored.filter(content_type_id=content_type_id)
+        stored = {
+            (row["content_type_id"], row["object_id"]): {
+                field: row[field] for field in COUNT_FIELDS
+            }
+            for row in stored.values("content_type_id", "object_id", *COUNT_FIELDS)
+            if any(row[field] for field in COUNT_FIELDS)
+        }
+
+        drifted = sorted(
+            key
+            for key in set(expected) | set(stored)
+            if expected.get(key) != stored.get(key)
+        )
+        for content_type_id, object_id in drifted:
+            self.stdout.write(
+                f"    Object {content_type_id}:{object_id} has drifted counts"
+            )
+        return len(drifted)
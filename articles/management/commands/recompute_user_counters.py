@@ -0,0 +1,52 @@
+"""
+Django management command to reconcile the UserCounters table behind the
+profile stats with the article, review, comment, post and membership tables
+
+Usage:
+    python manage.py recompute_user_counters
+    python manage.py recompute_user_counters --user-id 123  # Specific user only
+    python manage.py recompute_user_counters --dry-run  # Report drifted users only
+"""
+
+from django.core.management.base import BaseCommand
+
+from users.counters import rebuild_user_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute per-user contribution counters and repair any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user-id",
+            type=int,
+            help="Only reconcile the counters of this user ID",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report users whose stored counters differ without writing anything",
+        )
+
+    def handle(self, *args, **options):
+        user_id = options.get("user_id")
+        dry_run = options["dry_run"]
+
+        repaired = rebuild_user_counters(
+            [user_id] if user_id else None, dry_run=dry_run
+        )
+        for drifted_user_id in repaired:
+            self.stdout.write(f"    User {drifted_user_id} has drifted counters")
+
+        if dry_run:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"[DRY RUN] {len(repaired)} users have drifted counters."
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Recompute complete! {len(repaired)} users repaired."
+                )
+            )
@@ -0,0 +1,30 @@
+"""
+Django management command to top up the pool of pre-generated pseudonyms
+claimed by new anonymous identities
+
+Usage:
+    python manage.py refill_pseudonym_pool
+    python manage.py refill_pseudonym_pool --size 10000  # Grow the pool
+"""
+
+from django.core.management.base import BaseCommand
+
+from articles.pseudonyms import POOL_SIZE, refill_pseudonym_pool
+
+
+class Command(BaseCommand):
+    help = "Pre-generate pseudonyms and identicons for anonymous identities"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--size",
+            type=int,
+            default=POOL_SIZE,
+            help=f"Number of pseudonyms the pool should hold (default: {POOL_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        added = refill_pseudonym_pool(options["size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Refill complete! {added} pseudonyms added.")
+        )
@@ -0,0 +1,66 @@
+"""
+Django management command to delete expired notifications and read
+notifications past their retention period, in small batches
+
+Usage:
+    python manage.py sweep_notifications
+    python manage.py sweep_notifications --read-retention-days 30
+    python manage.py sweep_notifications --batch-size 500 --pause 0.5
+    python manage.py sweep_notifications --dry-run  # Count matching rows only
+"""
+
+from django.core.management.base import BaseCommand
+
+from users.notification_retention import (
+    READ_RETENTION_DAYS,
+    SWEEP_BATCH_SIZE,
+    sweep_notifications,
+)
+
+
+class Command(BaseCommand):
+    help = "Delete expired and old read notifications"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--read-retention-days",
+            type=int,
+            default=READ_RETENTION_DAYS,
+            help="Delete read notifications older than this many days",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=SWEEP_BATCH_SIZE,
+            help="Number of notifications to delete per transaction",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=0,
+            help="Seconds to sleep between batches",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count the notifications that would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+
+        report = sweep_notifications(
+            read_retention_days=max(0, options["read_retention_days"]),
+            batch_size=max(1, options["batch_size"]),
+            time_budget=float("inf"),
+            pause=max(0, options["pause"]),
+            dry_run=dry_run,
+        )
+
+        prefix = "[DRY RUN] Would delete" if dry_run else "Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{prefix} {report['expired']} expired and {report['read']} "
+                f"old read notifications in {report['seconds']}s."
+            )
+        )
@@ -0,0 +1,134 @@
+"""
+Django management command to move the base64 identicons stored inline in
+AnonymousIdentity rows into object storage, keeping only their URLs
+
+With --repair-missing it also uploads the identicons of pseudonyms generated
+inside requests whose queued upload never ran, i.e. rows holding the URL of
+an object that does not exist.
+
+Usage:
+    python manage.py upload_identicons
+    python manage.py upload_identicons --batch-size 200
+    python manage.py upload_identicons --repair-missing
+    python manage.py upload_identicons --dry-run  # Count rows to convert only
+"""
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from articles.models import AnonymousIdentity
+from myapp.utils import generate_identicon, identicon_path, render_identicon
+
+
+class Command(BaseCommand):
+    help = "Upload inline base64 identicons to object storage"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of identities converted per batch (default: 500)",
+        )
+        parser.add_argument(
+            "--repair-missing",
+            action="store_true",
+            help="Also upload identicons whose URL points to a missing object",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Count the identities to convert without uploading anything",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        inline = AnonymousIdentity.objects.exclude(
+            Q(identicon__startswith="http") | Q(identicon__isnull=True)
+        )
+
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"[DRY RUN] {inline.count()} identicons would be uploaded."
+                )
+            )
+            if options["repair_missing"]:
+                self.repair_missing(batch_size, dry_run=True)
+            return
+
+        converted = 0
+        failed = set()
+        while True:
+            batch = list(
+                inline.exclude(id__in=failed)
+                .order_by("id")
+                .values_list("id", "fake_name")[:batch_size]
+            )
+            if not batch:
+                break
+            identities = []
+            for identity_id, fake_name in batch:
+                try:
+                    identities.append(
+                        AnonymousIdentity(
+                            id=identity_id, identicon=generate_identicon(fake_name)
+                        )
+                    )
+                except Exception as e:
+                    failed.add(identity_id)
+                    self.stderr.write(f"    Identity {identity_id} failed: {e}")
+            AnonymousIdentity.objects.bulk_update(identities, ["identicon"])
+            converted += len(identities)
+            self.stdout.write(f"    {converted} identicons uploaded")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Upload complete! {converted} identicons uploaded, "
+                f"{len(failed)} failed."
+            )
+        )
+        if options["repair_missing"]:
+            self.repair_missing(batch_size)
+
+    def repair_missing(self, batch_size, dry_run=False):
+        """Upload identicons whose URL is derived from the name but missing."""
+        linked = AnonymousIdentity.objects.filter(identicon__startswith="http")
+        checked = repaired = failed = 0
+        last_id = 0
+        while True:
+            batch = list(
+                linked.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", "fake_name", "identicon")[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1][0]
+            for identity_id, fake_name, identicon in batch:
+                checked += 1
+                path = identicon_path(render_identicon(fake_name))
+                # Skip URLs not derived from the name and objects already there
+                if identicon != default_storage.url(path):
+                    continue
+                if default_storage.exists(path):
+                    continue
+                if dry_run:
+                    repaired += 1
+                    continue
+                try:
+                    generate_identicon(fake_name)
+                    repaired += 1
+                except Exception as e:
+                    failed += 1
+                    self.stderr.write(f"    Identity {identity_id} failed: {e}")
+            self.stdout.write(f"    {checked} linked identicons checked")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{'[DRY RUN] ' if dry_run else ''}Repair complete! "
+                f"{repaired} missing identicons "
+                f"{'found' if dry_run else 'uploaded'}, {failed} failed."
+            )
+        )
@@ -0,0 +1,69 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0033_alter_userflag_entity_type_alter_userflag_flag_type"),
+        ("communities", "0017_alter_communityarticle_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("review_count", models.IntegerField(default=0)),
+                ("rating_sum", models.IntegerField(default=0)),
+                ("discussion_count", models.IntegerField(default=0)),
+                ("comment_count", models.IntegerField(default=0)),
+                ("like_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "article",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stats",
+                        to="articles.article",
+                    ),
+                ),
+                (
+                    "community",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="article_stats",
+                        to="communities.community",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="articlestats",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("community__isnull", False)),
+                fields=("article", "community"),
+                name="articlestats_unique_community",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="articlestats",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("community__isnull", True)),
+                fields=("article",),
+                name="articlestats_unique_global",
+            ),
+        ),
+    ]
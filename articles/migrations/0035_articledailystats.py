@@ -0,0 +1,74 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0034_articlestats"),
+        ("communities", "0018_communitydailystats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("review_count", models.IntegerField(default=0)),
+                ("like_count", models.IntegerField(default=0)),
+                (
+                    "article",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="articles.article",
+                    ),
+                ),
+                (
+                    "community",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="article_daily_stats",
+                        to="communities.community",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["article", "date"], name="articledailystats_date"
+                    ),
+                    models.Index(fields=["date"], name="articledailystats_day"),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="articledailystats",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("community__isnull", False)),
+                fields=("article", "community", "date"),
+                name="articledailystats_unique_community",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="articledailystats",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("community__isnull", True)),
+                fields=("article", "date"),
+                name="articledailystats_unique_global",
+            ),
+        ),
+    ]
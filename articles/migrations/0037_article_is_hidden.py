@@ -0,0 +1,37 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:32
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_hidden_articles(apps, schema_editor):
+    Article = apps.get_model("articles", "Article")
+    Article.objects.filter(communityarticle__community__type="hidden").update(
+        is_hidden=True
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0036_relatedarticle"),
+        ("communities", "0018_communitydailystats"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="article",
+            name="is_hidden",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_hidden_articles, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="article",
+            index=models.Index(
+                condition=models.Q(("is_hidden", False), ("submission_type", "Public")),
+                fields=["-created_at"],
+                name="article_public_feed",
+            ),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def build_article_meta(apps, schema_editor):
+    # Mirrors articles.seo.refresh_article_meta with the historical models
+    Article = apps.get_model("articles", "Article")
+    ArticleMeta = apps.get_model("articles", "ArticleMeta")
+    CommunityArticle = apps.get_model("communities", "CommunityArticle")
+
+    first_links = {
+        link["article_id"]: link
+        for link in CommunityArticle.objects.order_by("article_id", "id")
+        .distinct("article_id")
+        .values("article_id", "status", "community__type")
+    }
+    rows = []
+    for article in Article.objects.filter(submission_type="Public").iterator(
+        chunk_size=2000
+    ):
+        link = first_links.get(article.id)
+        if link and (
+            link["community__type"] in ("hidden", "private")
+            or link["status"] not in ("published", "accepted")
+        ):
+            continue
+        rows.append(
+            ArticleMeta(
+                article_id=article.id,
+                slug=article.slug,
+                title=article.title,
+                abstract=article.abstract,
+                article_image_url=article.article_image_url.name or None,
+            )
+        )
+    ArticleMeta.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0037_article_is_hidden"),
+        ("communities", "0018_communitydailystats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArticleMeta",
+            fields=[
+                (
+                    "article",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="meta",
+                        serialize=False,
+                        to="articles.article",
+                    ),
+                ),
+                ("slug", models.SlugField(max_length=255)),
+                ("title", models.CharField(max_length=500)),
+                ("abstract", models.TextField()),
+                (
+                    "article_image_url",
+                    models.ImageField(blank=True, null=True, upload_to=""),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(build_article_meta, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.14 on 2026-10-18 22:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0038_articlemeta"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reviewversion",
+            name="content_delta",
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name="reviewversion",
+            name="content",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddIndex(
+            model_name="reviewversion",
+            index=models.Index(
+                fields=["review", "-version"], name="reviewversion_latest"
+            ),
+        ),
+    ]
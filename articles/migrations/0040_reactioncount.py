@@ -0,0 +1,65 @@
+# Generated by Django 5.0.14 on 2026-10-18 22:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def build_reaction_counts(apps, schema_editor):
+    # Mirrors articles.reaction_counts.rebuild_reaction_counts
+    Reaction = apps.get_model("articles", "Reaction")
+    ReactionCount = apps.get_model("articles", "ReactionCount")
+    rows = (
+        Reaction.objects.values("content_type_id", "object_id")
+        .annotate(
+            like_count=Count("id", filter=Q(vote=1)),
+            dislike_count=Count("id", filter=Q(vote=-1)),
+        )
+        .order_by()
+    )
+    ReactionCount.objects.bulk_create(
+        (ReactionCount(**row) for row in rows.iterator()), batch_size=1000
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0039_reviewversion_content_delta"),
+        ("contenttypes", "0002_remove_content_type_name"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReactionCount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("object_id", models.PositiveIntegerField()),
+                ("like_count", models.IntegerField(default=0)),
+                ("dislike_count", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "content_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="reactioncount",
+            constraint=models.UniqueConstraint(
+                fields=("content_type", "object_id"), name="reactioncount_unique_object"
+            ),
+        ),
+        migrations.RunPython(build_reaction_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.14 on 2026-10-18 22:28
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0040_reactioncount"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="reaction",
+            index=models.Index(
+                fields=["content_type", "object_id"], name="reaction_target"
+            ),
+        ),
+    ]
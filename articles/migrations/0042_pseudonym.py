@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0041_reaction_target"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Pseudonym",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("fake_name", models.CharField(max_length=100, unique=True)),
+                ("identicon", models.TextField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
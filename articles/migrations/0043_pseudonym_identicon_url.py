@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:27
+
+from django.db import migrations, models
+
+
+def drop_inline_identicons(apps, schema_editor):
+    # Unclaimed pseudonyms with base64 identicons are cheaper to regenerate
+    # than to upload, the next refill replaces them
+    Pseudonym = apps.get_model("articles", "Pseudonym")
+    Pseudonym.objects.exclude(identicon__startswith="http").delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0042_pseudonym"),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_inline_identicons, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="pseudonym",
+            name="identicon",
+            field=models.URLField(max_length=255),
+        ),
+    ]
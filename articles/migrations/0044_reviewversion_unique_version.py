@@ -0,0 +1,46 @@
+# Generated by Django 5.0.14 on 2026-10-19 00:08
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def renumber_duplicate_versions(apps, schema_editor):
+    # Concurrent edits could store a version number twice. Number the history
+    # of those reviews again in the order it was written, keeping every row.
+    Review = apps.get_model("articles", "Review")
+    ReviewVersion = apps.get_model("articles", "ReviewVersion")
+    review_ids = (
+        ReviewVersion.objects.values("review_id", "version")
+        .annotate(rows=Count("id"))
+        .filter(rows__gt=1)
+        .values_list("review_id", flat=True)
+        .distinct()
+        .order_by()
+    )
+    for review_id in list(review_ids):
+        versions = list(
+            ReviewVersion.objects.filter(review_id=review_id).order_by(
+                "created_at", "id"
+            )
+        )
+        for number, version in enumerate(versions, start=1):
+            version.version = number
+        ReviewVersion.objects.bulk_update(versions, ["version"])
+        Review.objects.filter(id=review_id).update(version=len(versions) + 1)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0043_pseudonym_identicon_url"),
+    ]
+
+    operations = [
+        migrations.RunPython(renumber_duplicate_versions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="reviewversion",
+            constraint=models.UniqueConstraint(
+                fields=("review", "version"), name="reviewversion_unique_version"
+            ),
+        ),
+    ]
@@ -1,17 +1,28 @@
 import random
 import time
 import uuid
+from functools import lru_cache
 
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.text import slugify
 from faker import Faker
 
+from articles.review_history import encode_delta, is_snapshot_version
 from myapp import settings
-from myapp.utils import generate_identicon
-from users.models import HashtagRelation, User
+from myapp.conditional import bump_content_versions
+from myapp.content_types import content_type_id
+from users.models import HashtagRelation, Reputation, User
+
+
+@lru_cache(maxsize=None)
+def get_faker() -> Faker:
+    # Building a Faker loads its providers, share one per process
+    return Faker()
 
 
 class Article(models.Model):
@@ -44,6 +55,10 @@ class Article(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized from CommunityArticle / Community.type, kept up to date by
+    # articles.visibility: True when the article is in any hidden community
+    is_hidden = models.BooleanField(default=False)
+
     hashtags = GenericRelation(HashtagRelation, related_query_name="articles")
 
     class Meta:
@@ -52,6 +67,11 @@ class Article(models.Model):
             models.Index(fields=["created_at"]),
             models.Index(fields=["submission_type"]),
             models.Index(fields=["submission_type", "created_at"]),
+            models.Index(
+                fields=["-created_at"],
+                name="article_public_feed",
+                condition=models.Q(is_hidden=False, submission_type="Public"),
+            ),
         ]
 
     def save(self, *args, **kwargs):
@@ -99,6 +119,8 @@ class AnonymousIdentity(models.Model):
         "communities.Community", null=True, blank=True, on_delete=models.CASCADE
     )
     fake_name = models.CharField(max_length=100)
+    # URL of the identicon in object storage, a base64 PNG in rows not yet
+    # converted by the upload_identicons command
     identicon = models.TextField(null=True, blank=True)
 
     class Meta:
@@ -106,7 +128,7 @@ class AnonymousIdentity(models.Model):
 
     @staticmethod
     def generate_reddit_style_username():
-        fake = Faker()
+        fake = get_faker()
 
         def cap_word():
             return fake.word().capitalize()
@@ -131,18 +153,33 @@ class AnonymousIdentity(models.Model):
 
     @classmethod
     def get_or_create_fake_name(cls, user, article, community=None):
-        identity, created = cls.objects.get_or_create(
-            user=user,
-            article=article,
-            community=community,
-            defaults={
-                "fake_name": (fake_name := cls.generate_reddit_style_username()),
-                "identicon": generate_identicon(fake_name),
-            },
-        )
+        identity = cls.objects.filter(
+            user=user, article=article, community=community
+        ).first()
+        if identity is None:
+            from articles.pseudonyms import claim_pseudonym
+
+            fake_name, identicon = claim_pseudonym()
+            identity, created = cls.objects.get_or_create(
+                user=user,
+                article=article,
+                community=community,
+                defaults={"fake_name": fake_name, "identicon": identicon},
+            )
         return identity.fake_name
 
 
+class Pseudonym(models.Model):
+    """
+    Pre-generated fake name and identicon waiting to be claimed by a new
+    AnonymousIdentity, see articles/pseudonyms.py.
+    """
+
+    fake_name = models.CharField(max_length=100, unique=True)
+    identicon = models.URLField(max_length=255)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
 class Review(models.Model):
     REVIEWER = "reviewer"
     MODERATOR = "moderator"
@@ -187,20 +224,62 @@ class Review(models.Model):
             f"{self.subject} by {self.user.username} ({self.get_review_type_display()})"
         )
 
+    # Fields whose loaded values are kept to detect edits without a SELECT
+    VERSIONED_FIELDS = ("rating", "subject", "content", "version")
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._snapshot_loaded_state()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._snapshot_loaded_state()
+
+    def _snapshot_loaded_state(self):
+        loaded = self.__dict__
+        if all(field in loaded for field in self.VERSIONED_FIELDS):
+            self._loaded_state = {
+                field: loaded[field] for field in self.VERSIONED_FIELDS
+            }
+        else:
+            self._loaded_state = None
+
     def save(self, *args, **kwargs):
         if self.pk is not None:
-            old_review = Review.objects.get(pk=self.pk)
+            loaded = getattr(self, "_loaded_state", None)
+            if loaded is None:
+                # Built by hand or loaded with deferred fields
+                loaded = (
+                    Review.objects.filter(pk=self.pk)
+                    .values(*self.VERSIONED_FIELDS)
+                    .first()
+                )
             # if either the subject or content has changed, create a new version
-            if old_review.subject != self.subject or old_review.content != self.content:
+            if loaded and (
+                loaded["subject"] != self.subject or loaded["content"] != self.content
+            ):
+                old_version = loaded["version"]
+                if is_snapshot_version(old_version):
+                    content, content_delta = loaded["content"], None
+                else:
+                    # Stored as a delta against the text being saved
+                    content = ""
+                    content_delta = encode_delta(self.content, loaded["content"])
+                # A stale instance fails here on the unique version, before
+                # the review is written
                 ReviewVersion.objects.create(
                     review=self,
-                    rating=old_review.rating,
-                    subject=old_review.subject,
-                    content=old_review.content,
-                    version=old_review.version,
+                    rating=loaded["rating"],
+                    subject=loaded["subject"],
+                    content=content,
+                    content_delta=content_delta,
+                    version=old_version,
                 )
-                self.version = old_review.version + 1
+                self.version = old_version + 1
         super().save(*args, **kwargs)
+        self._snapshot_loaded_state()
 
     def get_anonymous_name(self):
         return AnonymousIdentity.get_or_create_fake_name(
@@ -227,10 +306,25 @@ class ReviewVersion(models.Model):
     )
     rating = models.IntegerField()
     subject = models.CharField(max_length=255)
-    content = models.TextField()
+    # Full text for snapshots, empty when content_delta is set. Use
+    # articles.review_history to read versions with their full content.
+    content = models.TextField(blank=True)
+    content_delta = models.BinaryField(null=True, blank=True)
     version = models.PositiveIntegerField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["review", "-version"], name="reviewversion_latest"),
+        ]
+        constraints = [
+            # A second row for a version would hold a delta against text
+            # that is no longer live
+            models.UniqueConstraint(
+                fields=["review", "version"], name="reviewversion_unique_version"
+            ),
+        ]
+
     def __str__(self):
         return f"Version {self.version} of {self.review.subject}"
 
@@ -315,6 +409,17 @@ class Reaction(models.Model):
 
     class Meta:
         unique_together = ("user", "content_type", "object_id")
+        indexes = [
+            # Reactions on one object; the unique index leads with the user
+            models.Index(fields=["content_type", "object_id"], name="reaction_target"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the counter receivers tell which vote an update replaced
+        instance._loaded_vote = instance.__dict__.get("vote")
+        return instance
 
     def __str__(self):
         return (
@@ -322,6 +427,183 @@ class Reaction(models.Model):
         )
 
 
+class ReactionCount(models.Model):
+    """
+    Like and dislike totals per reacted object, flushed from the pending
+    counters in Redis (see articles/reaction_counts.py).
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    like_count = models.IntegerField(default=0)
+    dislike_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id"],
+                name="reactioncount_unique_object",
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f"Reactions on {self.content_type_id}:{self.object_id}: "
+            f"{self.like_count} likes, {self.dislike_count} dislikes"
+        )
+
+
+"""
+Denormalized Article Statistics
+"""
+
+
+class ArticleStats(models.Model):
+    """
+    Per-article counters maintained incrementally by the review, discussion,
+    comment and reaction write paths (see articles/stats.py).
+
+    One row exists per (article, community) scope. The row with
+    community=NULL holds activity made outside any community, as well as
+    article likes, which are not community scoped.
+    """
+
+    article = models.ForeignKey(Article, on_delete=models.CASCADE, related_name="stats")
+    community = models.ForeignKey(
+        "communities.Community",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="article_stats",
+    )
+    review_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    discussion_count = models.IntegerField(default=0)
+    comment_count = models.IntegerField(default=0)
+    like_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["article", "community"],
+                name="articlestats_unique_community",
+                condition=models.Q(community__isnull=False),
+            ),
+            models.UniqueConstraint(
+                fields=["article"],
+                name="articlestats_unique_global",
+                condition=models.Q(community__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Stats for article {self.article_id} (community {self.community_id})"
+
+    @property
+    def average_rating(self):
+        if not self.review_count:
+            return 0
+        return round(self.rating_sum / self.review_count, 1)
+
+
+class ArticleDailyStats(models.Model):
+    """
+    Daily rollup of review and like activity for the article stats charts.
+
+    Rows are bumped by the write paths and rebuilt for recent days by a
+    periodic task. Scoping follows ArticleStats: likes only live on the
+    community=NULL row.
+    """
+
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    community = models.ForeignKey(
+        "communities.Community",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="article_daily_stats",
+    )
+    date = models.DateField()
+    review_count = models.IntegerField(default=0)
+    like_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["article", "community", "date"],
+                name="articledailystats_unique_community",
+                condition=models.Q(community__isnull=False),
+            ),
+            models.UniqueConstraint(
+                fields=["article", "date"],
+                name="articledailystats_unique_global",
+                condition=models.Q(community__isnull=True),
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["article", "date"], name="articledailystats_date"),
+            models.Index(fields=["date"], name="articledailystats_day"),
+        ]
+
+    def __str__(self):
+        return f"Daily stats for article {self.article_id} on {self.date}"
+
+
+"""
+Precomputed Related Articles
+"""
+
+
+class RelatedArticle(models.Model):
+    """
+    Top-K related articles of an article, rebuilt by a background job from
+    hashtag co-occurrence and title/abstract text similarity.
+    """
+
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="related_entries"
+    )
+    related_article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name="+"
+    )
+    score = models.FloatField()
+    shared_hashtags = models.IntegerField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("article", "related_article")
+        indexes = [
+            models.Index(fields=["article", "-score"], name="relatedarticle_score"),
+        ]
+
+    def __str__(self):
+        return f"{self.related_article_id} related to {self.article_id}"
+
+
+class ArticleMeta(models.Model):
+    """
+    Compact public metadata served to crawlers by get_article_meta, kept in
+    sync by articles/seo.py. Only articles the endpoint may expose have a row.
+    """
+
+    article = models.OneToOneField(
+        Article, on_delete=models.CASCADE, primary_key=True, related_name="meta"
+    )
+    # Not unique: a renamed article's old row may linger until its refresh
+    slug = models.SlugField(max_length=255)
+    title = models.CharField(max_length=500)
+    abstract = models.TextField()
+    article_image_url = models.ImageField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Meta for {self.slug}"
+
+
 """
 Discussion Threads for Articles
 """
@@ -694,7 +976,10 @@ class UserFlagManager(models.Manager):
         ]
         # ignore_conflicts=True handles race conditions where the same flag
         # might be created twice (e.g., duplicate webhook calls)
-        return self.bulk_create(flags, ignore_conflicts=True)
+        created = self.bulk_create(flags, ignore_conflicts=True)
+        # Flags are part of the payloads validated per user
+        bump_content_versions(*(f"user:{user_id}" for user_id in user_ids))
+        return created
 
     def get_flagged_entity_ids(
         self,
@@ -766,6 +1051,7 @@ class UserFlagManager(models.Manager):
                 return 0
             # Delete only the locked rows
             deleted_count, _ = self.filter(id__in=locked_ids).delete()
+            bump_content_versions(f"user:{user_id}")
             return deleted_count
 
     def has_flag(
@@ -892,3 +1178,149 @@ class UserFlag(models.Model):
 
     def __str__(self):
         return f"UserFlag({self.user_id}, {self.flag_type}, {self.entity_type}:{self.entity_id})"
+
+
+# Conditional GET validators (see myapp/conditional.py). Every model rendered
+# by the article, review and discussion reads moves the version of its article.
+@receiver([post_save, post_delete], sender=Article)
+def bump_article_version(sender, instance, **kwargs):
+    bump_content_versions(f"article:{instance.pk}")
+
+
+@receiver(post_save, sender=Article)
+def refresh_article_meta_record(sender, instance, **kwargs):
+    from articles.seo import schedule_article_meta_refresh
+
+    schedule_article_meta_refresh([instance.pk])
+
+
+@receiver([post_save, post_delete], sender=ArticlePDF)
+@receiver([post_save, post_delete], sender=AnonymousIdentity)
+@receiver([post_save, post_delete], sender=Review)
+@receiver([post_save, post_delete], sender=Discussion)
+def bump_article_content_version(sender, instance, **kwargs):
+    bump_content_versions(f"article:{instance.article_id}")
+
+
+@receiver([post_save, post_delete], sender=ReviewComment)
+@receiver([post_save, post_delete], sender=ReviewCommentRating)
+def bump_review_article_version(sender, instance, **kwargs):
+    # None when the review is being deleted too, which bumps the article itself
+    article_id = (
+        Review.objects.filter(id=instance.review_id)
+        .values_list("article_id", flat=True)
+        .first()
+    )
+    if article_id:
+        bump_content_versions(f"article:{article_id}")
+
+
+@receiver([post_save, post_delete], sender=DiscussionComment)
+def bump_discussion_article_version(sender, instance, **kwargs):
+    article_id = (
+        Discussion.objects.filter(id=instance.discussion_id)
+        .values_list("article_id", flat=True)
+        .first()
+    )
+    if article_id:
+        bump_content_versions(f"article:{article_id}")
+
+
+@receiver([post_save, post_delete], sender=Reaction)
+def bump_reacted_article_version(sender, instance, **kwargs):
+    # Only article likes are rendered by the validated reads
+    if instance.content_type_id == content_type_id(Article):
+        bump_content_versions(f"article:{instance.object_id}")
+
+
+def bump_author_article_versions(user_id: int):
+    """
+    Move the version of every article whose reads embed the user, i.e. the
+    articles they submitted, reviewed, discussed or commented on.
+    """
+    article_ids = (
+        Article.objects.filter(submitter_id=user_id)
+        .values_list("id", flat=True)
+        .union(
+            Review.objects.filter(user_id=user_id).values_list("article_id", flat=True),
+            Discussion.objects.filter(author_id=user_id).values_list(
+                "article_id", flat=True
+            ),
+            ReviewComment.objects.filter(author_id=user_id).values_list(
+                "review__article_id", flat=True
+            ),
+            DiscussionComment.objects.filter(author_id=user_id).values_list(
+                "discussion__article_id", flat=True
+            ),
+        )
+    )
+    bump_content_versions(*(f"article:{article_id}" for article_id in article_ids))
+
+
+# Authors are rendered with their username, picture and reputation
+AUTHOR_FIELDS = {"username", "profile_pic_url"}
+
+
+@receiver(post_save, sender=User)
+def bump_user_article_versions(sender, instance, created, update_fields, **kwargs):
+    # Logins only save last_login
+    if created or (update_fields and not AUTHOR_FIELDS & set(update_fields)):
+        return
+    bump_author_article_versions(instance.pk)
+
+
+# Reputation.award updates the row directly and bumps the versions itself
+@receiver(post_save, sender=Reputation)
+def bump_reputation_article_versions(sender, instance, created, **kwargs):
+    if not created:
+        bump_author_article_versions(instance.user_id)
+
+
+@receiver(post_save, sender=Reaction)
+def count_saved_reaction(sender, instance, created, **kwargs):
+    from articles.reaction_counts import record_reaction_change
+
+    old_vote = None if created else getattr(instance, "_loaded_vote", None)
+    record_reaction_change(
+        instance.content_type_id, instance.object_id, old_vote, instance.vote
+    )
+    instance._loaded_vote = instance.vote
+
+
+@receiver(post_delete, sender=Reaction)
+def count_deleted_reaction(sender, instance, **kwargs):
+    from articles.reaction_counts import record_reaction_change
+
+    record_reaction_change(
+        instance.content_type_id,
+        instance.object_id,
+        getattr(instance, "_loaded_vote", instance.vote),
+        None,
+    )
+
+
+# Profile contribution counters (see users/counters.py)
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=ReviewComment)
+def count_created_contribution(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        _bump_contribution_counter(sender, instance, 1)
+
+
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=ReviewComment)
+def count_deleted_contribution(sender, instance, **kwargs):
+    _bump_contribution_counter(sender, instance, -1)
+
+
+def _bump_contribution_counter(sender, instance, delta):
+    from users.counters import bump_user_counters
+
+    if sender is Article:
+        bump_user_counters(instance.submitter_id, articles=delta)
+    elif sender is Review:
+        bump_user_counters(instance.user_id, reviews=delta)
+    else:
+        bump_user_counters(instance.author_id, review_comments=delta)
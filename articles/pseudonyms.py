@@ -0,0 +1,123 @@
+"""
+Pool of pre-generated pseudonyms for anonymous identities.
+
+Generating a fake name and uploading its identicon is slow, and used to
+happen inside the requests creating the first pseudonymous review, comment
+or discussion of a user on an article. A background job now keeps a pool
+of unique names with their uploaded identicons, and a new AnonymousIdentity
+claims one with a single ``SELECT ... FOR UPDATE SKIP LOCKED`` and a delete
+by primary key, so concurrent requests never wait for or receive the same
+pseudonym. When the pool runs dry, a name is generated inline and its
+identicon, whose URL is known from its content, is uploaded by a worker
+once the transaction commits, or inline if the upload cannot be queued.
+``python manage.py upload_identicons --repair-missing`` uploads any that
+were still lost.
+
+The pool is topped up every few minutes through Celery beat and on demand
+with ``python manage.py refill_pseudonym_pool``.
+"""
+
+import logging
+
+from django.db import transaction
+
+from articles.models import AnonymousIdentity, Pseudonym
+from myapp.utils import generate_identicon
+
+logger = logging.getLogger(__name__)
+
+POOL_SIZE = 2000
+REFILL_BATCH_SIZE = 200
+# Give up on a refill when a batch is mostly name collisions
+MAX_REFILL_ATTEMPTS = 10
+
+
+def generate_pseudonym() -> tuple:
+    """
+    Returns:
+        A new (fake_name, identicon URL) pair, the identicon uploaded after
+        the transaction commits
+    """
+    from articles.tasks import upload_identicon
+
+    fake_name = AnonymousIdentity.generate_reddit_style_username()
+
+    def enqueue():
+        try:
+            upload_identicon.delay(fake_name)
+        except Exception as e:
+            logger.warning(
+                f"Failed to queue identicon upload for {fake_name}, "
+                f"uploading inline: {e}"
+            )
+            try:
+                generate_identicon(fake_name)
+            except Exception as e:
+                logger.error(f"Failed to upload identicon of {fake_name}: {e}")
+
+    transaction.on_commit(enqueue)
+    return fake_name, generate_identicon(fake_name, upload=False)
+
+
+def claim_pseudonym() -> tuple:
+    """
+    Take a pseudonym out of the pool.
+
+    Returns:
+        (fake_name, identicon) tuple, generated inline if the pool is empty
+    """
+    with transaction.atomic():
+        pseudonym = (
+            Pseudonym.objects.select_for_update(skip_locked=True)
+            .order_by("id")
+            .only("fake_name", "identicon")
+            .first()
+        )
+        if pseudonym is not None:
+            Pseudonym.objects.filter(pk=pseudonym.pk).delete()
+            return pseudonym.fake_name, pseudonym.identicon
+
+    logger.warning("Pseudonym pool is empty, generating a pseudonym inline")
+    return generate_pseudonym()
+
+
+def refill_pseudonym_pool(
+    size: int = POOL_SIZE, batch_size: int = REFILL_BATCH_SIZE
+) -> int:
+    """
+    Top the pool up to ``size`` unclaimed pseudonyms.
+
+    Args:
+        size: Number of pseudonyms the pool should hold
+        batch_size: Number of pseudonyms generated and inserted at a time
+
+    Returns:
+        Number of pseudonyms added
+    """
+    added = 0
+    attempts = 0
+    missing = size - Pseudonym.objects.count()
+    while missing > 0 and attempts < MAX_REFILL_ATTEMPTS:
+        attempts += 1
+        names = {
+            AnonymousIdentity.generate_reddit_style_username()
+            for _ in range(min(batch_size, missing))
+        }
+        names -= set(
+            Pseudonym.objects.filter(fake_name__in=names).values_list(
+                "fake_name", flat=True
+            )
+        )
+        pseudonyms = []
+        for name in names:
+            try:
+                pseudonyms.append(
+                    Pseudonym(fake_name=name, identicon=generate_identicon(name))
+                )
+            except Exception as e:
+                logger.error(f"Failed to upload identicon of {name}: {e}")
+        # Names taken concurrently are skipped by the unique constraint
+        created = Pseudonym.objects.bulk_create(pseudonyms, ignore_conflicts=True)
+        added += len(created)
+        missing -= len(created)
+    return added
@@ -0,0 +1,276 @@
+"""
+Write-behind like / dislike counters for reactions.
+
+A reaction write only touches Redis: once its transaction commits, the
+change is added to a pending hash for the reacted object and the object is
+marked dirty. ``flush_reaction_counts`` runs periodically and moves the
+pending deltas into the ReactionCount table. Readers add the pending deltas
+to the flushed totals, fetching both for a whole page of objects with one
+query and one Redis pipeline, so neither writes nor counted reads depend on
+the number of reactions.
+
+When Redis is unavailable, writes apply their delta to the table directly
+and reads return the flushed totals only. The totals can be rebuilt from the
+Reaction table with ``python manage.py recompute_reaction_counts``.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from articles.models import Reaction, ReactionCount
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY_PREFIX = "reaction_counts:pending"
+DIRTY_KEY = "reaction_counts:dirty"
+
+COUNT_FIELDS = ("like_count", "dislike_count")
+
+
+def _pending_key(content_type_id: int, object_id: int) -> str:
+    return f"{PENDING_KEY_PREFIX}:{content_type_id}:{object_id}"
+
+
+def _parse_pending_key(key) -> tuple:
+    if isinstance(key, bytes):
+        key = key.decode()
+    content_type_id, object_id = key.rsplit(":", 2)[1:]
+    return int(content_type_id), int(object_id)
+
+
+def _empty_counts():
+    return dict.fromkeys(COUNT_FIELDS, 0)
+
+
+def _vote_deltas(old_vote, new_vote) -> dict:
+    return {
+        "like_count": int(new_vote == Reaction.LIKE) - int(old_vote == Reaction.LIKE),
+        "dislike_count": int(new_vote == Reaction.DISLIKE)
+        - int(old_vote == Reaction.DISLIKE),
+    }
+
+
+def record_reaction_change(content_type_id: int, object_id: int, old_vote, new_vote):
+    """
+    Count a reaction that was added, changed or removed once the current
+    transaction commits. Votes are Reaction.LIKE / Reaction.DISLIKE or None.
+    """
+    deltas = {
+        field: delta
+        for field, delta in _vote_deltas(old_vote, new_vote).items()
+        if delta
+    }
+    if not deltas:
+        return
+
+    def push():
+        key = _pending_key(content_type_id, object_id)
+        try:
+            pipeline = get_redis_connection("default").pipeline(transaction=True)
+            for field, delta in deltas.items():
+                pipeline.hincrby(key, field, delta)
+            pipeline.sadd(DIRTY_KEY, key)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Failed to queue reaction counts, writing through: {e}")
+            bump_reaction_counts({(content_type_id, object_id): deltas})
+
+    transaction.on_commit(push)
+
+
+def bump_reaction_counts(deltas_by_object: dict):
+    """
+    Atomically apply counter deltas to the ReactionCount rows.
+
+    Args:
+        deltas_by_object: Dict mapping (content_type_id, object_id) to a dict
+            of COUNT_FIELDS deltas
+    """
+    deltas_by_object = {
+        key: deltas
+        for key, deltas in deltas_by_object.items()
+        if any(deltas.get(field) for field in COUNT_FIELDS)
+    }
+    if not deltas_by_object:
+        return
+
+    now = timezone.now()
+    with transaction.atomic():
+        ReactionCount.objects.bulk_create(
+            [
+                ReactionCount(content_type_id=content_type_id, object_id=object_id)
+                for content_type_id, object_id in deltas_by_object
+            ],
+            ignore_conflicts=True,
+        )
+        for (content_type_id, object_id), deltas in deltas_by_object.items():
+            ReactionCount.objects.filter(
+                content_type_id=content_type_id, object_id=object_id
+            ).update(
+                updated_at=now,
+                **{
+                    field: F(field) + deltas.get(field, 0)
+                    for field in COUNT_FIELDS
+                    if deltas.get(field)
+                },
+            )
+
+
+def flush_reaction_counts(batch_size: int = 500) -> int:
+    """
+    Move the pending deltas from Redis into the ReactionCount table.
+
+    Each pending hash is read and deleted in one MULTI block, so increments
+    landing meanwhile stay pending for the next flush. Deltas that fail to
+    reach the database are put back.
+
+    Returns:
+        Number of objects whose counters were flushed
+    """
+    redis = get_redis_connection("default")
+    flushed = 0
+    while True:
+        keys = redis.spop(DIRTY_KEY, batch_size)
+        if not keys:
+            return flushed
+
+        pipeline = redis.pipeline(transaction=True)
+        for key in keys:
+            pipeline.hgetall(key)
+            pipeline.delete(key)
+        results = pipeline.execute()
+
+        deltas_by_object = {}
+        for key, pending in zip(keys, results[::2]):
+            deltas = {
+                field.decode() if isinstance(field, bytes) else field: int(value)
+                for field, value in pending.items()
+            }
+            if deltas:
+                deltas_by_object[_parse_pending_key(key)] = deltas
+
+        try:
+            bump_reaction_counts(deltas_by_object)
+        except Exception:
+            pipeline = redis.pipeline(transaction=True)
+            for (content_type_id, object_id), deltas in deltas_by_object.items():
+                key = _pending_key(content_type_id, object_id)
+                for field, delta in deltas.items():
+                    pipeline.hincrby(key, field, delta)
+                pipeline.sadd(DIRTY_KEY, key)
+            pipeline.execute()
+            raise
+
+        flushed += len(deltas_by_object)
+        if len(keys) < batch_size:
+            return flushed
+
+
+def get_reaction_counts(content_type_id: int, object_ids) -> dict:
+    """
+    Read the like and dislike counts of several objects of one type.
+
+    Returns:
+        Dict mapping object_id to a dict of COUNT_FIELDS. Objects without
+        reactions map to zeros.
+    """
+    object_ids = list(object_ids)
+    result = {object_id: _empty_counts() for object_id in object_ids}
+    if not object_ids:
+        return result
+
+    for row in ReactionCount.objects.filter(
+        content_type_id=content_type_id, object_id__in=object_ids
+    ).values("object_id", *COUNT_FIELDS):
+        result[row["object_id"]] = {field: row[field] for field in COUNT_FIELDS}
+
+    try:
+        pipeline = get_redis_connection("default").pipeline(transaction=False)
+        for object_id in object_ids:
+            pipeline.hmget(_pending_key(content_type_id, object_id), *COUNT_FIELDS)
+        pending = pipeline.execute()
+    except Exception as e:
+        logger.warning(f"Failed to read pending reaction counts: {e}")
+        return result
+
+    for object_id, values in zip(object_ids, pending):
+        for field, value in zip(COUNT_FIELDS, values):
+            if value is not None:
+                result[object_id][field] += int(value)
+    return result
+
+
+def compute_reaction_counts(content_type_id: int = None, object_ids=None) -> dict:
+    """
+    Recompute the counters from the Reaction table.
+
+    Returns:
+        Dict mapping (content_type_id, object_id) to a dict of COUNT_FIELDS
+    """
+    reactions = Reaction.objects.all()
+    if content_type_id is not None:
+        reactions = reactions.filter(content_type_id=content_type_id)
+    if object_ids is not None:
+        reactions = reactions.filter(object_id__in=list(object_ids))
+
+    counts = defaultdict(_empty_counts)
+    for row in (
+        reactions.values("content_type_id", "object_id")
+        .annotate(
+            like_count=Count("id", filter=Q(vote=Reaction.LIKE)),
+            dislike_count=Count("id", filter=Q(vote=Reaction.DISLIKE)),
+        )
+        .order_by()
+    ):
+        counts[(row["content_type_id"], row["object_id"])] = {
+            field: row[field] for field in COUNT_FIELDS
+        }
+    return dict(counts)
+
+
+def rebuild_reaction_counts(content_type_id: int = None, object_ids=None) -> int:
+    """
+    Replace the stored counters with values recomputed from the Reaction
+    table, discarding pending deltas of the same objects.
+
+    Returns:
+        Number of ReactionCount rows written
+    """
+    counts = compute_reaction_counts(content_type_id, object_ids)
+
+    stored = ReactionCount.objects.all()
+    if content_type_id is not None:
+        stored = stored.filter(content_type_id=content_type_id)
+    if object_ids is not None:
+        stored = stored.filter(object_id__in=list(object_ids))
+
+    with transaction.atomic():
+        stale_keys = [
+            _pending_key(row["content_type_id"], row["object_id"])
+            for row in stored.values("content_type_id", "object_id")
+        ] + [_pending_key(*key) for key in counts]
+        stored.delete()
+        ReactionCount.objects.bulk_create(
+            [
+                ReactionCount(
+                    content_type_id=content_type_id, object_id=object_id, **values
+                )
+                for (content_type_id, object_id), values in counts.items()
+                if any(values.values())
+            ]
+        )
+
+    if stale_keys:
+        try:
+            redis = get_redis_connection("default")
+            redis.delete(*stale_keys)
+            redis.srem(DIRTY_KEY, *stale_keys)
+        except Exception as e:
+            logger.warning(f"Failed to clear pending reaction counts: {e}")
+
+    return sum(1 for values in counts.values() if any(values.values()))
@@ -0,0 +1,238 @@
+"""
+Builds the precomputed RelatedArticle table.
+
+Each article is scored against the rest of the corpus on two signals:
+
+- hashtag co-occurrence: cosine over the sets of hashtags attached to the
+  articles (shared / sqrt(|A| * |B|))
+- text similarity: cosine between TF-IDF vectors of the title and abstract
+
+Vectors are kept as sparse ``{term: weight}`` dicts and candidates are found
+through inverted indexes, so only articles sharing at least one hashtag or
+term are ever compared. The top RELATED_ARTICLES_TOP_K of each article are
+written in batches by ``rebuild_related_articles``.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.db import transaction
+
+from articles.models import Article, RelatedArticle
+from myapp.content_types import content_type_id
+from users.models import HashtagRelation
+
+RELATED_ARTICLES_TOP_K = 20
+HASHTAG_WEIGHT = 0.6
+TEXT_WEIGHT = 0.4
+# Pairs scoring below this are noise rather than related articles
+MIN_RELATED_SCORE = 0.05
+# Terms found in more than this share of the corpus carry almost no signal
+# and would turn the candidate scan quadratic. Small corpora are left alone.
+MAX_DOCUMENT_FREQUENCY = 0.5
+MIN_CORPUS_SIZE_FOR_PRUNING = 100
+TITLE_WEIGHT = 2
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9]+")
+STOP_WORDS = frozenset(
+    """
+    about above after again also among an and any are as at based be been
+    between both but by can could did do does during each for from further
+    had has have here how however if in into is it its may more most new
+    not of on or other our over paper present propose proposed result
+    results show shows such than that the their them then there these they
+    this those through to under use used using was we were what when where
+    which while who will with within would
+    """.split()
+)
+
+
+def tokenize(text: str) -> list:
+    return [
+        token
+        for token in TOKEN_RE.findall((text or "").lower())
+        if len(token) > 2 and token not in STOP_WORDS
+    ]
+
+
+def _normalize(vector: dict) -> dict:
+    norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+    if not norm:
+        return {}
+    return {term: weight / norm for term, weight in vector.items()}
+
+
+def build_text_vectors(documents: dict) -> dict:
+    """
+    Build L2-normalized TF-IDF vectors.
+
+    Args:
+        documents: Dict mapping article_id to (title, abstract)
+
+    Returns:
+        Dict mapping article_id to a sparse {term: weight} vector
+    """
+    term_counts = {}
+    document_frequency = Counter()
+    for article_id, (title, abstract) in documents.items():
+        counts = Counter(tokenize(abstract))
+        for token in tokenize(title):
+            counts[token] += TITLE_WEIGHT
+        term_counts[article_id] = counts
+        document_frequency.update(counts.keys())
+
+    total = len(documents)
+    max_df = (
+        MAX_DOCUMENT_FREQUENCY * total
+        if total >= MIN_CORPUS_SIZE_FOR_PRUNING
+        else total
+    )
+    idf = {
+        term: math.log((1 + total) / (1 + df)) + 1
+        for term, df in document_frequency.items()
+        if df <= max_df
+    }
+
+    return {
+        article_id: _normalize(
+            {
+                term: (1 + math.log(count)) * idf[term]
+                for term, count in counts.items()
+                if term in idf
+            }
+        )
+        for article_id, counts in term_counts.items()
+    }
+
+
+def _inverted_index(vectors: dict) -> dict:
+    postings = defaultdict(list)
+    for article_id, vector in vectors.items():
+        for term, weight in vector.items():
+            postings[term].append((article_id, weight))
+    return postings
+
+
+def _load_hashtags() -> dict:
+    hashtags = defaultdict(set)
+    relations = HashtagRelation.objects.filter(
+        content_type_id=content_type_id(Article)
+    ).values_list("object_id", "hashtag_id")
+    for object_id, hashtag_id in relations.iterator(chunk_size=5000):
+        hashtags[object_id].add(hashtag_id)
+    return hashtags
+
+
+def score_related_articles(
+    article_id: int,
+    vectors: dict,
+    term_postings: dict,
+    hashtags: dict,
+    hashtag_postings: dict,
+    top_k: int = RELATED_ARTICLES_TOP_K,
+) -> list:
+    """
+    Score one article against its candidates.
+
+    Returns:
+        Up to top_k (score, related_article_id, shared_hashtags) tuples, best
+        first
+    """
+    text_scores = defaultdict(float)
+    for term, weight in vectors.get(article_id, {}).items():
+        for other_id, other_weight in term_postings.get(term, ()):
+            text_scores[other_id] += weight * other_weight
+
+    shared = Counter()
+    for hashtag_id in hashtags.get(article_id, ()):
+        for other_id in hashtag_postings[hashtag_id]:
+            shared[other_id] += 1
+
+    own_hashtags = len(hashtags.get(article_id, ()))
+    scored = []
+    for other_id in set(text_scores) | set(shared):
+        if other_id == article_id:
+            continue
+        hashtag_score = 0
+        if shared[other_id]:
+            hashtag_score = shared[other_id] / math.sqrt(
+                own_hashtags * len(hashtags[other_id])
+            )
+        score = HASHTAG_WEIGHT * hashtag_score + TEXT_WEIGHT * text_scores[other_id]
+        if score >= MIN_RELATED_SCORE:
+            scored.append((score, other_id, shared[other_id]))
+
+    return heapq.nlargest(top_k, scored)
+
+
+def rebuild_related_articles(
+    article_ids=None, batch_size: int = 500, top_k: int = RELATED_ARTICLES_TOP_K
+) -> int:
+    """
+    Recompute the related articles of the given articles (all by default)
+    against the whole corpus. Articles in hidden communities still get
+    related articles but are never suggested themselves.
+
+    Returns:
+        Number of RelatedArticle rows written
+    """
+    documents = {
+        article_id: (title, abstract)
+        for article_id, title, abstract in Article.objects.values_list(
+            "id", "title", "abstract"
+        ).iterator(chunk_size=2000)
+    }
+    hidden_ids = set(
+        Article.objects.filter(is_hidden=True).values_list("id", flat=True)
+    )
+
+    vectors = build_text_vectors(documents)
+    term_postings = _inverted_index(
+        {
+            article_id: vector
+            for article_id, vector in vectors.items()
+            if article_id not in hidden_ids
+        }
+    )
+
+    hashtags = _load_hashtags()
+    hashtag_postings = defaultdict(list)
+    for other_id, hashtag_ids in hashtags.items():
+        # Hashtag relations aren't validated against the article table
+        if other_id in hidden_ids or other_id not in documents:
+            continue
+        for hashtag_id in hashtag_ids:
+            hashtag_postings[hashtag_id].append(other_id)
+
+    if article_ids is None:
+        article_ids = sorted(documents)
+    article_ids = [article_id for article_id in article_ids if article_id in documents]
+
+    rows_written = 0
+    for start in range(0, len(article_ids), batch_size):
+        batch = article_ids[start : start + batch_size]
+        rows = [
+            RelatedArticle(
+                article_id=article_id,
+                related_article_id=related_id,
+                score=score,
+                shared_hashtags=shared_hashtags,
+            )
+            for article_id in batch
+            for score, related_id, shared_hashtags in score_related_articles(
+                article_id,
+                vectors,
+                term_postings,
+                hashtags,
+                hashtag_postings,
+                top_k,
+            )
+        ]
+        with transaction.atomic():
+            RelatedArticle.objects.filter(article_id__in=batch).delete()
+            RelatedArticle.objects.bulk_create(rows)
+        rows_written += len(rows)
+
+    return rows_written
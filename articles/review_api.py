@@ -2,7 +2,9 @@ import logging
 from typing import List, Optional
 
 from django.core.paginator import Paginator
-from django.db.models import Avg, Count, Prefetch, Q
+from django.db import transaction
+from django.db.models import Prefetch, Q
+from django.http import HttpResponse
 from django.utils import timezone
 from ninja import Router
 from ninja.responses import codes_4xx, codes_5xx
@@ -17,8 +19,9 @@ from articles.models import (
     ReviewVersion,
     UserFlag,
 )
+from articles.reaction_counts import get_reaction_counts
+from articles.review_history import RECENT_REVIEW_VERSIONS
 from articles.schemas import (
-    CommunityArticleOut,
     CreateReviewSchema,
     Message,
     PaginatedReviewSchema,
@@ -28,10 +31,17 @@ from articles.schemas import (
     ReviewCommentUpdateSchema,
     ReviewOut,
     ReviewUpdateSchema,
-    ReviewVersionSchema,
+)
+from articles.stats import (
+    record_review_comment_created,
+    record_review_created,
+    record_review_rating_changed,
 )
 from communities.models import Community, CommunityArticle
+from myapp.conditional import conditional_response
+from myapp.content_types import content_type_id
 from myapp.feature_flags import MAX_NESTING_LEVEL
+from myapp.loaders import SchemaLoaders
 from myapp.schemas import UserStats
 from myapp.services.send_emails import (
     send_comment_notification_email,
@@ -39,6 +49,7 @@ from myapp.services.send_emails import (
 )
 from myapp.upload_api import process_content_images_async
 from users.auth import JWTAuth, OptionalJWTAuth
+from users.common_api import get_content_type_for_model
 from users.models import User
 
 router = Router(tags=["Reviews"])
@@ -169,17 +180,19 @@ def create_review(
             review_type = Review.PUBLIC
 
         try:
-            review = Review.objects.create(
-                article=article,
-                user=user,
-                community=community,
-                community_article=community_article,
-                review_type=review_type,
-                rating=review_data.rating,
-                subject=review_data.subject,
-                content=review_data.content,
-                is_pseudonymous=is_pseudonymous,
-            )
+            with transaction.atomic():
+                review = Review.objects.create(
+                    article=article,
+                    user=user,
+                    community=community,
+                    community_article=community_article,
+                    review_type=review_type,
+                    rating=review_data.rating,
+                    subject=review_data.subject,
+                    content=review_data.content,
+                    is_pseudonymous=is_pseudonymous,
+                )
+                record_review_created(review)
         except Exception as e:
             logger.error(f"Error creating review: {e}")
             return 500, {"message": "Error creating review. Please try again."}
@@ -207,7 +220,9 @@ def create_review(
             logger.error(f"Failed to queue image reference processing: {e}")
 
         try:
-            return 201, ReviewOut.from_orm(review, user)
+            return 201, ReviewOut.from_orm(
+                review, user, loaders=SchemaLoaders.for_request(request)
+            )
         except Exception as e:
             logger.error(f"Error formatting review data: {e}")
             return 500, {"message": "Review created but error retrieving review data."}
@@ -216,13 +231,69 @@ def create_review(
         return 500, {"message": "An unexpected error occurred. Please try again later."}
 
 
+def article_reviews(article: Article):
+    """Reviews of an article, newest first, ready for serialize_reviews."""
+    return (
+        Review.objects.filter(article=article)
+        .select_related("user", "community", "community_article", "article")
+        .prefetch_related(
+            Prefetch(
+                "versions",
+                queryset=ReviewVersion.objects.order_by("-version")[
+                    :RECENT_REVIEW_VERSIONS
+                ],
+                to_attr="prefetched_versions",
+            )
+        )
+        .order_by("-created_at")
+    )
+
+
+def serialize_reviews(
+    article: Article,
+    reviews_list: List[Review],
+    current_user: Optional[User],
+    loaders: Optional[SchemaLoaders] = None,
+) -> List[ReviewOut]:
+    """
+    Build ReviewOut items for a page of reviews of an article, batching the
+    per-row lookups and fetching the viewer's flags in bulk.
+    """
+    loaders = loaders or SchemaLoaders()
+    ReviewOut.queue_lookups(reviews_list, loaders)
+
+    # Prefetch all flags for reviews in one query (avoids N+1)
+    flags_by_review_id = {}
+    if current_user:
+        flags_by_review_id = UserFlag.objects.get_flags_for_entities(
+            user_id=current_user.id,
+            entity_type="review",
+            entity_ids=[review.id for review in reviews_list],
+        )
+
+    return [
+        ReviewOut.from_orm(
+            review,
+            current_user,
+            flags=flags_by_review_id.get(review.id, []),
+            loaders=loaders,
+        )
+        for review in reviews_list
+    ]
+
+
 @router.get(
     "/{article_id}/reviews/",
     response={200: PaginatedReviewSchema, codes_4xx: Message, codes_5xx: Message},
     auth=OptionalJWTAuth,
 )
 def list_reviews(
-    request, article_id: int, community_id: int = None, page: int = 1, size: int = 10
+    request,
+    response: HttpResponse,
+    article_id: int,
+    community_id: int = None,
+    page: int = 1,
+    size: int = 10,
 ):
     try:
         try:
@@ -235,18 +306,7 @@ def list_reviews(
 
         try:
             # reviews = Review.objects.filter(article=article).order_by("-created_at")
-            reviews = (
-                Review.objects.filter(article=article)
-                .select_related("user", "community", "community_article", "article")
-                .prefetch_related(
-                    Prefetch(
-                        "versions",
-                        queryset=ReviewVersion.objects.order_by("-version"),
-                        to_attr="prefetched_versions",
-                    )
-                )
-                .order_by("-created_at")
-            )
+            reviews = article_reviews(article)
         except Exception as e:
             logger.error(f"Error retrieving reviews: {e}")
             return 500, {"message": "Error retrieving reviews. Please try again."}
@@ -268,6 +328,15 @@ def list_reviews(
         else:
             reviews = reviews.filter(community=None)
 
+        not_modified = conditional_response(
+            request,
+            response,
+            f"article:{article.id}",
+            f"community:{community_id}" if community_id else "",
+        )
+        if not_modified:
+            return not_modified
+
         try:
             paginator = Paginator(reviews, size)
             page_obj = paginator.page(page)
@@ -279,119 +348,12 @@ def list_reviews(
         current_user: Optional[User] = None if not request.auth else request.auth
 
         try:
-            # items = [
-            #     ReviewOut.from_orm(review, current_user)
-            #     for review in page_obj.object_list
-            # ]
-            reviews_list = list(page_obj.object_list)
-
-            # Bulk fetch related data to avoid N+1 queries
-            review_ids = [r.id for r in reviews_list]
-            review_user_ids = {r.user_id for r in reviews_list}
-            review_community_ids = {
-                r.community_id for r in reviews_list if r.community_id
-            }
-
-            comments_count_map = dict(
-                ReviewComment.objects.filter(review_id__in=review_ids, is_deleted=False)
-                .values("review_id")
-                .annotate(count=Count("id"))
-                .values_list("review_id", "count")
-            )
-
-            comments_ratings_map = dict(
-                ReviewCommentRating.objects.filter(
-                    review_id__in=review_ids,
-                    community_id__in=(
-                        review_community_ids if review_community_ids else [None]
-                    ),
-                )
-                .exclude(user_id__in=review_user_ids)
-                .values("review_id")
-                .annotate(avg_rating=Avg("rating"))
-                .values_list("review_id", "avg_rating")
+            items = serialize_reviews(
+                article,
+                list(page_obj.object_list),
+                current_user,
+                SchemaLoaders.for_request(request),
             )
-
-            # Fetch and map anonymous identities in bulk
-            pseudonyms = {
-                (anon.article_id, anon.user_id, anon.community_id): anon
-                for anon in AnonymousIdentity.objects.filter(
-                    article_id=article.id, user_id__in=review_user_ids
-                )
-            }
-
-            # Bulk fetch CommunityArticles if needed
-            ca_map = {
-                (ca.article_id, ca.community_id): ca
-                for ca in CommunityArticle.objects.filter(
-                    article_id=article.id, community_id__in=review_community_ids
-                )
-            }
-
-            # Prefetch all flags for reviews in one query (avoids N+1)
-            flags_by_review_id = {}
-            if current_user:
-                flags_by_review_id = UserFlag.objects.get_flags_for_entities(
-                    user_id=current_user.id,
-                    entity_type="review",
-                    entity_ids=review_ids,
-                )
-
-            # Build the response
-            items = []
-            for review in reviews_list:
-                user = UserStats.from_model(
-                    review.user, basic_details_with_reputation=True
-                )
-
-                if review.is_pseudonymous:
-                    pseudonym = pseudonyms.get(
-                        (article.id, review.user_id, review.community_id)
-                    )
-                    if pseudonym:
-                        user.username = pseudonym.fake_name
-                        user.profile_pic_url = pseudonym.identicon
-
-                community_article = None
-                ca = ca_map.get((article.id, review.community_id))
-                if ca:
-                    community_article = CommunityArticleOut.from_orm(ca, current_user)
-
-                versions = [
-                    ReviewVersionSchema.from_orm(version)
-                    for version in getattr(review, "prefetched_versions", [])[:3]
-                ]
-
-                comments_rating = round(comments_ratings_map.get(review.id, 0) or 0, 1)
-
-                # Get flags for this review (empty list if none)
-                flags = flags_by_review_id.get(review.id, [])
-
-                items.append(
-                    ReviewOut(
-                        id=review.id,
-                        user=user,
-                        article_id=review.article.id,
-                        rating=review.rating,
-                        review_type=review.review_type,
-                        subject=review.subject,
-                        content=review.content,
-                        version=review.version,
-                        created_at=review.created_at,
-                        updated_at=review.updated_at,
-                        deleted_at=review.deleted_at,
-                        comments_count=comments_count_map.get(review.id, 0),
-                        is_author=review.user_id
-                        == (current_user.id if current_user else None),
-                        is_approved=review.is_approved,
-                        versions=versions,
-                        is_pseudonymous=review.is_pseudonymous,
-                        community_article=community_article,
-                        comments_ratings=comments_rating,
-                        flags=flags,
-                    )
-                )
-
             return 200, PaginatedReviewSchema(
                 items=items, total=paginator.count, page=page, size=size
             )
@@ -434,7 +396,12 @@ def get_review(request, review_id: int):
                 )
                 flags = flags_dict.get(review.id, [])
 
-            return 200, ReviewOut.from_orm(review, user, flags=flags)
+            return 200, ReviewOut.from_orm(
+                review,
+                user,
+                flags=flags,
+                loaders=SchemaLoaders.for_request(request),
+            )
         except Exception as e:
             logger.error(f"Error formatting review data: {e}")
             return 500, {"message": "Error formatting review data. Please try again."}
@@ -468,18 +435,26 @@ def update_review(request, review_id: int, review_data: ReviewUpdateSchema):
             return 403, {"message": "You are not a member of this community."}
 
         try:
-            # Update the review with new data if provided
-            review.rating = review_data.rating or review.rating
-            review.subject = review_data.subject or review.subject
-            review.content = review_data.content or review.content
+            with transaction.atomic():
+                # Lock the review so the version delta is encoded against the
+                # live text, not one a concurrent edit is replacing
+                review = Review.objects.select_for_update().get(id=review.id)
+                # Update the review with new data if provided
+                old_rating = review.rating
+                review.rating = review_data.rating or review.rating
+                review.subject = review_data.subject or review.subject
+                review.content = review_data.content or review.content
 
-            review.save()
+                review.save()
+                record_review_rating_changed(review, old_rating)
         except Exception as e:
             logger.error(f"Error updating review: {e}")
             return 500, {"message": "Error updating review. Please try again."}
 
         try:
-            return 201, ReviewOut.from_orm(review, user)
+            return 201, ReviewOut.from_orm(
+                review, user, loaders=SchemaLoaders.for_request(request)
+            )
         except Exception as e:
             logger.error(f"Error formatting review data: {e}")
             return 500, {"message": "Review updated but error retrieving review data."}
@@ -512,10 +487,13 @@ def delete_review(request, review_id: int):
             return 403, {"message": "You are not a member of this community."}
 
         try:
-            review.subject = "[deleted]"
-            review.content = "[deleted]"
-            review.deleted_at = timezone.now()
-            review.save()
+            with transaction.atomic():
+                # Lock the review before its text becomes a new version
+                review = Review.objects.select_for_update().get(id=review.id)
+                review.subject = "[deleted]"
+                review.content = "[deleted]"
+                review.deleted_at = timezone.now()
+                review.save()
         except Exception as e:
             logger.error(f"Error deleting review: {e}")
             return 500, {"message": "Error deleting review. Please try again."}
@@ -609,15 +587,17 @@ def create_comment(request, review_id: int, payload: ReviewCommentCreateSchema):
             }
 
         try:
-            comment = ReviewComment.objects.create(
-                review=review,
-                community=review.community,
-                author=user,
-                rating=payload.rating,
-                content=payload.content,
-                parent=parent_comment,
-                is_pseudonymous=is_pseudonymous,
-            )
+            with transaction.atomic():
+                comment = ReviewComment.objects.create(
+                    review=review,
+                    community=review.community,
+                    author=user,
+                    rating=payload.rating,
+                    content=payload.content,
+                    parent=parent_comment,
+                    is_pseudonymous=is_pseudonymous,
+                )
+                record_review_comment_created(comment)
         except Exception as e:
             logger.error(f"Error creating comment: {e}")
             return 500, {"message": "Error creating comment. Please try again."}
@@ -738,9 +718,7 @@ def list_review_comments(request, review_id: int):
                 ReviewComment.objects.filter(review=review, parent=None)
                 .filter(Q(is_deleted=False) | Q(review_replies__isnull=False))
                 .select_related("author")
-                .prefetch_related(
-                    "review_replies__author", "reactions", "review_replies__reactions"
-                )
+                .prefetch_related("review_replies__author")
                 .order_by("-created_at")
             )
 
@@ -750,16 +728,12 @@ def list_review_comments(request, review_id: int):
             ]
             all_comment_ids = [c.id for c in all_comments]
 
-            upvote_map = dict(
-                Reaction.objects.filter(
-                    content_type__model="reviewcomment",
-                    object_id__in=all_comment_ids,
-                    vote=1,
-                )
-                .values("object_id")
-                .annotate(count=Count("id"))
-                .values_list("object_id", "count")
-            )
+            upvote_map = {
+                comment_id: counts["like_count"]
+                for comment_id, counts in get_reaction_counts(
+                    content_type_id(ReviewComment), all_comment_ids
+                ).items()
+            }
 
             # Bulk fetch pseudonyms if needed
             pseudonym_map = {}
@@ -916,7 +890,7 @@ def delete_comment(request, comment_id: int):
         try:
             # Delete reactions associated with the comment
             Reaction.objects.filter(
-                content_type__model="reviewcomment", object_id=comment.id
+                content_type_id=content_type_id(ReviewComment), object_id=comment.id
             ).delete()
 
             comment_rating = ReviewCommentRating.objects.filter(
@@ -0,0 +1,129 @@
+"""
+Delta-compressed storage for review version history.
+
+The live text of a review stays on the Review row. Each ReviewVersion keeps
+the subject and rating in full, and its content either as a full snapshot
+(in ``content``) or as a reverse delta against the next newer version
+(in ``content_delta``): the newest version diffs against the live text, the
+one before it against that version, and so on. Older rows never have to be
+rewritten when a review is edited again.
+
+Every REVIEW_SNAPSHOT_INTERVAL versions a full snapshot is stored, so
+rebuilding any version applies at most that many deltas, and the few most
+recent versions shown by ReviewOut only need the live text and their own
+rows. Rows without a delta, including all rows written before deltas
+existed, are snapshots.
+
+A delta is a zlib-compressed JSON list of operations on lines: ``[i, j]``
+copies lines i to j of the base text, a string inserts new text.
+"""
+
+import difflib
+import json
+import zlib
+
+REVIEW_SNAPSHOT_INTERVAL = 8
+# Versions listed with each review by ReviewOut
+RECENT_REVIEW_VERSIONS = 3
+
+
+def is_snapshot_version(version: int) -> bool:
+    return (version - 1) % REVIEW_SNAPSHOT_INTERVAL == 0
+
+
+def encode_delta(base: str, target: str) -> bytes:
+    """Encode how to rebuild target from base."""
+    base_lines = base.splitlines(keepends=True)
+    target_lines = target.splitlines(keepends=True)
+    operations = []
+    matcher = difflib.SequenceMatcher(None, base_lines, target_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            operations.append([i1, i2])
+        elif j1 < j2:
+            operations.append("".join(target_lines[j1:j2]))
+    return zlib.compress(json.dumps(operations, separators=(",", ":")).encode())
+
+
+def apply_delta(base: str, delta: bytes) -> str:
+    """Rebuild the text encoded by ``encode_delta`` from its base."""
+    base_lines = base.splitlines(keepends=True)
+    parts = []
+    for operation in json.loads(zlib.decompress(bytes(delta))):
+        if isinstance(operation, str):
+            parts.append(operation)
+        else:
+            parts.extend(base_lines[operation[0] : operation[1]])
+    return "".join(parts)
+
+
+def resolve_version_contents(review, versions) -> list:
+    """
+    Fill in the content of consecutive versions of a review, newest first,
+    as loaded from the database.
+
+    Args:
+        review: The review, carrying the live text
+        versions: Consecutive ReviewVersion rows ordered by descending
+            version, the first of which is either a snapshot or the newest
+
+    Returns:
+        The same rows, with ``content`` holding the full text
+    """
+    newer_content = review.content
+    for version in versions:
+        if version.content_delta is not None:
+            version.content = apply_delta(newer_content, version.content_delta)
+            version.content_delta = None
+        newer_content = version.content
+    return versions
+
+
+def get_review_version(review, number: int):
+    """
+    Rebuild a single version of a review.
+
+    Loads the rows from the requested version up to the nearest newer
+    snapshot, or up to the newest version when there is none.
+
+    Returns:
+        The ReviewVersion with its full content, or None if it doesn't exist
+    """
+    rows = []
+    newer_versions = review.versions.filter(version__gte=number).order_by("version")
+    for version in newer_versions.iterator(chunk_size=REVIEW_SNAPSHOT_INTERVAL):
+        rows.append(version)
+        if version.content_delta is None:
+            break
+    if not rows or rows[0].version != number:
+        return None
+
+    resolve_version_contents(review, rows[::-1])
+    return rows[0]
+
+
+def compact_review_versions(review, versions) -> list:
+    """
+    Turn full-text rows that are not due a snapshot into deltas, for history
+    written before deltas existed.
+
+    Args:
+        review: The review, carrying the live text
+        versions: All ReviewVersion rows of the review, newest first
+
+    Returns:
+        The rows that changed, to be saved by the caller
+    """
+    changed = []
+    newer_content = review.content
+    for version in versions:
+        if version.content_delta is not None:
+            content = apply_delta(newer_content, version.content_delta)
+        else:
+            content = version.content
+            if not is_snapshot_version(version.version):
+                version.content = ""
+                version.content_delta = encode_delta(newer_content, content)
+                changed.append(version)
+        newer_content = content
+    return changed
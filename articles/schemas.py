@@ -2,13 +2,13 @@ from datetime import date, datetime
 from enum import Enum
 from typing import List, Literal, Optional
 
-from django.contrib.contenttypes.models import ContentType
-from django.db.models import Avg, Sum
+from django.db.models import Sum
 from ninja import Field, ModelSchema, Schema
 
 from articles.models import (
     AnonymousIdentity,
     Article,
+    ArticleMeta,
     ArticlePDF,
     Discussion,
     DiscussionComment,
@@ -16,12 +16,17 @@ from articles.models import (
     DiscussionSummary,
     Review,
     ReviewComment,
-    ReviewCommentRating,
     ReviewVersion,
 )
+from articles.reaction_counts import get_reaction_counts
+from articles.review_history import resolve_version_contents
 from communities.models import Community, CommunityArticle
+from communities.roles import is_community_admin
+from myapp.content_types import content_type_id
+from myapp.loaders import SchemaLoaders
 from myapp.schemas import DateCount, FilterType, FlagType, UserStats
 from users.models import HashtagRelation, User
+from users.schemas import ReactionCountOut
 
 """
 Article Related Schemas for serialization and deserialization
@@ -132,11 +137,8 @@ class CommunityArticleOut(ModelSchema):
             else None
         )
 
-        is_admin = (
-            community_article.community.is_admin(current_user)
-            if current_user and not isinstance(current_user, bool)
-            else False
-        )
+        # Memoized per request, lists of one community cost a single query
+        is_admin = is_community_admin(current_user, community_article.community_id)
 
         return cls(
             id=community_article.id,
@@ -284,14 +286,28 @@ class ArticleBasicOut(ModelSchema):
             "article_image_url",
         ]
 
+    @staticmethod
+    def queue_lookups(articles, loaders: SchemaLoaders):
+        """Queue the lookups of a page of articles, to run in one batch."""
+        articles = list(articles)
+        loaders.article_stats.queue(article.id for article in articles)
+        loaders.reputations.queue(article.submitter_id for article in articles)
+
     @classmethod
     def from_orm_with_custom_fields(
-        cls, article: Article, current_user: Optional[User]
+        cls,
+        article: Article,
+        current_user: Optional[User],
+        stats: dict = None,
+        loaders: Optional[SchemaLoaders] = None,
     ):
-        total_reviews = Review.objects.filter(article=article).count()
-        total_discussions = Discussion.objects.filter(article=article).count()
+        loaders = loaders or SchemaLoaders()
+        if stats is None:
+            stats = loaders.article_stats.load(article.id)
+        total_reviews = stats["review_count"]
+        total_discussions = stats["discussion_count"]
         user = UserStats.from_model(
-            article.submitter, basic_details_with_reputation=True
+            article.submitter, basic_details_with_reputation=True, loaders=loaders
         )
 
         return cls(
@@ -308,7 +324,7 @@ class ArticleBasicOut(ModelSchema):
 
 class ArticleMetaOut(ModelSchema):
     class Config:
-        model = Article
+        model = ArticleMeta
         model_fields = [
             "title",
             "abstract",
@@ -426,19 +442,51 @@ class ReviewOut(ModelSchema):
             "deleted_at",
         ]
 
+    @staticmethod
+    def queue_lookups(reviews, loaders: SchemaLoaders):
+        """
+        Queue the lookups of a page of reviews, to run in one batch.
+
+        Versions prefetched into ``prefetched_versions`` are used as is.
+        """
+        reviews = list(reviews)
+        review_ids = [review.id for review in reviews]
+        loaders.review_comment_counts.queue(review_ids)
+        loaders.review_comment_ratings.queue(review_ids)
+        loaders.reputations.queue(review.user_id for review in reviews)
+        loaders.pseudonyms.queue(
+            (review.article_id, review.user_id, review.community_id)
+            for review in reviews
+            if review.is_pseudonymous
+        )
+        loaders.community_articles.queue(
+            (review.article_id, review.community_id)
+            for review in reviews
+            if review.community_id
+        )
+        for review in reviews:
+            if hasattr(review, "prefetched_versions"):
+                loaders.recent_review_versions.prime(
+                    review.id, review.prefetched_versions
+                )
+            else:
+                loaders.recent_review_versions.queue([review.id])
+
     @classmethod
     def from_orm(
         cls,
         review: Review,
         current_user: Optional[User],
         flags: Optional[List[str]] = None,
+        loaders: Optional[SchemaLoaders] = None,
     ):
-        comments_count = ReviewComment.objects.filter(
-            review=review, is_deleted=False
-        ).count()
+        loaders = loaders or SchemaLoaders()
+        comments_count = loaders.review_comment_counts.load(review.id)
         versions = [
             ReviewVersionSchema.from_orm(version)
-            for version in review.versions.all().order_by("-version")[:3]
+            for version in resolve_version_contents(
+                review, loaders.recent_review_versions.load(review.id)
+            )
         ]
         is_pseudonymous = review.is_pseudonymous
         # if is_pseudonymous:
@@ -450,35 +498,28 @@ class ReviewOut(ModelSchema):
         # else:
         #     anonymous_name = None
         #     avatar = None
-        user = UserStats.from_model(review.user, basic_details_with_reputation=True)
+        user = UserStats.from_model(
+            review.user, basic_details_with_reputation=True, loaders=loaders
+        )
         if is_pseudonymous:
-            pseudonym = AnonymousIdentity.objects.get(
-                article=review.article, user=review.user, community=review.community
+            pseudonym = loaders.pseudonyms.load(
+                (review.article_id, review.user_id, review.community_id)
             )
-            user.username = pseudonym.fake_name
-            user.profile_pic_url = pseudonym.identicon
+            if pseudonym:
+                user.username = pseudonym.fake_name
+                user.profile_pic_url = pseudonym.identicon
 
         community_article = None
-
-        if CommunityArticle.objects.filter(
-            article=review.article, community=review.community
-        ).exists():
-            community_article = CommunityArticle.objects.get(
-                article=review.article, community=review.community
+        if review.community_id:
+            community_article = loaders.community_articles.load(
+                (review.article_id, review.community_id)
             )
+        if community_article:
             community_article = CommunityArticleOut.from_orm(
                 community_article, current_user
             )
 
-        comments_ratings = round(
-            ReviewCommentRating.objects.filter(
-                review=review, community=review.community
-            )
-            .exclude(user=review.user)
-            .aggregate(rating=Avg("rating"))["rating"]
-            or 0,
-            1,
-        )
+        comments_ratings = round(loaders.review_comment_ratings.load(review.id) or 0, 1)
 
         # Determine flags:
         # - If flags is explicitly provided, use it
@@ -488,7 +529,7 @@ class ReviewOut(ModelSchema):
         return cls(
             id=review.id,
             user=user,
-            article_id=review.article.id,
+            article_id=review.article_id,
             rating=review.rating,
             review_type=review.review_type,
             subject=review.subject,
@@ -498,7 +539,7 @@ class ReviewOut(ModelSchema):
             updated_at=review.updated_at,
             deleted_at=review.deleted_at,
             comments_count=comments_count,
-            is_author=review.user == current_user,
+            is_author=review.user_id == getattr(current_user, "id", None),
             is_approved=review.is_approved,
             versions=versions,
             # anonymous_name=anonymous_name,
@@ -576,7 +617,9 @@ class ReviewCommentOut(ModelSchema):
             author=author,
             content=comment.content,
             created_at=comment.created_at,
-            upvotes=comment.reactions.filter(vote=1).count(),
+            upvotes=get_reaction_counts(content_type_id(ReviewComment), [comment.id])[
+                comment.id
+            ]["like_count"],
             replies=replies,
             # anonymous_name=anonymous_name,
             # avatar=avatar if avatar else None,
@@ -634,12 +677,35 @@ class DiscussionOut(ModelSchema):
             "is_resolved",
         ]
 
+    @staticmethod
+    def queue_lookups(discussions, loaders: SchemaLoaders):
+        """
+        Queue the lookups of a page of discussions, to run in one batch.
+
+        A ``comments_count`` annotation on the rows is used as is.
+        """
+        discussions = list(discussions)
+        loaders.reputations.queue(discussion.author_id for discussion in discussions)
+        loaders.pseudonyms.queue(
+            (discussion.article_id, discussion.author_id, discussion.community_id)
+            for discussion in discussions
+            if discussion.is_pseudonymous
+        )
+        for discussion in discussions:
+            if hasattr(discussion, "comments_count"):
+                loaders.discussion_comment_counts.prime(
+                    discussion.id, discussion.comments_count
+                )
+            else:
+                loaders.discussion_comment_counts.queue([discussion.id])
+
     @classmethod
     def from_orm(
         cls,
         discussion: Discussion,
         current_user: Optional[User],
         flags: Optional[List[str]] = None,
+        loaders: Optional[SchemaLoaders] = None,
     ):
         """
         Create DiscussionOut from a Discussion instance.
@@ -649,8 +715,11 @@ class DiscussionOut(ModelSchema):
             current_user: The current authenticated user (or None)
             flags: Pre-fetched list of flag names set for this entity.
                    Empty list means no flags set. None for unauthenticated users.
+            loaders: Request-scoped loaders, with the lookups of the page
+                     queued when rendering a list
         """
-        comments_count = DiscussionComment.objects.filter(discussion=discussion).count()
+        loaders = loaders or SchemaLoaders()
+        comments_count = loaders.discussion_comment_counts.load(discussion.id)
         is_pseudonymous = discussion.is_pseudonymous
         # if is_pseudonymous:
         #     pseudonym = AnonymousIdentity.objects.get(
@@ -662,16 +731,15 @@ class DiscussionOut(ModelSchema):
         #     anonymous_name = None
         #     avatar = None
         user = UserStats.from_model(
-            discussion.author, basic_details_with_reputation=True
+            discussion.author, basic_details_with_reputation=True, loaders=loaders
         )
         if is_pseudonymous:
-            pseudonym = AnonymousIdentity.objects.get(
-                article=discussion.article,
-                user=discussion.author,
-                community=discussion.community,
+            pseudonym = loaders.pseudonyms.load(
+                (discussion.article_id, discussion.author_id, discussion.community_id)
             )
-            user.username = pseudonym.fake_name
-            user.profile_pic_url = pseudonym.identicon
+            if pseudonym:
+                user.username = pseudonym.fake_name
+                user.profile_pic_url = pseudonym.identicon
 
         # Determine flags:
         # - If flags is explicitly provided, use it
@@ -682,7 +750,7 @@ class DiscussionOut(ModelSchema):
             id=discussion.id,
             user=user,
             topic=discussion.topic,
-            article_id=discussion.article.id,
+            article_id=discussion.article_id,
             content=discussion.content,
             created_at=discussion.created_at,
             updated_at=discussion.updated_at,
@@ -787,7 +855,9 @@ class DiscussionCommentOut(ModelSchema):
             author=author,
             content=comment.content,
             created_at=comment.created_at,
-            upvotes=comment.reactions.filter(vote=1).count(),
+            upvotes=get_reaction_counts(
+                content_type_id(DiscussionComment), [comment.id]
+            )[comment.id]["like_count"],
             replies=replies,
             # anonymous_name=anonymous_name,
             is_author=(comment.author == current_user) if current_user else False,
@@ -953,3 +1023,32 @@ class DiscussionSummaryCreateSchema(Schema):
 
 class DiscussionSummaryUpdateSchema(Schema):
     content: str
+
+
+"""
+Article Page Bundle Schemas
+"""
+
+
+class ArticleBundleSection(str, Enum):
+    ARTICLE = "article"
+    REVIEWS = "reviews"
+    DISCUSSIONS = "discussions"
+    STATS = "stats"
+    REACTIONS = "reactions"
+
+
+class ArticleBundleStats(Schema):
+    reviews_count: int
+    average_rating: float
+    discussions_count: int
+    comments_count: int
+    likes: int
+
+
+class ArticleBundleOut(Schema):
+    article: Optional[ArticleOut] = None
+    reviews: Optional[PaginatedReviewSchema] = None
+    discussions: Optional[PaginatedDiscussionSchema] = None
+    stats: Optional[ArticleBundleStats] = None
+    reactions: Optional[ReactionCountOut] = None
@@ -0,0 +1,102 @@
+"""
+Maintains the ArticleMeta records served by get_article_meta.
+
+Crawlers and link-preview bots only ever get public metadata, so a record
+exists only for articles the endpoint may expose: Public submissions whose
+first community link, if any, is in a public community and published or
+accepted. Records are refreshed once article and community article writes
+commit (see the receivers in articles/models.py and communities/models.py)
+and when a community changes type.
+
+The endpoint answers with a single lookup by slug and long shared-cache
+headers, so a CDN or the reverse proxy absorbs repeated bot traffic.
+"""
+
+from django.db import transaction
+
+from articles.models import Article, ArticleMeta
+from communities.models import Community, CommunityArticle
+from myapp.constants import FIFTEEN_MINUTES
+
+# Browsers revalidate after 15 minutes, shared caches keep a day and may
+# serve a stale copy for another week while they revalidate
+ARTICLE_META_SHARED_MAX_AGE = 24 * 60 * 60
+ARTICLE_META_STALE_WHILE_REVALIDATE = 7 * 24 * 60 * 60
+ARTICLE_META_CACHE_CONTROL = (
+    f"public, max-age={FIFTEEN_MINUTES}, s-maxage={ARTICLE_META_SHARED_MAX_AGE}, "
+    f"stale-while-revalidate={ARTICLE_META_STALE_WHILE_REVALIDATE}"
+)
+ARTICLE_META_SURROGATE_KEY = "article-meta"
+
+META_FIELDS = ["slug", "title", "abstract", "article_image_url", "updated_at"]
+
+
+def article_meta_surrogate_keys(article_id: int) -> str:
+    """Surrogate-Key header value, purgeable per article or all at once."""
+    return f"{ARTICLE_META_SURROGATE_KEY} {ARTICLE_META_SURROGATE_KEY}-{article_id}"
+
+
+def refresh_article_meta(article_ids=None, batch_size: int = 1000) -> int:
+    """
+    Create, update or drop the ArticleMeta records of the given articles
+    (all by default).
+
+    Returns:
+        Number of records written
+    """
+    if article_ids is None:
+        article_ids = Article.objects.order_by("id").values_list("id", flat=True)
+    article_ids = sorted(set(article_ids))
+
+    written = 0
+    for start in range(0, len(article_ids), batch_size):
+        batch = article_ids[start : start + batch_size]
+        # get_article_meta used to check the first link only
+        first_links = {
+            link["article_id"]: link
+            for link in CommunityArticle.objects.filter(article_id__in=batch)
+            .order_by("article_id", "id")
+            .distinct("article_id")
+            .values("article_id", "status", "community__type")
+        }
+
+        rows = []
+        for article in Article.objects.filter(
+            id__in=batch, submission_type="Public"
+        ).only("id", "slug", "title", "abstract", "article_image_url"):
+            link = first_links.get(article.id)
+            if link and (
+                link["community__type"] in (Community.HIDDEN, Community.PRIVATE)
+                or link["status"]
+                not in (CommunityArticle.PUBLISHED, CommunityArticle.ACCEPTED)
+            ):
+                continue
+            rows.append(
+                ArticleMeta(
+                    article_id=article.id,
+                    slug=article.slug,
+                    title=article.title,
+                    abstract=article.abstract,
+                    article_image_url=article.article_image_url.name or None,
+                )
+            )
+
+        with transaction.atomic():
+            ArticleMeta.objects.filter(article_id__in=batch).exclude(
+                article_id__in=[row.article_id for row in rows]
+            ).delete()
+            ArticleMeta.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["article"],
+                update_fields=META_FIELDS,
+            )
+        written += len(rows)
+
+    return written
+
+
+def schedule_article_meta_refresh(article_ids):
+    """Refresh the records once the current transaction commits."""
+    article_ids = list(article_ids)
+    transaction.on_commit(lambda: refresh_article_meta(article_ids))
@@ -0,0 +1,411 @@
+"""
+Helpers for the denormalized ArticleStats and ArticleDailyStats tables.
+
+Write paths call the ``record_*`` helpers inside their own transaction so the
+counters move together with the row that changed. Readers use
+``get_article_stats`` / ``get_article_stats_map`` instead of running COUNT and
+AVG queries over reviews, discussions, comments and reactions, and
+``get_article_daily_stats`` for the trend charts.
+"""
+
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from articles.models import (
+    Article,
+    ArticleDailyStats,
+    ArticleStats,
+    Discussion,
+    Reaction,
+    Review,
+    ReviewComment,
+)
+from myapp.content_types import content_type_id
+
+STAT_FIELDS = (
+    "review_count",
+    "rating_sum",
+    "discussion_count",
+    "comment_count",
+    "like_count",
+)
+
+DAILY_STAT_FIELDS = ("review_count", "like_count")
+
+
+def bump_article_stats(article_id: int, community_id: int = None, **deltas):
+    """
+    Atomically apply counter deltas to the stats row of an article scope.
+
+    Args:
+        article_id: ID of the article
+        community_id: ID of the community, or None for the global scope
+        **deltas: Field name to increment (negative values decrement)
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    unknown = set(deltas) - set(STAT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown article stats fields: {sorted(unknown)}")
+
+    with transaction.atomic():
+        stats, _ = ArticleStats.objects.get_or_create(
+            article_id=article_id, community_id=community_id
+        )
+        ArticleStats.objects.filter(pk=stats.pk).update(
+            updated_at=timezone.now(),
+            **{field: F(field) + delta for field, delta in deltas.items()},
+        )
+
+
+def bump_article_daily_stats(
+    article_id: int, community_id: int = None, day: date = None, **deltas
+):
+    """
+    Atomically apply counter deltas to the daily rollup row of an article scope.
+
+    Args:
+        article_id: ID of the article
+        community_id: ID of the community, or None for the global scope
+        day: Day bucket to update, defaults to today
+        **deltas: Field name to increment (negative values decrement)
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    unknown = set(deltas) - set(DAILY_STAT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown article daily stats fields: {sorted(unknown)}")
+
+    with transaction.atomic():
+        stats, _ = ArticleDailyStats.objects.get_or_create(
+            article_id=article_id,
+            community_id=community_id,
+            date=day or timezone.localdate(),
+        )
+        ArticleDailyStats.objects.filter(pk=stats.pk).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+
+
+def record_review_created(review: Review):
+    bump_article_stats(
+        review.article_id,
+        review.community_id,
+        review_count=1,
+        rating_sum=review.rating,
+    )
+    bump_article_daily_stats(
+        review.article_id,
+        review.community_id,
+        timezone.localdate(review.created_at),
+        review_count=1,
+    )
+
+
+def record_review_rating_changed(review: Review, old_rating: int):
+    bump_article_stats(
+        review.article_id,
+        review.community_id,
+        rating_sum=review.rating - old_rating,
+    )
+
+
+def record_discussion_created(discussion: Discussion):
+    bump_article_stats(
+        discussion.article_id, discussion.community_id, discussion_count=1
+    )
+
+
+def record_review_comment_created(comment: ReviewComment):
+    bump_article_stats(
+        comment.review.article_id, comment.review.community_id, comment_count=1
+    )
+
+
+def record_article_reaction(
+    article_id: int, old_vote=None, new_vote=None, reacted_at=None
+):
+    """
+    Update the like counters after a reaction on an article was added,
+    changed or removed. Votes are Reaction.LIKE / Reaction.DISLIKE or None,
+    and reacted_at is the reaction's created_at, which picks the daily bucket.
+    """
+    delta = int(new_vote == Reaction.LIKE) - int(old_vote == Reaction.LIKE)
+    if not delta:
+        return
+    # Reactions are not validated against the article table, so don't create
+    # stats rows for ids that don't exist.
+    if not Article.objects.filter(pk=article_id).exists():
+        return
+    bump_article_stats(article_id, None, like_count=delta)
+    bump_article_daily_stats(
+        article_id,
+        None,
+        timezone.localdate(reacted_at) if reacted_at else None,
+        like_count=delta,
+    )
+
+
+def _empty_stats():
+    return dict.fromkeys(STAT_FIELDS, 0)
+
+
+def _average(rating_sum, review_count):
+    if not review_count:
+        return 0
+    return round(rating_sum / review_count, 1)
+
+
+def get_article_stats(article_id: int, community_id: int = None) -> dict:
+    """
+    Read the counters for an article in a single query.
+
+    The ``review_count``, ``average_rating`` and ``discussion_count`` keys are
+    scoped to ``community_id`` (None meaning activity outside communities),
+    while the ``total_*`` keys and ``like_count`` cover every scope.
+    """
+    scope = (
+        Q(community_id=community_id)
+        if community_id is not None
+        else Q(community__isnull=True)
+    )
+    # Aggregate aliases can't shadow model field names, hence the prefixes
+    sums = ArticleStats.objects.filter(article_id=article_id).aggregate(
+        scoped_review_count=Sum("review_count", filter=scope),
+        scoped_rating_sum=Sum("rating_sum", filter=scope),
+        scoped_discussion_count=Sum("discussion_count", filter=scope),
+        total_review_count=Sum("review_count"),
+        total_rating_sum=Sum("rating_sum"),
+        total_discussion_count=Sum("discussion_count"),
+        total_comment_count=Sum("comment_count"),
+        total_like_count=Sum("like_count"),
+    )
+    sums = {key: value or 0 for key, value in sums.items()}
+    totals = {
+        "review_count": sums["scoped_review_count"],
+        "rating_sum": sums["scoped_rating_sum"],
+        "discussion_count": sums["scoped_discussion_count"],
+        "total_review_count": sums["total_review_count"],
+        "total_rating_sum": sums["total_rating_sum"],
+        "total_discussion_count": sums["total_discussion_count"],
+        "total_comment_count": sums["total_comment_count"],
+        "like_count": sums["total_like_count"],
+    }
+    totals["average_rating"] = _average(totals["rating_sum"], totals["review_count"])
+    totals["total_average_rating"] = _average(
+        totals["total_rating_sum"], totals["total_review_count"]
+    )
+    return totals
+
+
+def get_article_stats_map(article_ids) -> dict:
+    """
+    Bulk-read the counters summed over every scope for a list of articles.
+
+    Returns:
+        Dict mapping article_id to a dict of STAT_FIELDS. Articles without
+        any activity map to zeros.
+    """
+    article_ids = list(article_ids)
+    result = {article_id: _empty_stats() for article_id in article_ids}
+    if not article_ids:
+        return result
+
+    rows = (
+        ArticleStats.objects.filter(article_id__in=article_ids)
+        .values("article_id")
+        .annotate(**{f"total_{field}": Sum(field) for field in STAT_FIELDS})
+    )
+    for row in rows:
+        result[row["article_id"]] = {
+            field: row[f"total_{field}"] or 0 for field in STAT_FIELDS
+        }
+    return result
+
+
+def compute_article_stats(article_ids) -> dict:
+    """
+    Recompute the counters from the source tables.
+
+    Returns:
+        Dict mapping (article_id, community_id) to a dict of STAT_FIELDS.
+    """
+    article_ids = list(article_ids)
+    rows = defaultdict(_empty_stats)
+
+    reviews = (
+        Review.objects.filter(article_id__in=article_ids)
+        .values("article_id", "community_id")
+        .annotate(count=Count("id"), rating_sum=Sum("rating"))
+    )
+    for item in reviews:
+        key = (item["article_id"], item["community_id"])
+        rows[key]["review_count"] = item["count"]
+        rows[key]["rating_sum"] = item["rating_sum"] or 0
+
+    discussions = (
+        Discussion.objects.filter(article_id__in=article_ids)
+        .values("article_id", "community_id")
+        .annotate(count=Count("id"))
+    )
+    for item in discussions:
+        rows[(item["article_id"], item["community_id"])]["discussion_count"] = item[
+            "count"
+        ]
+
+    comments = (
+        ReviewComment.objects.filter(review__article_id__in=article_ids)
+        .values("review__article_id", "review__community_id")
+        .annotate(count=Count("id"))
+    )
+    for item in comments:
+        key = (item["review__article_id"], item["review__community_id"])
+        rows[key]["comment_count"] = item["count"]
+
+    likes = (
+        Reaction.objects.filter(
+            content_type_id=content_type_id(Article),
+            object_id__in=article_ids,
+            vote=Reaction.LIKE,
+        )
+        .values("object_id")
+        .annotate(count=Count("id"))
+    )
+    for item in likes:
+        rows[(item["object_id"], None)]["like_count"] = item["count"]
+
+    return rows
+
+
+def rebuild_article_stats(article_ids) -> int:
+    """
+    Replace the stats rows of the given articles with freshly computed ones.
+
+    Returns:
+        Number of stats rows written
+    """
+    article_ids = list(article_ids)
+    rows = compute_article_stats(article_ids)
+
+    with transaction.atomic():
+        ArticleStats.objects.filter(article_id__in=article_ids).delete()
+        ArticleStats.objects.bulk_create(
+            [
+                ArticleStats(article_id=article_id, community_id=community_id, **values)
+                for (article_id, community_id), values in rows.items()
+            ]
+        )
+    return len(rows)
+
+
+"""
+Daily rollups
+"""
+
+
+def get_article_daily_stats(
+    article_id: int, start_date: date, end_date: date, community_id: int = None
+) -> dict:
+    """
+    Read the daily rollup rows of an article for a date window.
+
+    Returns:
+        Dict mapping date to ``review_count`` (scoped to community_id, None
+        meaning reviews outside communities), ``total_review_count`` (every
+        scope) and ``like_count``. Days without activity are omitted.
+    """
+    scope = (
+        Q(community_id=community_id)
+        if community_id is not None
+        else Q(community__isnull=True)
+    )
+    rows = (
+        ArticleDailyStats.objects.filter(
+            article_id=article_id, date__range=[start_date, end_date]
+        )
+        .values("date")
+        .annotate(
+            scoped_review_count=Sum("review_count", filter=scope),
+            total_review_count=Sum("review_count"),
+            total_like_count=Sum("like_count"),
+        )
+    )
+    return {
+        row["date"]: {
+            "review_count": row["scoped_review_count"] or 0,
+            "total_review_count": row["total_review_count"] or 0,
+            "like_count": row["total_like_count"] or 0,
+        }
+        for row in rows
+    }
+
+
+def compute_article_daily_stats(start_date: date, end_date: date) -> dict:
+    """
+    Recompute the daily rollups for a date window from the source tables.
+
+    Returns:
+        Dict mapping (article_id, community_id, date) to a dict of
+        DAILY_STAT_FIELDS.
+    """
+    rows = defaultdict(lambda: dict.fromkeys(DAILY_STAT_FIELDS, 0))
+
+    reviews = (
+        Review.objects.filter(created_at__date__range=[start_date, end_date])
+        .annotate(day=TruncDate("created_at"))
+        .values("article_id", "community_id", "day")
+        .annotate(count=Count("id"))
+    )
+    for item in reviews:
+        key = (item["article_id"], item["community_id"], item["day"])
+        rows[key]["review_count"] = item["count"]
+
+    likes = (
+        Reaction.objects.filter(
+            content_type_id=content_type_id(Article),
+            object_id__in=Article.objects.values("id"),
+            vote=Reaction.LIKE,
+            created_at__date__range=[start_date, end_date],
+        )
+        .annotate(day=TruncDate("created_at"))
+        .values("object_id", "day")
+        .annotate(count=Count("id"))
+    )
+    for item in likes:
+        rows[(item["object_id"], None, item["day"])]["like_count"] = item["count"]
+
+    return rows
+
+
+def rebuild_article_daily_stats(start_date: date, end_date: date) -> int:
+    """
+    Replace the daily rollup rows in a date window with recomputed ones.
+
+    Returns:
+        Number of rollup rows written
+    """
+    rows = compute_article_daily_stats(start_date, end_date)
+
+    with transaction.atomic():
+        ArticleDailyStats.objects.filter(date__range=[start_date, end_date]).delete()
+        ArticleDailyStats.objects.bulk_create(
+            [
+                ArticleDailyStats(
+                    article_id=article_id,
+                    community_id=community_id,
+                    date=day,
+                    **values,
+                )
+                for (article_id, community_id, day), values in rows.items()
+            ]
+        )
+    return len(rows)
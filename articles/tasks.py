@@ -0,0 +1,89 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from articles.pseudonyms import refill_pseudonym_pool
+from articles.reaction_counts import flush_reaction_counts
+from articles.related import rebuild_related_articles
+from articles.stats import rebuild_article_daily_stats
+from myapp.utils import generate_identicon
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3)
+def refresh_article_daily_stats(self, days=2):
+    """
+    Recompute the article daily rollups of the last `days` days to repair
+    buckets the write-path counters missed (e.g. deleted reviews).
+    """
+    try:
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=days - 1)
+        rows = rebuild_article_daily_stats(start_date, end_date)
+        logger.info(
+            f"Refreshed article daily stats for {start_date} - {end_date}: "
+            f"{rows} rows"
+        )
+        return rows
+    except Exception as e:
+        logger.error(f"Error refreshing article daily stats: {e}")
+        raise self.retry(exc=e, countdown=60)
+
+
+@shared_task(bind=True, max_retries=3)
+def refresh_related_articles(self, article_ids=None):
+    """
+    Rebuild the precomputed related articles, for every article by default.
+    """
+    try:
+        rows = rebuild_related_articles(article_ids)
+        logger.info(f"Rebuilt related articles: {rows} rows")
+        return rows
+    except Exception as e:
+        logger.error(f"Error rebuilding related articles: {e}")
+        raise self.retry(exc=e, countdown=60)
+
+
+@shared_task(bind=True, max_retries=3)
+def flush_pending_reaction_counts(self):
+    """
+    Move the reaction counter deltas pending in Redis into ReactionCount.
+    """
+    try:
+        flushed = flush_reaction_counts()
+        if flushed:
+            logger.info(f"Flushed reaction counts of {flushed} objects")
+        return flushed
+    except Exception as e:
+        logger.error(f"Error flushing reaction counts: {e}")
+        raise self.retry(exc=e, countdown=60)
+
+
+@shared_task(bind=True, max_retries=3)
+def refill_pseudonyms(self):
+    """
+    Top up the pool of pseudonyms claimed by new anonymous identities.
+    """
+    try:
+        added = refill_pseudonym_pool()
+        if added:
+            logger.info(f"Added {added} pseudonyms to the pool")
+        return added
+    except Exception as e:
+        logger.error(f"Error refilling pseudonym pool: {e}")
+        raise self.retry(exc=e, countdown=60)
+
+
+@shared_task(bind=True, max_retries=3)
+def upload_identicon(self, fake_name):
+    """
+    Upload the identicon of a pseudonym generated inside a request.
+    """
+    try:
+        return generate_identicon(fake_name)
+    except Exception as e:
+        logger.error(f"Error uploading identicon of {fake_name}: {e}")
+        raise self.retry(exc=e, countdown=60)
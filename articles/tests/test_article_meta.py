@@ -0,0 +1,85 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from ninja.testing import TestClient
+
+from articles.api import router as articles_router
+from articles.models import Article, ArticleMeta
+from articles.seo import refresh_article_meta
+from communities.models import Community, CommunityArticle
+from users.models import User
+
+
+class ArticleMetaTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        self.community = Community.objects.create(
+            name="Test Community", description="Description", type=Community.PUBLIC
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article = Article.objects.create(
+                title="Test Article",
+                abstract="This is a test abstract.",
+                authors=[{"value": "Author One", "label": "Author One"}],
+                submission_type="Public",
+                submitter=self.user,
+                faqs=[],
+            )
+
+    def test_record_follows_article_and_community_writes(self):
+        self.assertTrue(ArticleMeta.objects.filter(article=self.article).exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.article.title = "Renamed Article"
+            self.article.save()
+        self.assertEqual(ArticleMeta.objects.get().title, "Renamed Article")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            community_article = CommunityArticle.objects.create(
+                article=self.article,
+                community=self.community,
+                status=CommunityArticle.SUBMITTED,
+            )
+        self.assertFalse(ArticleMeta.objects.exists())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            community_article.status = CommunityArticle.PUBLISHED
+            community_article.save()
+        self.assertTrue(ArticleMeta.objects.exists())
+
+    def test_private_articles_have_no_record(self):
+        self.community.type = Community.HIDDEN
+        self.community.save()
+        CommunityArticle.objects.create(
+            article=self.article,
+            community=self.community,
+            status=CommunityArticle.PUBLISHED,
+        )
+        private_article = Article.objects.create(
+            title="Private Article",
+            abstract="Abstract",
+            submission_type="Private",
+            submitter=self.user,
+        )
+        self.assertEqual(refresh_article_meta([self.article.id, private_article.id]), 0)
+        self.assertFalse(ArticleMeta.objects.exists())
+
+        response = TestClient(articles_router).get(f"/article-meta/{self.article.slug}")
+        self.assertEqual(response.status_code, 404)
+
+    def test_served_from_the_record_with_cache_headers(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = TestClient(articles_router).get(
+                f"/article-meta/{self.article.slug}"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(response.json()["title"], "Test Article")
+        self.assertIn("stale-while-revalidate=", response["Cache-Control"])
+        self.assertIn("public", response["Cache-Control"])
+        self.assertEqual(
+            response["Surrogate-Key"],
+            f"article-meta article-meta-{self.article.id}",
+        )
@@ -1,26 +1,62 @@
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db import connection, transaction
 from django.db.utils import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from django.utils.text import slugify
 from faker import Faker
 
-from communities.models import Community
+from communities.models import Community, CommunityArticle
+from myapp.schemas import DateCount
+from myapp.utils import identicon_path, render_identicon
 
 from ..models import (
     AnonymousIdentity,
     Article,
+    ArticleStats,
     Discussion,
     DiscussionComment,
+    Pseudonym,
     Reaction,
+    RelatedArticle,
     Review,
     ReviewComment,
     ReviewVersion,
 )
+from ..pseudonyms import refill_pseudonym_pool
+from ..related import rebuild_related_articles
+from ..review_history import (
+    REVIEW_SNAPSHOT_INTERVAL,
+    compact_review_versions,
+    get_review_version,
+    resolve_version_contents,
+)
+from ..stats import (
+    bump_article_stats,
+    get_article_daily_stats,
+    get_article_stats,
+    rebuild_article_daily_stats,
+    rebuild_article_stats,
+    record_review_created,
+)
+from ..visibility import (
+    refresh_article_visibility,
+    refresh_community_article_visibility,
+)
 
 User = get_user_model()
 fake = Faker()
 
+MEMORY_STORAGES = {"default": {"BACKEND": "django.core.files.storage.InMemoryStorage"}}
+
 
 class ArticleModelTest(TestCase):
     def setUp(self):
@@ -175,6 +211,65 @@ class AnonymousIdentityModelTest(TestCase):
                 user=self.user, article=self.article, fake_name="UniqueName2"
             )
 
+    @override_settings(STORAGES=MEMORY_STORAGES)
+    def test_fake_names_are_claimed_from_the_pool(self):
+        self.assertEqual(refill_pseudonym_pool(size=3, batch_size=2), 3)
+        self.assertEqual(refill_pseudonym_pool(size=3), 0)
+        pool = dict(Pseudonym.objects.values_list("fake_name", "identicon"))
+
+        other_article = Article.objects.create(
+            title="Other Article",
+            abstract="Abstract",
+            submission_type="Public",
+            submitter=self.user,
+        )
+        names = {
+            AnonymousIdentity.get_or_create_fake_name(self.user, article)
+            for article in (self.article, other_article)
+        }
+        self.assertTrue(names <= set(pool))
+        self.assertEqual(len(names), 2)
+        self.assertEqual(Pseudonym.objects.count(), 1)
+        identity = AnonymousIdentity.objects.get(user=self.user, article=self.article)
+        self.assertEqual(identity.identicon, pool[identity.fake_name])
+        path = identicon_path(render_identicon(identity.fake_name))
+        self.assertEqual(identity.identicon, default_storage.url(path))
+        self.assertTrue(default_storage.exists(path))
+
+        # Existing identities are read without touching the pool
+        with self.assertNumQueries(1):
+            AnonymousIdentity.get_or_create_fake_name(self.user, self.article)
+
+    @override_settings(STORAGES=MEMORY_STORAGES, MEDIA_URL="https://cdn.example.com/")
+    def test_inline_identicons_are_uploaded_when_queueing_fails(self):
+        with patch(
+            "articles.tasks.upload_identicon.delay", side_effect=ConnectionError
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                name = AnonymousIdentity.get_or_create_fake_name(
+                    self.user, self.article
+                )
+        path = identicon_path(render_identicon(name))
+        self.assertTrue(default_storage.exists(path))
+        self.assertEqual(
+            AnonymousIdentity.objects.get(fake_name=name).identicon,
+            default_storage.url(path),
+        )
+
+    @override_settings(STORAGES=MEMORY_STORAGES, MEDIA_URL="https://cdn.example.com/")
+    def test_missing_identicons_are_repaired(self):
+        # The queued upload never runs
+        with patch("articles.tasks.upload_identicon.delay"):
+            with self.captureOnCommitCallbacks(execute=True):
+                name = AnonymousIdentity.get_or_create_fake_name(
+                    self.user, self.article
+                )
+        path = identicon_path(render_identicon(name))
+        self.assertFalse(default_storage.exists(path))
+
+        call_command("upload_identicons", "--repair-missing", stdout=io.StringIO())
+        self.assertTrue(default_storage.exists(path))
+
 
 class ReviewModelTest(TestCase):
     def setUp(self):
@@ -301,6 +396,82 @@ class ReviewVersionModelTest(TestCase):
         expected_str = f"Version {review_version.version} of {self.review.subject}"
         self.assertEqual(str(review_version), expected_str)
 
+    def edit_review(self, edits):
+        contents = [self.review.content]
+        for index in range(edits):
+            paragraphs = [f"Paragraph {line} of the review.\n" for line in range(50)]
+            paragraphs[index % 50] = f"Edited paragraph in edit {index}.\n"
+            self.review.content = "".join(paragraphs)
+            self.review.save()
+            contents.append(self.review.content)
+        return contents
+
+    def test_history_is_stored_as_deltas(self):
+        contents = self.edit_review(REVIEW_SNAPSHOT_INTERVAL + 2)
+        versions = {version.version: version for version in ReviewVersion.objects.all()}
+
+        self.assertIsNone(versions[1].content_delta)
+        self.assertEqual(versions[2].content, "")
+        self.assertIsNotNone(versions[2].content_delta)
+        self.assertIsNone(versions[REVIEW_SNAPSHOT_INTERVAL + 1].content_delta)
+        self.assertLess(len(bytes(versions[3].content_delta)), len(contents[2]) // 4)
+
+        for number, content in enumerate(contents[:-1], start=1):
+            self.assertEqual(get_review_version(self.review, number).content, content)
+        self.assertIsNone(get_review_version(self.review, len(contents)))
+
+        recent = resolve_version_contents(
+            self.review, list(self.review.versions.order_by("-version")[:3])
+        )
+        self.assertEqual([version.content for version in recent], contents[-2:-5:-1])
+
+    def test_save_detects_edits_without_select(self):
+        review = Review.objects.get(pk=self.review.pk)
+        review.rating = 4
+        with CaptureQueriesContext(connection) as queries:
+            review.save()
+        self.assertFalse(any(query["sql"].startswith("SELECT") for query in queries))
+        self.assertEqual(ReviewVersion.objects.count(), 0)
+
+        review.content = "Edited content."
+        review.save()
+        review.content = "Edited again."
+        review.save()
+        self.assertEqual(
+            list(ReviewVersion.objects.values_list("version", flat=True)), [1, 2]
+        )
+        self.assertEqual(get_review_version(review, 2).content, "Edited content.")
+
+    def test_stale_save_cannot_duplicate_a_version(self):
+        stale = Review.objects.get(pk=self.review.pk)
+        self.review.content = "Edited content."
+        self.review.save()
+
+        stale.content = "Concurrent edit."
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            stale.save()
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.content, "Edited content.")
+        self.assertEqual(
+            get_review_version(self.review, 1).content, self.review_data["content"]
+        )
+
+    def test_compact_review_versions(self):
+        contents = self.edit_review(4)
+        # History written before deltas existed holds full text only
+        for number, content in enumerate(contents[:-1], start=1):
+            ReviewVersion.objects.filter(version=number).update(
+                content=content, content_delta=None
+            )
+
+        versions = list(self.review.versions.order_by("-version"))
+        changed = compact_review_versions(self.review, versions)
+        ReviewVersion.objects.bulk_update(changed, ["content", "content_delta"])
+
+        self.assertEqual(len(changed), 3)
+        for number, content in enumerate(contents[:-1], start=1):
+            self.assertEqual(get_review_version(self.review, number).content, content)
+
 
 # class ReviewCommentModelTest(TestCase):
 #     def setUp(self):
@@ -682,3 +853,243 @@ class DiscussionCommentModelTest(TestCase):
             parent=parent_comment,
         )
         self.assertEqual(child_comment.parent, parent_comment)
+
+
+class ArticleStatsModelTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        self.other_user = User.objects.create_user(
+            username="otheruser", email="otheruser@example.com", password="password123"
+        )
+        self.article = Article.objects.create(
+            title="Test Article",
+            abstract="This is a test abstract.",
+            authors=["Author One"],
+            submission_type="Public",
+            submitter=self.user,
+            faqs=[],
+        )
+        self.community = Community.objects.create(name="Test Community")
+
+    def test_bump_creates_one_row_per_scope(self):
+        bump_article_stats(self.article.id, None, like_count=1)
+        bump_article_stats(self.article.id, None, like_count=1)
+        bump_article_stats(self.article.id, self.community.id, discussion_count=1)
+
+        self.assertEqual(ArticleStats.objects.filter(article=self.article).count(), 2)
+        global_stats = ArticleStats.objects.get(
+            article=self.article, community__isnull=True
+        )
+        self.assertEqual(global_stats.like_count, 2)
+
+    def test_get_article_stats_scopes(self):
+        for user, community, rating in [
+            (self.user, None, 4),
+            (self.other_user, None, 3),
+            (self.user, self.community, 5),
+        ]:
+            review = Review.objects.create(
+                article=self.article,
+                user=user,
+                community=community,
+                rating=rating,
+                subject="Subject",
+                content="Content",
+            )
+            record_review_created(review)
+
+        stats = get_article_stats(self.article.id)
+        self.assertEqual(stats["review_count"], 2)
+        self.assertEqual(stats["average_rating"], 3.5)
+        self.assertEqual(stats["total_review_count"], 3)
+        self.assertEqual(stats["total_average_rating"], 4.0)
+
+        community_stats = get_article_stats(self.article.id, self.community.id)
+        self.assertEqual(community_stats["review_count"], 1)
+        self.assertEqual(community_stats["average_rating"], 5)
+
+    def test_rebuild_repairs_drift(self):
+        review = Review.objects.create(
+            article=self.article,
+            user=self.user,
+            community=self.community,
+            rating=4,
+            subject="Subject",
+            content="Content",
+        )
+        ReviewComment.objects.create(
+            review=review, author=self.other_user, content="Comment"
+        )
+        Discussion.objects.create(
+            article=self.article, author=self.user, topic="Topic", content="Content"
+        )
+        Reaction.objects.create(
+            user=self.other_user,
+            content_type=ContentType.objects.get_for_model(Article),
+            object_id=self.article.id,
+            vote=Reaction.LIKE,
+        )
+        bump_article_stats(self.article.id, None, review_count=7)
+
+        rebuild_article_stats([self.article.id])
+
+        stats = get_article_stats(self.article.id, self.community.id)
+        self.assertEqual(stats["review_count"], 1)
+        self.assertEqual(stats["average_rating"], 4)
+        self.assertEqual(stats["total_review_count"], 1)
+        self.assertEqual(stats["total_discussion_count"], 1)
+        self.assertEqual(stats["total_comment_count"], 1)
+        self.assertEqual(stats["like_count"], 1)
+
+    def test_daily_stats_follow_reviews(self):
+        today = timezone.localdate()
+        review = Review.objects.create(
+            article=self.article,
+            user=self.user,
+            community=self.community,
+            rating=4,
+            subject="Subject",
+            content="Content",
+        )
+        record_review_created(review)
+
+        daily_stats = get_article_daily_stats(
+            self.article.id, today, today, community_id=self.community.id
+        )
+        self.assertEqual(daily_stats[today]["review_count"], 1)
+        self.assertEqual(daily_stats[today]["total_review_count"], 1)
+
+        review.delete()
+        rebuild_article_daily_stats(today, today)
+        self.assertEqual(get_article_daily_stats(self.article.id, today, today), {})
+
+    def test_date_count_cumulative(self):
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=2)
+
+        series = DateCount.cumulative(
+            start_date, end_date, {start_date: 2, end_date: 1}, baseline=3
+        )
+
+        self.assertEqual(
+            [item.date for item in series],
+            [
+                start_date,
+                start_date + timedelta(days=1),
+                end_date,
+            ],
+        )
+        self.assertEqual([item.count for item in series], [5, 5, 6])
+
+
+class RelatedArticleModelTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+
+    def create_article(self, title, abstract):
+        return Article.objects.create(
+            title=title,
+            abstract=abstract,
+            authors=["Author One"],
+            submission_type="Public",
+            submitter=self.user,
+            faqs=[],
+        )
+
+    def test_rebuild_ranks_similar_articles(self):
+        base = self.create_article(
+            "Protein folding with graph networks",
+            "Graph networks predict protein folding pathways.",
+        )
+        similar = self.create_article(
+            "Graph networks for protein structure",
+            "Protein structure prediction using graph networks.",
+        )
+        unrelated = self.create_article(
+            "Medieval trade routes", "Economic history of medieval trade."
+        )
+        self.create_article("Coral reef ecology", "Reef fish population surveys.")
+
+        rebuild_related_articles()
+
+        related_ids = list(
+            RelatedArticle.objects.filter(article=base)
+            .order_by("-score")
+            .values_list("related_article_id", flat=True)
+        )
+        self.assertEqual(related_ids[0], similar.id)
+        self.assertNotIn(unrelated.id, related_ids)
+        self.assertNotIn(base.id, related_ids)
+
+    def test_hidden_articles_are_not_suggested(self):
+        base = self.create_article(
+            "Protein folding with graph networks",
+            "Graph networks predict protein folding pathways.",
+        )
+        hidden = self.create_article(
+            "Graph networks for protein structure",
+            "Protein structure prediction using graph networks.",
+        )
+        self.create_article("Medieval trade routes", "Economic history of trade.")
+        community = Community.objects.create(
+            name="Hidden Community", type=Community.HIDDEN
+        )
+        CommunityArticle.objects.create(article=hidden, community=community)
+        refresh_article_visibility([hidden.id])
+
+        rebuild_related_articles()
+
+        self.assertFalse(
+            RelatedArticle.objects.filter(article=base, related_article=hidden).exists()
+        )
+        self.assertTrue(
+            RelatedArticle.objects.filter(article=hidden, related_article=base).exists()
+        )
+
+
+class ArticleVisibilityTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        self.article = Article.objects.create(
+            title="Test Article",
+            abstract="This is a test abstract.",
+            authors=["Author One"],
+            submission_type="Public",
+            submitter=self.user,
+            faqs=[],
+        )
+        self.community = Community.objects.create(
+            name="Test Community", type=Community.PUBLIC
+        )
+        CommunityArticle.objects.create(article=self.article, community=self.community)
+
+    def test_follows_community_type(self):
+        refresh_article_visibility([self.article.id])
+        self.article.refresh_from_db()
+        self.assertFalse(self.article.is_hidden)
+
+        self.community.type = Community.HIDDEN
+        self.community.save()
+        self.assertEqual(refresh_community_article_visibility(self.community), 1)
+        self.article.refresh_from_db()
+        self.assertTrue(self.article.is_hidden)
+
+    def test_follows_community_links(self):
+        hidden_community = Community.objects.create(
+            name="Hidden Community", type=Community.HIDDEN
+        )
+        link = CommunityArticle.objects.create(
+            article=self.article, community=hidden_community
+        )
+        refresh_article_visibility([self.article.id])
+        self.assertTrue(Article.objects.get(id=self.article.id).is_hidden)
+
+        link.delete()
+        refresh_article_visibility([self.article.id])
+        self.assertFalse(Article.objects.get(id=self.article.id).is_hidden)
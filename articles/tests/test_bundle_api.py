@@ -0,0 +1,110 @@
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from ninja.testing import TestClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from articles.api import router as articles_router
+from articles.bundle_api import router as bundle_router
+from articles.discussion_api import router as discussion_router
+from articles.models import Article, Discussion, Reaction, Review
+from articles.reaction_counts import rebuild_reaction_counts
+from articles.review_api import router as review_router
+from articles.stats import rebuild_article_stats
+from users.common_api import router as common_router
+from users.models import User
+
+
+class ArticleBundleAPITest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        self.article = Article.objects.create(
+            title="Test Article",
+            abstract="This is a test abstract.",
+            authors=[{"value": "Author One", "label": "Author One"}],
+            submission_type="Public",
+            submitter=self.user,
+            faqs=[],
+        )
+        for index in range(3):
+            reviewer = User.objects.create_user(
+                username=f"reviewer{index}",
+                email=f"reviewer{index}@example.com",
+                password="password123",
+            )
+            Review.objects.create(
+                article=self.article,
+                user=reviewer,
+                rating=index + 2,
+                subject="Subject",
+                content="Content",
+            )
+            Discussion.objects.create(
+                article=self.article, author=reviewer, topic="Topic", content="Content"
+            )
+        Reaction.objects.create(
+            user=self.user,
+            content_type=ContentType.objects.get_for_model(Article),
+            object_id=self.article.id,
+            vote=Reaction.LIKE,
+        )
+        rebuild_article_stats([self.article.id])
+        rebuild_reaction_counts()
+
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def get_bundle(self, query=""):
+        return TestClient(bundle_router).get(
+            f"/article/{self.article.slug}/bundle{query}", headers=self.headers
+        )
+
+    def test_bundle_sections(self):
+        response = self.get_bundle()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        self.assertEqual(data["article"]["id"], self.article.id)
+        self.assertEqual(len(data["reviews"]["items"]), 3)
+        self.assertEqual(data["reviews"]["total"], 3)
+        self.assertEqual(len(data["discussions"]["items"]), 3)
+        self.assertEqual(data["stats"]["average_rating"], 3.0)
+        self.assertEqual(data["reactions"]["likes"], 1)
+        self.assertEqual(data["reactions"]["user_reaction"], Reaction.LIKE)
+
+    def test_include_selects_sections(self):
+        response = self.get_bundle("?include=stats,reactions")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertIsNone(data["article"])
+        self.assertIsNone(data["reviews"])
+        self.assertEqual(data["stats"]["reviews_count"], 3)
+
+        self.assertEqual(self.get_bundle("?include=comments").status_code, 400)
+
+    def test_private_article_is_forbidden(self):
+        self.article.submission_type = "Private"
+        self.article.submitter = User.objects.get(username="reviewer0")
+        self.article.save()
+        self.assertEqual(self.get_bundle().status_code, 403)
+
+    def test_uses_fewer_queries_than_fan_out(self):
+        requests = [
+            (articles_router, f"/article/{self.article.slug}"),
+            (review_router, f"/{self.article.id}/reviews/"),
+            (discussion_router, f"/{self.article.id}/discussions/"),
+            (articles_router, f"/article/{self.article.slug}/official-stats"),
+            (common_router, f"/bookmarks/status/articles.article/{self.article.id}"),
+            (common_router, f"/reaction_count/articles.article/{self.article.id}/"),
+        ]
+        with CaptureQueriesContext(connection) as fan_out:
+            for router, path in requests:
+                response = TestClient(router).get(path, headers=self.headers)
+                self.assertEqual(response.status_code, 200, path)
+
+        with CaptureQueriesContext(connection) as bundle:
+            self.assertEqual(self.get_bundle().status_code, 200)
+
+        self.assertLess(len(bundle), len(fan_out))
@@ -0,0 +1,165 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from ninja.testing import TestClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from articles.api import router as articles_router
+from articles.discussion_api import router as discussion_router
+from articles.models import Article, Discussion, Review
+from articles.review_api import router as review_router
+from articles.seo import refresh_article_meta
+from communities.api import router as communities_router
+from communities.models import Community
+from users.common_api import get_content_type_for_model
+from users.models import Bookmark, Reputation, User
+
+LOCMEM_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class ConditionalGetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        self.reviewer = User.objects.create_user(
+            username="reviewer", email="reviewer@example.com", password="password123"
+        )
+        self.article = Article.objects.create(
+            title="Test Article",
+            abstract="This is a test abstract.",
+            authors=[{"value": "Author One", "label": "Author One"}],
+            submission_type="Public",
+            submitter=self.user,
+            faqs=[],
+        )
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def get(self, router, path, **headers):
+        # The ninja test client turns header names into META keys as given
+        headers = {name.upper(): value for name, value in headers.items()}
+        return TestClient(router).get(path, headers={**self.headers, **headers})
+
+    def test_article_revalidates_until_it_changes(self):
+        path = f"/article/{self.article.slug}"
+        response = self.get(articles_router, path)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = self.get(articles_router, path, if_none_match=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.create(
+                article=self.article,
+                user=self.reviewer,
+                rating=4,
+                subject="Subject",
+                content="Content",
+            )
+        response = self.get(articles_router, path, if_none_match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_if_modified_since(self):
+        refresh_article_meta([self.article.id])
+        path = f"/article-meta/{self.article.slug}"
+        response = self.get(articles_router, path)
+        self.assertEqual(response.status_code, 200)
+
+        response = self.get(
+            articles_router, path, if_modified_since=response["Last-Modified"]
+        )
+        self.assertEqual(response.status_code, 304)
+
+        response = self.get(
+            articles_router, path, if_modified_since="Thu, 01 Jan 2015 00:00:00 GMT"
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_validators_are_per_user(self):
+        path = f"/{self.article.id}/discussions/"
+        etag = self.get(discussion_router, path)["ETag"]
+
+        other_headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.reviewer)}",
+            "IF_NONE_MATCH": etag,
+        }
+        response = TestClient(discussion_router).get(path, headers=other_headers)
+        self.assertEqual(response.status_code, 200)
+
+        # The viewer's own changes move their validators
+        with self.captureOnCommitCallbacks(execute=True):
+            Bookmark.objects.create(
+                user=self.user,
+                content_type=get_content_type_for_model(Article),
+                object_id=self.article.id,
+            )
+        self.assertEqual(
+            self.get(discussion_router, path, if_none_match=etag).status_code, 200
+        )
+
+    def test_lists_move_with_their_content(self):
+        reviews_path = f"/{self.article.id}/reviews/"
+        reviews_etag = self.get(review_router, reviews_path)["ETag"]
+        communities_etag = self.get(communities_router, "/")["ETag"]
+        self.assertEqual(
+            self.get(
+                review_router, reviews_path, if_none_match=reviews_etag
+            ).status_code,
+            304,
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Discussion.objects.create(
+                article=self.article, author=self.reviewer, topic="Topic", content="C"
+            )
+            community = Community.objects.create(
+                name="Test Community", description="Description", type="public"
+            )
+            community.members.add(self.reviewer)
+
+        # Pages of other collections share the article scope
+        self.assertEqual(
+            self.get(
+                review_router, reviews_path, if_none_match=reviews_etag
+            ).status_code,
+            200,
+        )
+        response = self.get(communities_router, "/", if_none_match=communities_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["total"], 1)
+
+    def test_author_changes_move_their_articles(self):
+        Review.objects.create(
+            article=self.article,
+            user=self.reviewer,
+            rating=4,
+            subject="Subject",
+            content="Content",
+        )
+        path = f"/{self.article.id}/reviews/"
+
+        def revalidate():
+            etag = self.get(review_router, path)["ETag"]
+            return lambda: self.get(review_router, path, if_none_match=etag).status_code
+
+        # Reviews embed their author's reputation, username and picture
+        status = revalidate()
+        with self.captureOnCommitCallbacks(execute=True):
+            Reputation.award(self.reviewer.id, "REVIEW_ARTICLE")
+        self.assertEqual(status(), 200)
+
+        status = revalidate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reviewer.profile_pic_url = "https://example.com/new.png"
+            self.reviewer.save()
+        self.assertEqual(status(), 200)
+
+        status = revalidate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reviewer.save(update_fields=["last_login"])
+        self.assertEqual(status(), 304)
@@ -0,0 +1,230 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from articles.management.commands.ingest_articles import (
+    SlugAllocator,
+    read_bibtex,
+    read_csv,
+    read_jsonl,
+)
+from articles.models import Article, ArticlePDF
+from communities.models import Community, CommunityArticle
+from users.models import User
+
+BIBTEX = """
+@comment{Exported by a reference manager, {with braces}}
+@string{jml = "Journal of Machine Learning"}
+
+@article{smith2020,
+  title = {Deep {Learning} for
+           Everyone},
+  author = "Smith, Jane and Doe, John",
+  abstract = {An abstract with {nested {braces}}.},
+  year = 2020,
+  doi = 10.1000/xyz123,
+}
+@inproceedings{lee2021, title="Quoted Title", abstract = "Short.",
+  author = {Lee, Ann}, url = {https://example.com/lee}, pdf = {https://example.com/lee.pdf}}
+"""
+
+
+class IngestReadersTest(TestCase):
+    def test_read_jsonl(self):
+        stream = io.StringIO(
+            json.dumps({"title": "A", "authors": "One; Two"})
+            + "\n\n"
+            + json.dumps({"title": "B", "authors": ["Three", " "]})
+            + "\n"
+        )
+        records = list(read_jsonl(stream))
+        self.assertEqual([record["title"] for record in records], ["A", "B"])
+        self.assertEqual(records[0]["authors"], ["One", "Two"])
+        self.assertEqual(records[1]["authors"], ["Three"])
+
+    def test_read_csv(self):
+        stream = io.StringIO(
+            'title,abstract,authors,pdf_link\n"Title, with comma",Abstract,One;Two,\n'
+        )
+        (record,) = read_csv(stream)
+        self.assertEqual(record["title"], "Title, with comma")
+        self.assertEqual(record["authors"], ["One", "Two"])
+        self.assertEqual(record["pdf_link"], "")
+
+    def test_read_bibtex(self):
+        # Fed line by line, so entries spanning lines are buffered
+        records = list(read_bibtex(io.StringIO(BIBTEX)))
+
+        self.assertEqual(len(records), 2)
+        braced, quoted = records
+        self.assertEqual(braced["title"], "Deep Learning for Everyone")
+        self.assertEqual(braced["abstract"], "An abstract with nested braces.")
+        self.assertEqual(braced["authors"], ["Smith, Jane", "Doe, John"])
+        self.assertEqual(braced["article_link"], "https://doi.org/10.1000/xyz123")
+        self.assertIsNone(braced["pdf_link"])
+
+        self.assertEqual(quoted["title"], "Quoted Title")
+        self.assertEqual(quoted["authors"], ["Lee, Ann"])
+        self.assertEqual(quoted["article_link"], "https://example.com/lee")
+        self.assertEqual(quoted["pdf_link"], "https://example.com/lee.pdf")
+
+
+class SlugAllocatorTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        Article.objects.create(
+            title="Taken Title",
+            abstract="Abstract",
+            authors=[],
+            submission_type="Public",
+            submitter=self.user,
+        )
+
+    def test_collisions_get_suffixes(self):
+        allocator = SlugAllocator()
+        with self.assertNumQueries(2):
+            slugs = allocator.allocate(["Taken Title", "Fresh Title", "Fresh Title"])
+
+        self.assertTrue(slugs[0].startswith("taken-title-"))
+        self.assertEqual(slugs[1], "fresh-title")
+        self.assertTrue(slugs[2].startswith("fresh-title-"))
+        self.assertEqual(len(set(slugs)), 3)
+
+        # Slugs handed out in earlier batches count as taken
+        (slug,) = allocator.allocate(["Fresh Title"])
+        self.assertNotIn(slug, slugs)
+        self.assertTrue(slug.startswith("fresh-title-"))
+
+
+class IngestArticlesCommandTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ingester", email="ingester@example.com", password="password123"
+        )
+        self.community = Community.objects.create(
+            name="Test Community", description="Description", type="public"
+        )
+        Article.objects.create(
+            title="Already There",
+            abstract="Abstract",
+            authors=[],
+            article_link="https://example.com/existing",
+            submission_type="Public",
+            submitter=self.user,
+        )
+        records = [
+            {
+                "title": "First",
+                "abstract": "Abstract",
+                "authors": ["One"],
+                "article_link": "https://example.com/first",
+                "pdf_link": "https://example.com/first.pdf",
+            },
+            # Same link as the record above
+            {
+                "title": "First Again",
+                "abstract": "Abstract",
+                "article_link": "https://example.com/first",
+            },
+            # Link already in the database
+            {
+                "title": "Existing",
+                "abstract": "Abstract",
+                "article_link": "https://example.com/existing",
+            },
+            {"title": "No Abstract"},
+            {"title": "Second", "abstract": "Abstract", "authors": "Two; Three"},
+            {"title": "Second", "abstract": "Another abstract"},
+        ]
+        handle, self.path = tempfile.mkstemp(suffix=".jsonl")
+        os.close(handle)
+        self.addCleanup(os.remove, self.path)
+        self.write_records(records)
+
+    def write_records(self, records):
+        with open(self.path, "w", encoding="utf-8") as stream:
+            for record in records:
+                stream.write(json.dumps(record) + "\n")
+
+    def ingest(self, *args):
+        stdout = io.StringIO()
+        call_command(
+            "ingest_articles",
+            self.path,
+            "--submitter",
+            "ingester",
+            "--batch-size",
+            "2",
+            *args,
+            stdout=stdout,
+        )
+        return stdout.getvalue()
+
+    def test_dry_run_writes_nothing(self):
+        output = self.ingest("--dry-run")
+        self.assertIn("3 articles, 3 skipped", output)
+        self.assertEqual(Article.objects.count(), 1)
+
+    def test_ingest_skips_duplicates_and_links_pdfs_and_community(self):
+        output = self.ingest("--community", "Test Community")
+        self.assertIn("3 articles, 3 skipped", output)
+        self.user.counters.refresh_from_db()
+        self.assertEqual(self.user.counters.articles, 4)
+
+        articles = Article.objects.exclude(title="Already There").order_by("id")
+        self.assertEqual(
+            [article.title for article in articles], ["First", "Second", "Second"]
+        )
+        self.assertEqual(articles[1].slug, "second")
+        self.assertTrue(articles[2].slug.startswith("second-"))
+        self.assertEqual(
+            articles[1].authors,
+            [{"value": "Two", "label": "Two"}, {"value": "Three", "label": "Three"}],
+        )
+
+        pdf = ArticlePDF.objects.get()
+        self.assertEqual(
+            (pdf.article, pdf.external_url),
+            (articles[0], "https://example.com/first.pdf"),
+        )
+        self.assertEqual(
+            set(
+                CommunityArticle.objects.filter(
+                    community=self.community, status=CommunityArticle.PUBLISHED
+                ).values_list("article_id", flat=True)
+            ),
+            {article.id for article in articles},
+        )
+
+    def test_bad_rows_are_skipped_and_reruns_add_nothing(self):
+        records = [{"title": f"T{index}", "abstract": "Abstract"} for index in range(3)]
+        records[1:1] = [
+            {
+                "title": "Long PDF",
+                "abstract": "A",
+                "pdf_link": "https://x.io/" + "a" * 300,
+            },
+            {"title": "Bad Link", "abstract": "A", "article_link": "not a link"},
+            {"title": "T" * 501, "abstract": "A"},
+        ]
+        self.write_records(records)
+
+        output = self.ingest("--batch-size", "3")
+        self.assertIn("3 articles, 3 skipped", output)
+        output = self.ingest("--batch-size", "3")
+        self.assertIn("0 articles, 6 skipped", output)
+
+        self.assertEqual(
+            sorted(
+                Article.objects.exclude(title="Already There").values_list(
+                    "title", flat=True
+                )
+            ),
+            ["T0", "T1", "T2"],
+        )
@@ -0,0 +1,112 @@
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+from ninja.testing import TestClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from articles.models import Article, Reaction, ReactionCount
+from articles.reaction_counts import (
+    compute_reaction_counts,
+    get_reaction_counts,
+    rebuild_reaction_counts,
+)
+from users.common_api import router as common_router
+from users.models import User
+
+
+class ReactionCountsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        self.other = User.objects.create_user(
+            username="other", email="other@example.com", password="password123"
+        )
+        self.article = Article.objects.create(
+            title="Test Article",
+            abstract="This is a test abstract.",
+            authors=[{"value": "Author One", "label": "Author One"}],
+            submission_type="Public",
+            submitter=self.user,
+            faqs=[],
+        )
+        self.article_ct = ContentType.objects.get_for_model(Article)
+        self.client = TestClient(common_router)
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def react(self, vote):
+        # Counters are queued once the reaction's transaction commits
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/reactions",
+                json={
+                    "content_type": "articles.article",
+                    "object_id": self.article.id,
+                    "vote": vote,
+                },
+                headers=self.headers,
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def get_counts(self):
+        response = self.client.get(
+            f"/reaction_count/articles.article/{self.article.id}/",
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        return data["likes"], data["dislikes"], data["user_reaction"]
+
+    def test_toggling_reactions_moves_counters(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Reaction.objects.create(
+                user=self.other,
+                content_type=self.article_ct,
+                object_id=self.article.id,
+                vote=Reaction.LIKE,
+            )
+
+        self.react(Reaction.LIKE)
+        self.assertEqual(self.get_counts(), (2, 0, Reaction.LIKE))
+
+        self.react(Reaction.DISLIKE)
+        self.assertEqual(self.get_counts(), (1, 1, Reaction.DISLIKE))
+
+        self.react(Reaction.DISLIKE)
+        self.assertEqual(self.get_counts(), (1, 0, None))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Reaction.objects.filter(object_id=self.article.id).delete()
+        self.assertEqual(self.get_counts(), (0, 0, None))
+
+    def test_rebuild_repairs_drift(self):
+        for user in (self.user, self.other):
+            Reaction.objects.create(
+                user=user,
+                content_type=self.article_ct,
+                object_id=self.article.id,
+                vote=Reaction.LIKE,
+            )
+        # Counters were never flushed, e.g. after losing Redis
+        self.assertEqual(
+            get_reaction_counts(self.article_ct.id, [self.article.id]),
+            {self.article.id: {"like_count": 0, "dislike_count": 0}},
+        )
+
+        self.assertEqual(rebuild_reaction_counts(self.article_ct.id), 1)
+        self.assertEqual(
+            get_reaction_counts(self.article_ct.id, [self.article.id, 0]),
+            {
+                self.article.id: {"like_count": 2, "dislike_count": 0},
+                0: {"like_count": 0, "dislike_count": 0},
+            },
+        )
+        self.assertEqual(
+            compute_reaction_counts(self.article_ct.id),
+            {
+                (self.article_ct.id, self.article.id): {
+                    "like_count": 2,
+                    "dislike_count": 0,
+                }
+            },
+        )
+        self.assertEqual(ReactionCount.objects.count(), 1)
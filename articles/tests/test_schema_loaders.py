@@ -0,0 +1,112 @@
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from ninja.testing import TestClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from articles.discussion_api import article_discussions, serialize_discussions
+from articles.models import Article, Discussion, Review, ReviewComment
+from articles.review_api import article_reviews
+from articles.review_api import router as review_router
+from articles.review_api import serialize_reviews
+from myapp.loaders import BatchLoader, SchemaLoaders
+from users.models import Reputation, User
+
+
+class SchemaLoadersTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        self.article = Article.objects.create(
+            title="Test Article",
+            abstract="This is a test abstract.",
+            authors=[{"value": "Author One", "label": "Author One"}],
+            submission_type="Public",
+            submitter=self.user,
+            faqs=[],
+        )
+
+    def add_rows(self, count):
+        for _ in range(count):
+            index = User.objects.count()
+            author = User.objects.create_user(
+                username=f"author{index}",
+                email=f"author{index}@example.com",
+                password="password123",
+            )
+            review = Review.objects.create(
+                article=self.article,
+                user=author,
+                rating=3,
+                subject="Subject",
+                content="Content",
+                is_pseudonymous=True,
+            )
+            review.get_anonymous_name()
+            ReviewComment.objects.create(
+                review=review, author=self.user, content="Comment"
+            )
+            Discussion.objects.create(
+                article=self.article, author=author, topic="Topic", content="Content"
+            )
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            reviews = serialize_reviews(
+                self.article, list(article_reviews(self.article)), self.user
+            )
+            discussions = serialize_discussions(
+                self.article,
+                None,
+                list(article_discussions(self.article, None)),
+                self.user,
+            )
+        return len(queries), reviews, discussions
+
+    def test_queries_do_not_grow_with_rows(self):
+        self.add_rows(1)
+        few, _, _ = self.count_queries()
+
+        self.add_rows(4)
+        many, reviews, discussions = self.count_queries()
+
+        self.assertEqual(many, few)
+        self.assertEqual(len(reviews), 5)
+        self.assertEqual(len(discussions), 5)
+        for review in reviews:
+            self.assertEqual(review.comments_count, 1)
+            self.assertEqual(review.versions, [])
+            self.assertNotIn(review.user.username, {"testuser", "author1"})
+        # Reputations exist from signup, reading never creates them
+        self.assertEqual(Reputation.objects.count(), User.objects.count())
+        self.assertEqual(discussions[0].user.reputation_level, "Novice")
+
+    def test_loaders_are_shared_within_a_request(self):
+        self.add_rows(1)
+        review = Review.objects.get()
+        path = f"/reviews/{review.id}/"
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+        response = TestClient(review_router).get(path, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["comments_count"], 1)
+        self.assertTrue(response.json()["is_pseudonymous"])
+
+    def test_batch_loader_resolves_queued_keys_together(self):
+        batches = []
+
+        def batch_fn(keys):
+            batches.append(sorted(keys))
+            return {key: key * 10 for key in keys if key != 3}
+
+        loader = BatchLoader(batch_fn, default=0)
+        loader.queue([1, 2, 3])
+        loader.prime(4, 40)
+
+        self.assertEqual(loader.load(2), 20)
+        self.assertEqual(loader.load_many([1, 3, 4]), [10, 0, 40])
+        self.assertEqual(batches, [[1, 2, 3]])
+
+        request = type("Request", (), {})()
+        self.assertIs(SchemaLoaders.for_request(request), request._schema_loaders)
@@ -0,0 +1,53 @@
+"""
+Maintains the denormalized Article.is_hidden flag.
+
+An article is hidden when it is linked to at least one hidden community.
+Listings filter on the flag (covered by the ``article_public_feed`` partial
+index) instead of anti-joining CommunityArticle and Community per request,
+so every write that links or unlinks an article from a community, or
+changes a community's type, must call one of these helpers.
+"""
+
+from django.db.models import Exists, OuterRef
+
+from articles.models import Article
+from communities.models import Community, CommunityArticle
+
+
+def refresh_article_visibility(article_ids=None) -> int:
+    """
+    Recompute is_hidden for the given articles (all by default) in a single
+    UPDATE.
+
+    Returns:
+        Number of articles whose flag changed
+    """
+    in_hidden_community = Exists(
+        CommunityArticle.objects.filter(
+            article=OuterRef("pk"), community__type=Community.HIDDEN
+        )
+    )
+    articles = Article.objects.all()
+    if article_ids is not None:
+        articles = articles.filter(id__in=list(article_ids))
+
+    hidden = articles.filter(in_hidden_community, is_hidden=False).update(
+        is_hidden=True
+    )
+    visible = articles.filter(~in_hidden_community, is_hidden=True).update(
+        is_hidden=False
+    )
+    return hidden + visible
+
+
+def community_article_ids(community: Community) -> list:
+    return list(
+        CommunityArticle.objects.filter(community=community).values_list(
+            "article_id", flat=True
+        )
+    )
+
+
+def refresh_community_article_visibility(community: Community) -> int:
+    """Recompute is_hidden for every article of a community."""
+    return refresh_article_visibility(community_article_ids(community))
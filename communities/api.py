@@ -5,7 +5,8 @@ from typing import List, Optional
 from django.contrib.contenttypes.models import ContentType
 from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import Count, Q
+from django.db.models import Count, Q, Sum
+from django.http import HttpResponse
 from django.utils import timezone
 from ninja import File, Query, Router, UploadedFile
 from ninja.errors import HttpRequest
@@ -13,9 +14,16 @@ from ninja.errors import HttpRequest
 # from users.models import Hashtag, HashtagRelation
 from ninja.responses import codes_4xx, codes_5xx
 
-from articles.models import Discussion, Review
+from articles.models import ArticleStats
 from articles.schemas import ArticleBasicOut
+from articles.seo import schedule_article_meta_refresh
+from articles.visibility import (
+    community_article_ids,
+    refresh_article_visibility,
+    refresh_community_article_visibility,
+)
 from communities.models import Community, CommunityArticle
+from communities.roles import get_community_roles, get_highest_role
 from communities.schemas import (
     CommunityBasicOut,
     CommunityCreateSchema,
@@ -26,12 +34,15 @@ from communities.schemas import (
     CommunityUpdateSchema,
     PaginatedCommunities,
 )
+from communities.stats import get_community_daily_stats
+from myapp.conditional import conditional_response
 from myapp.constants import (
     COMMUNITY_SETTINGS,
     COMMUNITY_TYPES_LIST,
     EMAIL_DOMAIN_TO_ORG,
 )
-from myapp.feature_flags import MAX_COMMUNITIES_PER_USER
+from myapp.feature_flags import MAX_COMMUNITIES_PER_USER, MAX_STATS_WINDOW_DAYS
+from myapp.loaders import SchemaLoaders
 from myapp.schemas import DateCount, Message
 from myapp.utils import validate_tags
 from users.auth import JWTAuth, OptionalJWTAuth
@@ -166,6 +177,7 @@ def create_community(
 )
 def list_communities(
     request: HttpRequest,
+    response: HttpResponse,
     search: Optional[str] = None,
     sort: Optional[str] = None,
     page: int = 1,
@@ -212,6 +224,10 @@ def list_communities(
             logger.error(f"Error sorting communities: {e}")
             return 500, {"message": "Error sorting communities. Please try again."}
 
+        not_modified = conditional_response(request, response, "communities")
+        if not_modified:
+            return not_modified
+
         try:
             paginator = Paginator(communities, per_page)
             paginated_communities = paginator.get_page(page)
@@ -259,6 +275,9 @@ def list_communities(
                         if org:
                             org_map[community_id] = org
 
+            # Viewer's roles in every community of the page, in one query
+            roles = get_community_roles(user, community_ids, use_cache=True)
+
             # Bulk fetch bookmark status for authenticated users
             bookmarked_ids = set()
             if user and not isinstance(user, bool):
@@ -279,7 +298,7 @@ def list_communities(
                 role = None
                 if user and not isinstance(user, bool):
                     is_bookmarked = community.id in bookmarked_ids
-                    role = community.get_user_role(user)
+                    role = get_highest_role(roles[community.id])
 
                 response_data = {
                     "id": community.id,
@@ -426,7 +445,12 @@ def update_community(
                 if profile_pic_file:
                     community.profile_pic_url = profile_pic_file
 
-                community.save()
+                with transaction.atomic():
+                    community.save()
+                    if Community.HIDDEN in (old_type, community.type):
+                        refresh_community_article_visibility(community)
+                    if old_type != community.type:
+                        schedule_article_meta_refresh(community_article_ids(community))
 
                 # Create auto-subscriptions if community type changed to private/hidden
                 if old_type == Community.PUBLIC and community.type in [
@@ -500,7 +524,10 @@ def delete_community(request: HttpRequest, community_id: int):
 
         try:
             # Todo: Do not delete the community, just mark it as deleted
-            community.delete()
+            with transaction.atomic():
+                article_ids = community_article_ids(community)
+                community.delete()
+                refresh_article_visibility(article_ids)
         except Exception as e:
             logger.error(f"Error deleting community: {e}")
             return 500, {"message": "Error deleting community. Please try again."}
@@ -604,8 +631,13 @@ Community Stats Endpoint
     response={200: CommunityStatsResponse, codes_4xx: Message, codes_5xx: Message},
     auth=JWTAuth(),
 )
-def get_community_dashboard(request, community_slug: str):
+def get_community_dashboard(request, community_slug: str, days: int = 5):
     try:
+        if not 1 <= days <= MAX_STATS_WINDOW_DAYS:
+            return 400, {
+                "message": f"days must be between 1 and {MAX_STATS_WINDOW_DAYS}."
+            }
+
         try:
             community = Community.objects.get(slug=community_slug)
         except Community.DoesNotExist:
@@ -648,8 +680,14 @@ def get_community_dashboard(request, community_slug: str):
 
         try:
             # Review and discussion stats
-            total_reviews = Review.objects.filter(community=community).count()
-            total_discussions = Discussion.objects.filter(community=community).count()
+            community_stats = ArticleStats.objects.filter(
+                community=community
+            ).aggregate(
+                total_reviews=Sum("review_count"),
+                total_discussions=Sum("discussion_count"),
+            )
+            total_reviews = community_stats["total_reviews"] or 0
+            total_discussions = community_stats["total_discussions"] or 0
         except Exception as e:
             logger.error(f"Error retrieving review and discussion statistics: {e}")
             return 500, {
@@ -657,48 +695,48 @@ def get_community_dashboard(request, community_slug: str):
             }
 
         try:
-            # Member growth over time (last 5 days)
-            member_growth = []
-            for i in range(5):
-                date = now - timedelta(days=i)
-                count = community.members.filter(
-                    membership__joined_at__date__lte=date
-                ).count()
-                member_growth.append(DateCount(date=date.date(), count=count))
-            member_growth.reverse()
-        except Exception as e:
-            logger.error(f"Error calculating member growth trends: {e}")
-            return 500, {
-                "message": "Error calculating member growth trends. Please try again."
-            }
+            # Member growth and article submission trends (last `days` days)
+            # from the daily rollups
+            end_date = timezone.localdate()
+            start_date = end_date - timedelta(days=days - 1)
+            baseline, daily_stats = get_community_daily_stats(
+                community.id, start_date, end_date
+            )
 
-        try:
-            # Article submission trends (last 5 days)
-            article_submission_trends = []
-            for i in range(5):
-                date = now - timedelta(days=i)
-                count = community_articles.filter(submitted_at__date__lte=date).count()
-                article_submission_trends.append(
-                    DateCount(date=date.date(), count=count)
-                )
-            article_submission_trends.reverse()
+            member_growth = DateCount.cumulative(
+                start_date,
+                end_date,
+                {day: row["members_joined"] for day, row in daily_stats.items()},
+                baseline=baseline["members_joined"],
+            )
+            article_submission_trends = DateCount.cumulative(
+                start_date,
+                end_date,
+                {day: row["articles_submitted"] for day, row in daily_stats.items()},
+                baseline=baseline["articles_submitted"],
+            )
         except Exception as e:
-            logger.error(f"Error calculating article submission trends: {e}")
+            logger.error(f"Error calculating community growth trends: {e}")
             return 500, {
-                "message": "Error calculating article submission trends. Please try again."
+                "message": "Error calculating community growth trends. Please try again."
             }
 
         try:
             # Recently published articles
-            recently_published = community_articles.filter(status="published").order_by(
-                "-published_at"
-            )[
-                :5
-            ]  # Fetching the 5 most recent articles
+            recently_published = list(
+                community_articles.filter(status="published")
+                .select_related("article__submitter")
+                .order_by("-published_at")[:5]
+            )  # Fetching the 5 most recent articles
+            loaders = SchemaLoaders.for_request(request)
+            ArticleBasicOut.queue_lookups(
+                (community_article.article for community_article in recently_published),
+                loaders,
+            )
 
             recently_published_articles = [
                 ArticleBasicOut.from_orm_with_custom_fields(
-                    community_article.article, request.auth
+                    community_article.article, request.auth, loaders=loaders
                 )
                 for community_article in recently_published
             ]
@@ -9,6 +9,7 @@ from communities.models import Community, JoinRequest
 from communities.schemas import JoinRequestSchema, Message
 from users.auth import JWTAuth
 from users.models import Notification
+from users.notification_fanout import notify_recipients
 
 router = Router(auth=JWTAuth(), tags=["Join Community"])
 
@@ -117,14 +118,17 @@ def join_community(request, community_id: int):
                     "message": "Error creating join request. Please try again."
                 }
 
-            # Send a notification to the first admin
+            # Send a notification to the community admins
             try:
-                Notification.objects.create(
-                    user=community.admins.first(),
-                    community=community,
-                    notification_type="join_request_received",
-                    message=f"New join request from {user.username}",
-                    link=f"/community/{community.name}/requests",
+                notify_recipients(
+                    {
+                        "community_id": community.id,
+                        "category": "communities",
+                        "notification_type": "join_request_received",
+                        "message": f"New join request from {user.username}",
+                        "link": f"/community/{community.name}/requests",
+                    },
+                    {"community_id": community.id, "roles": ["admins"]},
                 )
             except Exception as e:
                 logger.error(f"Error creating notification: {e}")
@@ -15,6 +15,7 @@ from articles.schemas import (
     PaginatedArticlesListResponse,
     PaginatedArticlesResponse,
 )
+from articles.visibility import refresh_article_visibility
 from communities.models import Community, CommunityArticle
 from communities.schemas import (
     CommunityArticlePseudonymousOut,
@@ -22,8 +23,10 @@ from communities.schemas import (
     Message,
     StatusFilter,
 )
+from communities.stats import record_community_article_submitted
 from users.auth import JWTAuth, OptionalJWTAuth
-from users.models import Notification, User
+from users.models import User
+from users.notification_fanout import notify_recipients
 
 # Initialize a router for the communities API
 router = Router(tags=["Community Articles"])
@@ -85,9 +88,14 @@ def submit_article(request, community_name: str, article_slug: str):
                 else CommunityArticle.SUBMITTED
             )
 
-            community_article = CommunityArticle.objects.create(
-                article=article, community=community, status=community_article_status
-            )
+            with transaction.atomic():
+                community_article = CommunityArticle.objects.create(
+                    article=article,
+                    community=community,
+                    status=community_article_status,
+                )
+                record_community_article_submitted(community_article)
+                refresh_article_visibility([article.id])
 
             # Create auto-subscriptions if article is published to private/hidden community
             if community_article_status == CommunityArticle.PUBLISHED:
@@ -111,16 +119,23 @@ def submit_article(request, community_name: str, article_slug: str):
 
         # Send a notification to the community admins
         try:
-            Notification.objects.create(
-                user=community.admins.first(),
-                community=community,
-                category="communities",
-                notification_type="article_submitted",
-                message=(
-                    f"New article submitted in {community.name} by {request.auth.username}"
-                ),
-                link=f"/community/{community.name}/submissions",
-                content=article.title,
+            notify_recipients(
+                {
+                    "community_id": community.id,
+                    "article_id": article.id,
+                    "category": "communities",
+                    "notification_type": "article_submitted",
+                    "message": (
+                        f"New article submitted in {community.name} by {request.auth.username}"
+                    ),
+                    "link": f"/community/{community.name}/submissions",
+                    "content": article.title,
+                },
+                {
+                    "community_id": community.id,
+                    "roles": ["admins"],
+                    "exclude_user_ids": [request.auth.id],
+                },
             )
         except Exception as e:
             logger.error(f"Error creating notification: {e}")
@@ -759,6 +774,7 @@ def remove_article_from_community(request, community_article_id: int):
                 # Delete the CommunityArticle (CASCADE will handle related objects)
                 try:
                     community_article.delete()
+                    refresh_article_visibility([community_article.article_id])
                     logger.info(
                         f"Successfully removed article '{article_title}' from community '{community_name}'"
                     )
@@ -1,14 +1,15 @@
 import logging
-from typing import Literal
+from typing import Literal, Optional
 
+from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Count, Q
 from ninja import Router
 from ninja.responses import codes_4xx, codes_5xx
 
 from communities.models import Community, CommunityArticle, Membership
 from communities.schemas import MembersResponse, Message, UserSchema
-from myapp.feature_flags import MAX_ADMINS_PER_COMMUNITY
+from myapp.feature_flags import MAX_ADMINS_PER_COMMUNITY, MAX_MEMBERS_PAGE_SIZE
 from users.auth import JWTAuth
 from users.models import User
 
@@ -20,11 +21,88 @@ logger = logging.getLogger(__name__)
 # Todo: Create a decorator function to check if the user is an admin of the community
 
 
+def get_member_stats(community: Community, user_ids) -> dict:
+    """
+    Join dates and article counts of many users in a community, with one
+    grouped query per statistic.
+
+    Args:
+        community: The community
+        user_ids: IDs of the users
+
+    Returns:
+        Dict mapping each user ID to a dict of UserSchema statistics fields
+    """
+    stats = {
+        user_id: {
+            "joined_at": None,
+            "articles_submitted": 0,
+            "articles_published": 0,
+            "articles_reviewed": 0,
+        }
+        for user_id in user_ids
+    }
+    if not stats:
+        return stats
+
+    for user_id, joined_at in Membership.objects.filter(
+        community=community, user_id__in=stats
+    ).values_list("user_id", "joined_at"):
+        stats[user_id]["joined_at"] = joined_at
+
+    for row in (
+        CommunityArticle.objects.filter(
+            community=community, article__submitter_id__in=stats
+        )
+        .values("article__submitter_id")
+        .annotate(
+            submitted=Count("id"),
+            published=Count("id", filter=Q(status=CommunityArticle.PUBLISHED)),
+        )
+        .order_by()
+    ):
+        stats[row["article__submitter_id"]].update(
+            articles_submitted=row["submitted"], articles_published=row["published"]
+        )
+
+    for user_id, reviewed in (
+        CommunityArticle.assigned_reviewers.through.objects.filter(
+            communityarticle__community=community, user_id__in=stats
+        )
+        .exclude(communityarticle__status=CommunityArticle.SUBMITTED)
+        .values("user_id")
+        .annotate(reviewed=Count("communityarticle_id"))
+        .values_list("user_id", "reviewed")
+        .order_by()
+    ):
+        stats[user_id]["articles_reviewed"] = reviewed
+
+    return stats
+
+
 @router.get(
     "/{community_name}/members",
     response={200: MembersResponse, codes_4xx: Message, codes_5xx: Message},
 )
-def get_community_members(request, community_name: str):
+def get_community_members(
+    request,
+    community_name: str,
+    role: Optional[Literal["admin", "moderator", "reviewer", "member"]] = None,
+    page: int = 1,
+    per_page: Optional[int] = None,
+):
+    """
+    List a community's members by role, for its admins.
+
+    Args:
+        role: Only list users with this role, all roles by default. Members
+            are the users without any other role.
+        page: Page number, applied to every listed role. Past the last
+            page of a role its list is empty.
+        per_page: Users per role and page, every user if not given
+
+    The totals always count every role, whatever the role filter.
+    """
     try:
         try:
             community = Community.objects.get(name=community_name)
@@ -47,61 +125,38 @@ def get_community_members(request, community_name: str):
                 "message": "Error checking administrative privileges. Please try again."
             }
 
-        def get_user_data(user: User):
-            try:
-                membership = Membership.objects.filter(
-                    user=user, community=community
-                ).first()
-
-                # Fetch submitted articles
-                articles_submitted = CommunityArticle.objects.filter(
-                    article__submitter=user, community=community
-                ).count()
-
-                # Fetch published articles
-                articles_published = CommunityArticle.objects.filter(
-                    article__submitter=user,
-                    community=community,
-                    status=CommunityArticle.PUBLISHED,
-                ).count()
-
-                # Fetch reviewed articles
-                articles_reviewed = (
-                    CommunityArticle.objects.filter(
-                        assigned_reviewers=user, community=community
-                    )
-                    .exclude(status=CommunityArticle.SUBMITTED)
-                    .count()
-                )
+        if per_page is not None and not 1 <= per_page <= MAX_MEMBERS_PAGE_SIZE:
+            return 400, {
+                "message": f"per_page must be between 1 and {MAX_MEMBERS_PAGE_SIZE}."
+            }
+        if page < 1:
+            return 400, {"message": "page must be at least 1."}
+        if per_page is None:
+            # Everyone is listed on the first page
+            page = 1
 
-                return UserSchema(
-                    id=user.id,
-                    username=user.username,
-                    email=user.email,
-                    profile_pic_url=user.profile_pic_url,
-                    joined_at=membership.joined_at if membership else None,
-                    articles_submitted=articles_submitted,
-                    articles_published=articles_published,
-                    articles_reviewed=articles_reviewed,
+        try:
+            users = User.objects.only("id", "username", "email", "profile_pic_url")
+            role_tables = {
+                "admins": Community.admins.through,
+                "moderators": Community.moderators.through,
+                "reviewers": Community.reviewers.through,
+            }
+            groups = {
+                group: users.filter(
+                    id__in=table.objects.filter(community=community).values("user_id")
                 )
-            except Exception:
-                # If there's an error processing a user, return a minimal record instead of failing
-                return UserSchema(
-                    id=user.id,
-                    username=user.username,
-                    email=user.email,
-                    profile_pic_url=user.profile_pic_url,
-                    joined_at=None,
-                    articles_submitted=0,
-                    articles_published=0,
-                    articles_reviewed=0,
+                for group, table in role_tables.items()
+            }
+            # Members are the users without any other role
+            groups["members"] = users.filter(
+                id__in=Membership.objects.filter(community=community).values("user_id")
+            )
+            for group in role_tables:
+                groups["members"] = groups["members"].exclude(
+                    id__in=groups[group].values("id")
                 )
-
-        try:
-            # Get lists of distinct user groups
-            moderators = set(community.moderators.all())
-            reviewers = set(community.reviewers.all())
-            admins = set(community.admins.all())
+            listed_groups = [f"{role}s"] if role else list(groups)
         except Exception as e:
             logger.error(f"Error retrieving community roles: {e}")
             return 500, {
@@ -109,33 +164,56 @@ def get_community_members(request, community_name: str):
             }
 
         try:
-            # Exclude moderators, reviewers, and admins from members
-            members = community.members.exclude(
-                Q(id__in=[user.id for user in moderators])
-                | Q(id__in=[user.id for user in reviewers])
-                | Q(id__in=[user.id for user in admins])
+            listed, totals = {}, {}
+            for group, queryset in groups.items():
+                queryset = queryset.order_by("id")
+                if group not in listed_groups:
+                    totals[group] = queryset.count()
+                elif per_page is None:
+                    listed[group] = list(queryset)
+                    totals[group] = len(listed[group])
+                else:
+                    paginator = Paginator(queryset, per_page)
+                    totals[group] = paginator.count
+                    # Not clamped, so the listed page is the requested one
+                    listed[group] = (
+                        list(paginator.page(page).object_list)
+                        if page <= paginator.num_pages
+                        else []
+                    )
+
+            stats = get_member_stats(
+                community, {user.id for group in listed.values() for user in group}
             )
-        except Exception as e:
-            logger.error(f"Error filtering community members: {e}")
-            return 500, {
-                "message": "Error filtering community members. Please try again."
+            response = {
+                group: [
+                    UserSchema(
+                        id=user.id,
+                        username=user.username,
+                        email=user.email,
+                        profile_pic_url=user.profile_pic_url,
+                        **stats[user.id],
+                    )
+                    for user in group_users
+                ]
+                for group, group_users in listed.items()
             }
-
-        try:
-            members_data = [get_user_data(user) for user in members]
-            moderators_data = [get_user_data(user) for user in moderators]
-            reviewers_data = [get_user_data(user) for user in reviewers]
-            admins_data = [get_user_data(user) for user in admins]
         except Exception as e:
             logger.error(f"Error processing member data: {e}")
             return 500, {"message": "Error processing member data. Please try again."}
 
         return 200, {
             "community_id": community.id,
-            "members": members_data,
-            "moderators": moderators_data,
-            "reviewers": reviewers_data,
-            "admins": admins_data,
+            "members": response.get("members", []),
+            "moderators": response.get("moderators", []),
+            "reviewers": response.get("reviewers", []),
+            "admins": response.get("admins", []),
+            "total_members": totals["members"],
+            "total_moderators": totals["moderators"],
+            "total_reviewers": totals["reviewers"],
+            "total_admins": totals["admins"],
+            "page": page,
+            "per_page": per_page,
         }
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
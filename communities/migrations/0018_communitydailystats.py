@@ -0,0 +1,45 @@
+# Generated by Django 5.0.14 on 2026-10-18 21:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("communities", "0017_alter_communityarticle_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CommunityDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("members_joined", models.IntegerField(default=0)),
+                ("articles_submitted", models.IntegerField(default=0)),
+                (
+                    "community",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="communities.community",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["date"], name="communities_date_6a958d_idx")
+                ],
+                "unique_together": {("community", "date")},
+            },
+        ),
+    ]
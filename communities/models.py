@@ -3,9 +3,12 @@ import uuid
 
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
 from django.utils.text import slugify
 
 from myapp import settings
+from myapp.conditional import bump_content_versions
 from users.models import HashtagRelation, User
 
 
@@ -177,3 +180,155 @@ class CommunityArticle(models.Model):
             f"{self.article.title} in {self.community.name} - "
             f"{self.get_status_display()}"
         )
+
+
+class CommunityDailyStats(models.Model):
+    """
+    Daily rollup used by the community dashboard charts.
+
+    Counts are bucketed by the day the current memberships / community
+    articles were created, so the running sum up to a day gives the totals
+    the dashboard shows for that day.
+    """
+
+    community = models.ForeignKey(
+        Community, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    date = models.DateField()
+    members_joined = models.IntegerField(default=0)
+    articles_submitted = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("community", "date")
+        indexes = [
+            models.Index(fields=["date"]),
+        ]
+
+    def __str__(self):
+        return f"Daily stats for {self.community_id} on {self.date}"
+
+
+# Conditional GET validators (see myapp/conditional.py). The "communities"
+# scope covers the community listing, which shows member and article counts
+# and the viewer's role.
+@receiver([post_save, post_delete], sender=Community)
+def bump_community_version(sender, instance, **kwargs):
+    bump_content_versions("communities", f"community:{instance.pk}")
+
+
+@receiver(m2m_changed, sender=Community.members.through)
+@receiver(m2m_changed, sender=Community.admins.through)
+@receiver(m2m_changed, sender=Community.reviewers.through)
+@receiver(m2m_changed, sender=Community.moderators.through)
+def bump_community_membership_version(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        community_ids = pk_set or ()
+    else:
+        community_ids = [instance.pk]
+    bump_content_versions(
+        "communities", *(f"community:{community_id}" for community_id in community_ids)
+    )
+
+
+# Memberships created or deleted directly, e.g. on accepted invitations,
+# skip m2m_changed.
+@receiver([post_save, post_delete], sender=Membership)
+def bump_membership_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_content_versions("communities", f"community:{instance.community_id}")
+
+
+# Cached community roles (see communities/roles.py). After a clear the
+# removed users are no longer known, so they are read before it.
+@receiver(m2m_changed, sender=Community.members.through)
+@receiver(m2m_changed, sender=Community.admins.through)
+@receiver(m2m_changed, sender=Community.reviewers.through)
+@receiver(m2m_changed, sender=Community.moderators.through)
+def invalidate_changed_roles(sender, instance, action, reverse, pk_set, **kwargs):
+    from communities.roles import invalidate_community_roles
+
+    if reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            invalidate_community_roles(instance.pk)
+    elif action in ("post_add", "post_remove"):
+        invalidate_community_roles(*pk_set)
+    elif action == "pre_clear":
+        invalidate_community_roles(
+            *sender.objects.filter(community_id=instance.pk).values_list(
+                "user_id", flat=True
+            )
+        )
+
+
+@receiver([post_save, post_delete], sender=Membership)
+def invalidate_membership_roles(sender, instance, raw=False, **kwargs):
+    from communities.roles import invalidate_community_roles
+
+    if not raw:
+        invalidate_community_roles(instance.user_id)
+
+
+# Leaderboards (see users/leaderboard.py) and profile counters (see
+# users/counters.py). members.add() bulk creates the memberships without
+# post_save, removals go through post_delete.
+@receiver(m2m_changed, sender=Community.members.through)
+def record_added_members(sender, instance, action, reverse, pk_set, **kwargs):
+    from users.counters import bump_user_counters
+    from users.leaderboard import record_membership_change
+
+    if action != "post_add" or not pk_set:
+        return
+    if reverse:
+        for community_id in pk_set:
+            record_membership_change(community_id, [instance.pk], joined=True)
+        bump_user_counters(instance.pk, communities_joined=len(pk_set))
+    else:
+        record_membership_change(instance.pk, pk_set, joined=True)
+        for user_id in pk_set:
+            bump_user_counters(user_id, communities_joined=1)
+
+
+@receiver(post_save, sender=Membership)
+def record_created_membership(sender, instance, created, raw=False, **kwargs):
+    from users.counters import bump_user_counters
+    from users.leaderboard import record_membership_change
+
+    if created and not raw:
+        record_membership_change(instance.community_id, [instance.user_id], joined=True)
+        bump_user_counters(instance.user_id, communities_joined=1)
+
+
+@receiver(post_delete, sender=Membership)
+def record_deleted_membership(sender, instance, **kwargs):
+    from users.counters import bump_user_counters
+    from users.leaderboard import record_membership_change
+
+    record_membership_change(instance.community_id, [instance.user_id], joined=False)
+    bump_user_counters(instance.user_id, communities_joined=-1)
+
+
+@receiver(post_delete, sender=Community)
+def drop_community_leaderboard(sender, instance, **kwargs):
+    from users.leaderboard import record_community_removed
+
+    record_community_removed(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=CommunityArticle)
+def bump_community_article_version(sender, instance, **kwargs):
+    bump_content_versions(
+        "communities",
+        f"community:{instance.community_id}",
+        f"article:{instance.article_id}",
+    )
+
+
+@receiver([post_save, post_delete], sender=CommunityArticle)
+def refresh_community_article_meta(sender, instance, **kwargs):
+    from articles.seo import schedule_article_meta_refresh
+
+    schedule_article_meta_refresh([instance.article_id])
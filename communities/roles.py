@@ -0,0 +1,154 @@
+"""
+Batched community role resolution.
+
+``Community.get_user_role`` answers for one community with up to four EXISTS
+queries. ``get_community_roles`` answers for many communities at once with
+a single UNION ALL over the admins, moderators, reviewers and membership
+tables.
+
+Results are memoized on the user instance. Each request authenticates its
+own instance, so the memo lives exactly as long as the request. With
+``use_cache`` the user's complete role map is also kept in the shared
+cache, keyed by the ``community_roles:<id>`` content version (see
+myapp/conditional.py) that the role receivers in communities/models.py bump
+on every role change.
+"""
+
+import logging
+
+from django.core.cache import cache
+from django.db.models import CharField, Value
+
+from communities.models import Community, Membership
+from myapp.conditional import bump_content_versions, get_content_versions
+
+logger = logging.getLogger(__name__)
+
+ADMIN = "admin"
+MODERATOR = "moderator"
+REVIEWER = "reviewer"
+MEMBER = "member"
+# Highest role first
+ROLE_TABLES = {
+    ADMIN: Community.admins.through,
+    MODERATOR: Community.moderators.through,
+    REVIEWER: Community.reviewers.through,
+    MEMBER: Membership,
+}
+
+ROLE_CACHE_PREFIX = "community_roles"
+ROLE_CACHE_TTL = 300  # 5 minutes, versions make invalidation immediate
+
+MEMO_ATTRIBUTE = "_community_roles"
+
+
+def _scope(user_id) -> str:
+    return f"{ROLE_CACHE_PREFIX}:{user_id}"
+
+
+def _query_roles(user_id, community_ids=None) -> dict:
+    queries = []
+    for role, table in ROLE_TABLES.items():
+        rows = table.objects.filter(user_id=user_id)
+        if community_ids is not None:
+            rows = rows.filter(community_id__in=community_ids)
+        queries.append(
+            rows.annotate(role=Value(role, output_field=CharField()))
+            .values_list("community_id", "role")
+            .order_by()
+        )
+
+    roles = {}
+    for community_id, role in queries[0].union(*queries[1:], all=True):
+        roles.setdefault(community_id, set()).add(role)
+    return {community_id: frozenset(found) for community_id, found in roles.items()}
+
+
+def _load_all_roles(user_id) -> dict:
+    """The user's roles in every community, through the shared cache."""
+    versions = get_content_versions(_scope(user_id))
+    key = None
+    if versions is not None:
+        key = f"{_scope(user_id)}:{versions[_scope(user_id)]}"
+        try:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        except Exception as e:
+            logger.warning(f"Failed to read cached roles of user {user_id}: {e}")
+
+    roles = _query_roles(user_id)
+    if key is not None:
+        try:
+            cache.set(key, roles, timeout=ROLE_CACHE_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to cache roles of user {user_id}: {e}")
+    return roles
+
+
+def get_community_roles(user, community_ids, use_cache: bool = False) -> dict:
+    """
+    Resolve a user's roles in many communities.
+
+    Args:
+        user: The user, anonymous users (None or True) have no roles
+        community_ids: IDs of the communities to resolve
+        use_cache: Load the user's complete role map through the shared
+            cache instead of querying only the given communities
+
+    Returns:
+        Dict mapping every given community ID to a frozenset of roles
+    """
+    community_ids = set(community_ids)
+    if not user or isinstance(user, bool):
+        return {community_id: frozenset() for community_id in community_ids}
+
+    memo = user.__dict__.setdefault(MEMO_ATTRIBUTE, {})
+    missing = community_ids - memo.keys()
+    if missing:
+        if use_cache:
+            resolved = _load_all_roles(user.pk)
+        else:
+            resolved = _query_roles(user.pk, missing)
+        for community_id in missing:
+            memo[community_id] = resolved.get(community_id, frozenset())
+    return {community_id: memo[community_id] for community_id in community_ids}
+
+
+def get_highest_role(roles):
+    """
+    Returns:
+        The highest of the given roles, or None
+    """
+    for role in ROLE_TABLES:
+        if role in roles:
+            return role
+    return None
+
+
+def get_user_role(user, community_id, use_cache: bool = False):
+    """Batched counterpart of ``Community.get_user_role``."""
+    roles = get_community_roles(user, [community_id], use_cache=use_cache)
+    return get_highest_role(roles[community_id])
+
+
+def is_community_member(user, community_id, use_cache: bool = False) -> bool:
+    """Batched counterpart of ``Community.is_member``."""
+    roles = get_community_roles(user, [community_id], use_cache=use_cache)
+    return MEMBER in roles[community_id]
+
+
+def is_community_admin(user, community_id, use_cache: bool = False) -> bool:
+    """Batched counterpart of ``Community.is_admin``."""
+    roles = get_community_roles(user, [community_id], use_cache=use_cache)
+    return ADMIN in roles[community_id]
+
+
+def invalidate_community_roles(*user_ids):
+    """Move the users' cached roles to a new version once the transaction commits."""
+    bump_content_versions(*(_scope(user_id) for user_id in user_ids))
+
+
+def clear_memoized_roles(user):
+    """Forget the roles memoized on a user instance, e.g. after changing them."""
+    user.__dict__.pop(MEMO_ATTRIBUTE, None)
@@ -396,6 +396,13 @@ class MembersResponse(Schema):
     moderators: List[UserSchema]
     reviewers: List[UserSchema]
     admins: List[UserSchema]
+    # Sizes of the role lists before pagination
+    total_members: int
+    total_moderators: int
+    total_reviewers: int
+    total_admins: int
+    page: int
+    per_page: Optional[int]
 
 
 class UserToJoin(Schema):
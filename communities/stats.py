@@ -0,0 +1,142 @@
+"""
+Helpers for the CommunityDailyStats rollup table used by the dashboard charts.
+
+Community article submissions bump the rollup as they happen. Membership
+changes are picked up by the periodic refresh in communities/tasks.py, which
+also repairs buckets for members who left or articles that were removed.
+"""
+
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from communities.models import CommunityArticle, CommunityDailyStats, Membership
+
+DAILY_STAT_FIELDS = ("members_joined", "articles_submitted")
+
+
+def bump_community_daily_stats(community_id: int, day: date = None, **deltas):
+    """
+    Atomically apply counter deltas to a community's daily rollup row.
+
+    Args:
+        community_id: ID of the community
+        day: Day bucket to update, defaults to today
+        **deltas: Field name to increment (negative values decrement)
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    unknown = set(deltas) - set(DAILY_STAT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown community daily stats fields: {sorted(unknown)}")
+
+    with transaction.atomic():
+        stats, _ = CommunityDailyStats.objects.get_or_create(
+            community_id=community_id, date=day or timezone.localdate()
+        )
+        CommunityDailyStats.objects.filter(pk=stats.pk).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+
+
+def record_community_article_submitted(community_article: CommunityArticle):
+    bump_community_daily_stats(
+        community_article.community_id,
+        timezone.localdate(community_article.submitted_at),
+        articles_submitted=1,
+    )
+
+
+def get_community_daily_stats(community_id: int, start_date: date, end_date: date):
+    """
+    Read the rollups needed to draw cumulative charts for a date window.
+
+    Returns:
+        Tuple of (baseline, per_day). ``baseline`` holds the totals of every
+        DAILY_STAT_FIELDS before start_date, ``per_day`` maps each date in the
+        window with activity to its counts.
+    """
+    rows = CommunityDailyStats.objects.filter(community_id=community_id)
+
+    baseline = rows.filter(date__lt=start_date).aggregate(
+        **{f"total_{field}": Sum(field) for field in DAILY_STAT_FIELDS}
+    )
+    baseline = {field: baseline[f"total_{field}"] or 0 for field in DAILY_STAT_FIELDS}
+
+    per_day = {
+        row["date"]: {field: row[field] for field in DAILY_STAT_FIELDS}
+        for row in rows.filter(date__range=[start_date, end_date]).values(
+            "date", *DAILY_STAT_FIELDS
+        )
+    }
+    return baseline, per_day
+
+
+def compute_community_daily_stats(
+    start_date: date = None, end_date: date = None
+) -> dict:
+    """
+    Recompute the rollups from memberships and community articles.
+    Without a window every day is recomputed.
+
+    Returns:
+        Dict mapping (community_id, date) to a dict of DAILY_STAT_FIELDS.
+    """
+    rows = defaultdict(lambda: dict.fromkeys(DAILY_STAT_FIELDS, 0))
+
+    memberships = Membership.objects.all()
+    community_articles = CommunityArticle.objects.all()
+    if start_date and end_date:
+        memberships = memberships.filter(joined_at__date__range=[start_date, end_date])
+        community_articles = community_articles.filter(
+            submitted_at__date__range=[start_date, end_date]
+        )
+
+    for item in (
+        memberships.annotate(day=TruncDate("joined_at"))
+        .values("community_id", "day")
+        .annotate(count=Count("id"))
+    ):
+        rows[(item["community_id"], item["day"])]["members_joined"] = item["count"]
+
+    for item in (
+        community_articles.annotate(day=TruncDate("submitted_at"))
+        .values("community_id", "day")
+        .annotate(count=Count("id"))
+    ):
+        rows[(item["community_id"], item["day"])]["articles_submitted"] = item["count"]
+
+    return rows
+
+
+def rebuild_community_daily_stats(
+    start_date: date = None, end_date: date = None
+) -> int:
+    """
+    Replace the rollup rows (of a date window, or all of them) with
+    recomputed ones.
+
+    Returns:
+        Number of rollup rows written
+    """
+    rows = compute_community_daily_stats(start_date, end_date)
+
+    existing = CommunityDailyStats.objects.all()
+    if start_date and end_date:
+        existing = existing.filter(date__range=[start_date, end_date])
+
+    with transaction.atomic():
+        existing.delete()
+        CommunityDailyStats.objects.bulk_create(
+            [
+                CommunityDailyStats(community_id=community_id, date=day, **values)
+                for (community_id, day), values in rows.items()
+            ]
+        )
+    return len(rows)
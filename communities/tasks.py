@@ -0,0 +1,32 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.utils import timezone
+
+from communities.stats import rebuild_community_daily_stats
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3)
+def refresh_community_daily_stats(self, days=2):
+    """
+    Recompute the community daily rollups of the last `days` days, or every
+    day when `days` is None.
+
+    New memberships only reach the rollups through this task, and the full
+    rebuild also drops members who left and articles that were removed.
+    """
+    try:
+        if days is None:
+            rows = rebuild_community_daily_stats()
+        else:
+            end_date = timezone.localdate()
+            start_date = end_date - timedelta(days=days - 1)
+            rows = rebuild_community_daily_stats(start_date, end_date)
+        logger.info(f"Refreshed community daily stats: {rows} rows")
+        return rows
+    except Exception as e:
+        logger.error(f"Error refreshing community daily stats: {e}")
+        raise self.retry(exc=e, countdown=60)
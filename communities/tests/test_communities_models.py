@@ -1,15 +1,20 @@
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from articles.models import Article
 from communities.models import (
     Community,
     CommunityArticle,
+    CommunityDailyStats,
     Invitation,
     JoinRequest,
     Membership,
 )
+from communities.roles import get_community_roles, get_highest_role
+from communities.stats import get_community_daily_stats, rebuild_community_daily_stats
+from myapp.conditional import get_content_versions
 
 User = get_user_model()
 
@@ -221,6 +226,102 @@ class MembershipModelTest(TestCase):
         self.community.delete()
         self.assertFalse(Membership.objects.filter(community_id=community_id).exists())
 
+    def test_daily_stats_rebuild_counts_memberships(self):
+        today = timezone.localdate()
+        rebuild_community_daily_stats()
+
+        baseline, per_day = get_community_daily_stats(self.community.id, today, today)
+        self.assertEqual(baseline["members_joined"], 0)
+        self.assertEqual(per_day[today]["members_joined"], 2)
+
+        self.membership2.delete()
+        rebuild_community_daily_stats(today, today)
+        self.assertEqual(
+            CommunityDailyStats.objects.get(
+                community=self.community, date=today
+            ).members_joined,
+            1,
+        )
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+)
+class CommunityRoleResolverTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="user1", email="user1@example.com", password="password123"
+        )
+        self.communities = [
+            Community.objects.create(
+                name=f"Community {index}", description="Description", type="public"
+            )
+            for index in range(4)
+        ]
+        first, second, third, _ = self.communities
+        first.admins.add(self.user)
+        first.members.add(self.user)
+        second.moderators.add(self.user)
+        second.members.add(self.user)
+        third.reviewers.add(self.user)
+        self.community_ids = [community.id for community in self.communities]
+
+    def test_roles_resolve_in_one_query(self):
+        with self.assertNumQueries(1):
+            roles = get_community_roles(self.user, self.community_ids)
+        with self.assertNumQueries(0):
+            get_community_roles(self.user, self.community_ids[:2])
+
+        self.assertEqual(roles[self.community_ids[0]], {"admin", "member"})
+        for community in self.communities:
+            self.assertEqual(
+                get_highest_role(roles[community.id]),
+                community.get_user_role(self.user),
+            )
+        self.assertEqual(
+            get_community_roles(True, self.community_ids[:1]),
+            {self.community_ids[0]: frozenset()},
+        )
+
+    def test_cached_roles_follow_role_changes(self):
+        get_community_roles(self.user, self.community_ids, use_cache=True)
+        # A new request gets a new user instance
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            roles = get_community_roles(user, self.community_ids, use_cache=True)
+        self.assertEqual(roles[self.community_ids[3]], frozenset())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.communities[3].members.add(self.user)
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            roles = get_community_roles(user, self.community_ids, use_cache=True)
+        self.assertEqual(roles[self.community_ids[3]], {"member"})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.communities[0].admins.clear()
+        roles = get_community_roles(
+            User.objects.get(pk=self.user.pk), self.community_ids, use_cache=True
+        )
+        self.assertEqual(roles[self.community_ids[0]], {"member"})
+
+    def test_direct_memberships_bump_content_versions(self):
+        community = self.communities[3]
+        scopes = ["communities", f"community:{community.id}"]
+        before = get_content_versions(*scopes)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            membership = Membership.objects.create(user=self.user, community=community)
+        created = get_content_versions(*scopes)
+        with self.captureOnCommitCallbacks(execute=True):
+            membership.delete()
+        deleted = get_content_versions(*scopes)
+
+        for scope in scopes:
+            self.assertGreater(created[scope], before[scope])
+            self.assertGreater(deleted[scope], created[scope])
+
 
 class InvitationModelTest(TestCase):
     def setUp(self):
@@ -0,0 +1,136 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from ninja.testing import TestClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from articles.models import Article
+from communities.members_api import router
+from communities.models import Community, CommunityArticle
+from users.models import User
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CommunityMembersAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.community = Community.objects.create(
+            name="Test Community", description="Description", type="public"
+        )
+        self.admin = User.objects.create_user(
+            username="admin", email="admin@example.com", password="password123"
+        )
+        self.reviewer = User.objects.create_user(
+            username="reviewer", email="reviewer@example.com", password="password123"
+        )
+        self.community.members.add(self.admin, self.reviewer)
+        self.community.admins.add(self.admin)
+        self.community.reviewers.add(self.reviewer)
+
+        self.members = []
+        for index in range(10):
+            member = User.objects.create_user(
+                username=f"member{index}",
+                email=f"member{index}@example.com",
+                password="password123",
+            )
+            self.community.members.add(member)
+            self.members.append(member)
+
+        for index, status in enumerate(
+            [CommunityArticle.PUBLISHED, CommunityArticle.PUBLISHED, "submitted"]
+        ):
+            article = Article.objects.create(
+                title=f"Article {index}",
+                abstract="Abstract",
+                authors=["Author"],
+                submission_type="Public",
+                submitter=self.members[0],
+            )
+            community_article = CommunityArticle.objects.create(
+                article=article, community=self.community, status=status
+            )
+            community_article.assigned_reviewers.add(self.reviewer)
+
+        self.client = TestClient(router)
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.admin)}"}
+
+    def get_members(self, query=""):
+        response = self.client.get(
+            f"/{self.community.name}/members?{query}", headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_listing_aggregates_member_stats(self):
+        data = self.get_members()
+
+        self.assertEqual([user["id"] for user in data["admins"]], [self.admin.id])
+        self.assertEqual(
+            [user["id"] for user in data["members"]],
+            [member.id for member in self.members],
+        )
+        self.assertEqual(data["total_members"], 10)
+        self.assertEqual(data["total_reviewers"], 1)
+
+        submitter = data["members"][0]
+        self.assertEqual(submitter["articles_submitted"], 3)
+        self.assertEqual(submitter["articles_published"], 2)
+        self.assertIsNotNone(submitter["joined_at"])
+        self.assertEqual(data["reviewers"][0]["articles_reviewed"], 2)
+
+    def test_query_count_does_not_grow_with_members(self):
+        # Warm the auth cache so both captured requests skip the user lookup
+        self.get_members()
+        with CaptureQueriesContext(connection) as queries:
+            self.get_members()
+        query_count = len(queries)
+
+        for index in range(10, 30):
+            self.community.members.add(
+                User.objects.create_user(
+                    username=f"member{index}",
+                    email=f"member{index}@example.com",
+                    password="password123",
+                )
+            )
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get_members()
+
+        self.assertEqual(len(data["members"]), 30)
+        self.assertEqual(len(queries), query_count)
+
+    def test_role_filter_and_pagination(self):
+        data = self.get_members("role=member&page=2&per_page=4")
+
+        self.assertEqual(
+            [user["id"] for user in data["members"]],
+            [member.id for member in self.members[4:8]],
+        )
+        self.assertEqual(data["total_members"], 10)
+        self.assertEqual(data["page"], 2)
+        self.assertEqual(data["admins"], [])
+        # Totals count every role whatever the filter
+        self.assertEqual(data["total_admins"], 1)
+        self.assertEqual(data["total_reviewers"], 1)
+
+        # Pages past the last one are empty rather than clamped
+        data = self.get_members("page=3&per_page=4")
+        self.assertEqual(data["page"], 3)
+        self.assertEqual(
+            [user["id"] for user in data["members"]],
+            [member.id for member in self.members[8:]],
+        )
+        self.assertEqual(data["admins"], [])
+        self.assertEqual(data["total_admins"], 1)
+
+        for query in ("per_page=1000", "page=0&per_page=4"):
+            response = self.client.get(
+                f"/{self.community.name}/members?{query}", headers=self.headers
+            )
+            self.assertEqual(response.status_code, 400)
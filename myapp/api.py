@@ -5,6 +5,7 @@ from ninja import NinjaAPI, Router
 from ninja.errors import AuthenticationError, HttpError, HttpRequest, ValidationError
 
 from articles.api import router as articles_router
+from articles.bundle_api import router as articles_bundle_router
 from articles.discussion_api import router as articles_discussion_router
 from articles.review_api import router as articles_review_router
 from communities.api import router as communities_router
@@ -90,6 +91,7 @@ articles_parent_router = Router()
 articles_parent_router.add_router("", articles_router)
 articles_parent_router.add_router("", articles_review_router)
 articles_parent_router.add_router("", articles_discussion_router)
+articles_parent_router.add_router("", articles_bundle_router)
 
 # Create a parent router to aggregate all community-related endpoints
 communities_parent_router = Router()
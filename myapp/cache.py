@@ -1,3 +1,7 @@
+import threading
+import time
+from collections import OrderedDict
+
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
 from django_redis import get_redis_connection
@@ -95,3 +99,43 @@ def invalidate_cache_with_tags(tags, cache_name="default"):
         raise CacheOperationError(f"Value error: {str(e)}")
     except Exception as e:
         raise CacheOperationError(f"Cache invalidation failed: {str(e)}")
+
+
+class LocalLRUCache:
+    """
+    Small per-process cache in front of the shared cache, bounded in size
+    and with a TTL per entry. Safe to use from several threads.
+    """
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._entries: "OrderedDict" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
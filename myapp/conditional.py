@@ -0,0 +1,160 @@
+"""
+Conditional GET support for read endpoints.
+
+Validators come from per-scope version counters kept in the cache, e.g.
+``article:<id>``, ``community:<id>``, ``communities`` and ``user:<id>``. Write
+paths bump the scopes they touch once their transaction commits. Read paths
+fetch the versions of the scopes they depend on in one round trip, derive a
+weak ETag and a Last-Modified date from them, and answer If-None-Match /
+If-Modified-Since with a 304 before any serialization runs.
+
+A version is the time of the bump in microseconds, so a counter lost to an
+eviction or a cache flush comes back with a later value instead of repeating
+an old one. When the cache is unavailable no validators are sent and every
+request gets the full response. Payloads read from a single denormalized row
+can use its ``updated_at`` column instead of a scope.
+"""
+
+import hashlib
+import logging
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY_PREFIX = "content_version"
+
+
+def _version_key(scope: str) -> str:
+    return f"{VERSION_KEY_PREFIX}:{scope}"
+
+
+def _now_version() -> int:
+    return time.time_ns() // 1000
+
+
+def bump_content_versions(*scopes):
+    """
+    Move the given scopes to a new version once the current transaction
+    commits, so readers never pair a new version with old data.
+
+    Args:
+        *scopes: Scope names, falsy values are ignored
+    """
+    scopes = {scope for scope in scopes if scope}
+    if not scopes:
+        return
+
+    def bump():
+        keys = [_version_key(scope) for scope in scopes]
+        try:
+            current = cache.get_many(keys)
+            now = _now_version()
+            # Never move backwards, even if clocks disagree between hosts
+            cache.set_many(
+                {key: max(now, current.get(key, 0) + 1) for key in keys},
+                timeout=None,
+            )
+        except Exception as e:
+            logger.warning(f"Failed to bump content versions {sorted(scopes)}: {e}")
+
+    transaction.on_commit(bump)
+
+
+def get_content_versions(*scopes):
+    """
+    Fetch the current version of each scope, starting missing ones at now.
+
+    Returns:
+        Dict mapping scope to version, or None if the cache is unavailable
+    """
+    keys = {_version_key(scope): scope for scope in scopes}
+    try:
+        found = cache.get_many(list(keys))
+        missing = {key: _now_version() for key in keys if key not in found}
+        if missing:
+            cache.set_many(missing, timeout=None)
+            found.update(missing)
+    except Exception as e:
+        logger.warning(f"Failed to read content versions: {e}")
+        return None
+    return {scope: found[key] for key, scope in keys.items()}
+
+
+def conditional_response(request, response, *scopes, private=True, cache_control=None):
+    """
+    Set ETag and Last-Modified validators for the given scopes on the
+    response and check them against the request's conditional headers.
+
+    Args:
+        request: The incoming request
+        response: The temporal response of the view, carrying the headers
+        *scopes: Scopes the payload depends on, falsy values are ignored
+        private: Whether the payload depends on the authenticated user, in
+            which case the ``user:<id>`` scope is added
+        cache_control: Cache-Control header to send, revalidate on every use
+            by default
+
+    Returns:
+        A 304 response (412 for failed If-Match preconditions) to return as
+        is, or None when the payload should be rendered
+    """
+    scopes = [scope for scope in scopes if scope]
+    user = request.auth
+    # OptionalJWTAuth sets auth to True for anonymous requests
+    if private and user and not isinstance(user, bool):
+        scopes.append(f"user:{user.id}")
+
+    versions = get_content_versions(*scopes)
+    if versions is None:
+        return None
+
+    return _validate(
+        request,
+        response,
+        [f"{scope}={versions[scope]}" for scope in scopes],
+        max(versions.values()) // 1_000_000,
+        private,
+        cache_control,
+    )
+
+
+def updated_at_conditional_response(request, response, updated_at, cache_control=None):
+    """
+    Same as conditional_response, for public payloads read from a single row
+    whose ``updated_at`` column moves with every change.
+    """
+    return _validate(
+        request,
+        response,
+        [updated_at.isoformat()],
+        int(updated_at.timestamp()),
+        False,
+        cache_control,
+    )
+
+
+def _validate(request, response, parts, last_modified, private, cache_control):
+    parts = [request.path, request.GET.urlencode(), *parts]
+    digest = hashlib.md5("|".join(parts).encode(), usedforsecurity=False)
+    etag = f'W/"{digest.hexdigest()}"'
+
+    response.headers["ETag"] = etag
+    response.headers["Last-Modified"] = http_date(last_modified)
+    if cache_control:
+        response.headers["Cache-Control"] = cache_control
+    else:
+        response.headers["Cache-Control"] = (
+            "private, no-cache" if private else "no-cache"
+        )
+    if private:
+        patch_vary_headers(response, ["Authorization"])
+
+    conditional = get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=response
+    )
+    return None if conditional is response else conditional
@@ -0,0 +1,68 @@
+"""
+Process-wide ContentType ids for generic relation filters.
+
+Reactions, bookmarks, hashtags and flags point at their target through a
+content type. Filtering on ``content_type__model`` joins django_content_type
+into every query, and matches models of any app that share the name. Filters
+compare ``content_type_id`` with the ids resolved here instead.
+
+The whole table is loaded with one query on first use and kept for the life
+of the process. Content types are only added by migrations, so an unknown
+label triggers a single reload before giving up.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import post_migrate
+
+_content_type_ids: dict[str, int] = {}
+
+
+def _label(model_or_label) -> str:
+    if isinstance(model_or_label, str):
+        return model_or_label.lower()
+    return model_or_label._meta.label_lower
+
+
+def _load_content_type_ids():
+    _content_type_ids.clear()
+    _content_type_ids.update(
+        (f"{app_label}.{model}", content_type_id)
+        for content_type_id, app_label, model in ContentType.objects.values_list(
+            "id", "app_label", "model"
+        )
+    )
+
+
+def content_type_id(model_or_label) -> int:
+    """
+    Resolve the ContentType id of a model.
+
+    Args:
+        model_or_label: Model class or instance, or an ``app_label.model``
+            string (case insensitive)
+
+    Returns:
+        The ContentType id
+
+    Raises:
+        ContentType.DoesNotExist: If no such content type exists
+    """
+    label = _label(model_or_label)
+    if label not in _content_type_ids:
+        _load_content_type_ids()
+        if label not in _content_type_ids:
+            raise ContentType.DoesNotExist(f"Content type {label} does not exist")
+    return _content_type_ids[label]
+
+
+def get_content_type_by_label(model_or_label) -> ContentType:
+    """Same as content_type_id, returning Django's cached ContentType."""
+    return ContentType.objects.get_for_id(content_type_id(model_or_label))
+
+
+def clear_content_type_ids(**kwargs):
+    """Forget the loaded ids, e.g. after migrations recreated the table."""
+    _content_type_ids.clear()
+
+
+post_migrate.connect(clear_content_type_ids)
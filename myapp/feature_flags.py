@@ -5,3 +5,8 @@ QUEUE_TTL_MINUTES = 2
 MAX_EVENTS_PER_QUEUE = 1000
 POLL_TIMEOUT_SECONDS = 60
 HEARTBEAT_INTERVAL_SECONDS = 60
+MAX_STATS_WINDOW_DAYS = 365
+MAX_STATUS_BATCH_SIZE = 100
+MAX_LEADERBOARD_SIZE = 100
+MAX_NOTIFICATION_PAGE_SIZE = 100
+MAX_MEMBERS_PAGE_SIZE = 100
@@ -19,6 +19,7 @@ from ninja import Router, Schema
 from ninja.errors import HttpError
 
 from articles.models import Discussion, DiscussionComment, Review, UserFlag
+from communities.roles import MEMBER, get_community_roles
 from myapp.schemas import EntityType, FlagType
 from users.auth import JWTAuth
 
@@ -91,50 +92,41 @@ def authorize_entity_access(user, entity_type: str, entity_ids: List[int]) -> Li
     if not entity_ids:
         return []
 
-    if entity_type == "discussion":
-        # Get discussions and check community membership
-        discussions = Discussion.objects.filter(id__in=entity_ids).select_related(
-            "community"
-        )
-        accessible_ids = []
-        for discussion in discussions:
-            # If no community or public community, allow access
-            # If private community, check membership
-            if not discussion.community or discussion.community.is_member(user):
-                accessible_ids.append(discussion.id)
-        return accessible_ids
-
-    elif entity_type == "comment":
-        # Get comments and check community membership via discussion
-        comments = DiscussionComment.objects.filter(id__in=entity_ids).select_related(
-            "discussion__community"
-        )
-        accessible_ids = []
-        for comment in comments:
-            community = comment.discussion.community
-            if not community or community.is_member(user):
-                accessible_ids.append(comment.id)
-        return accessible_ids
-
-    elif entity_type == "notification":
+    if entity_type == "notification":
         # For notifications, user can only access their own
         # (notifications will be user-specific when implemented)
         # For now, allow all - actual filtering happens at flag level (user FK)
         return list(entity_ids)
 
+    if entity_type == "discussion":
+        entities = Discussion.objects.filter(id__in=entity_ids).values_list(
+            "id", "community_id"
+        )
+    elif entity_type == "comment":
+        # Comments belong to the community of their discussion
+        entities = DiscussionComment.objects.filter(id__in=entity_ids).values_list(
+            "id", "discussion__community_id"
+        )
     elif entity_type == "review":
-        # Get reviews and check community membership
-        reviews = Review.objects.filter(id__in=entity_ids).select_related("community")
-        accessible_ids = []
-        for review in reviews:
-            # If no community or public community, allow access
-            # If private/hidden community, check membership
-            if not review.community or review.community.is_member(user):
-                accessible_ids.append(review.id)
-        return accessible_ids
-
-    # Default: return all (for future entity types, add authorization logic)
-    return list(entity_ids)
+        entities = Review.objects.filter(id__in=entity_ids).values_list(
+            "id", "community_id"
+        )
+    else:
+        # Default: return all (for future entity types, add authorization logic)
+        return list(entity_ids)
+
+    # Resolve the user's roles in all the entities' communities in one query.
+    # Entities outside communities are accessible, otherwise the user must
+    # be a member.
+    entities = list(entities)
+    roles = get_community_roles(
+        user, {community_id for _, community_id in entities if community_id}
+    )
+    return [
+        entity_id
+        for entity_id, community_id in entities
+        if not community_id or MEMBER in roles[community_id]
+    ]
 
 
 # ============================================================================
@@ -0,0 +1,200 @@
+"""
+Request-scoped batch loaders for the per-row fields of response schemas.
+
+In the spirit of DataLoader: schemas ask a loader for one key at a time,
+and the loader resolves every key queued so far in a single query, caching
+the results for the rest of the request. List endpoints queue the keys of
+all their rows first (see the ``queue_lookups`` classmethods on the
+schemas), so each kind of lookup costs one query per page. Single-object
+endpoints get one query per kind instead of separate count / exists / get
+queries.
+
+Usage:
+    loaders = SchemaLoaders.for_request(request)
+    ReviewOut.queue_lookups(reviews, loaders)
+    items = [ReviewOut.from_orm(review, user, loaders=loaders) for review in reviews]
+"""
+
+from django.db.models import Avg, Count, F, Q, Window
+from django.db.models.functions import RowNumber
+
+from articles.models import (
+    AnonymousIdentity,
+    DiscussionComment,
+    ReviewComment,
+    ReviewCommentRating,
+    ReviewVersion,
+)
+from articles.review_history import RECENT_REVIEW_VERSIONS
+from articles.stats import get_article_stats_map
+from communities.models import CommunityArticle
+from users.models import Reputation
+
+_MISSING = object()
+
+
+class BatchLoader:
+    """
+    Caches the values of one kind of lookup and resolves pending keys in
+    batches.
+
+    Args:
+        batch_fn: Callable taking a list of keys and returning a dict of the
+            values found
+        default: Value for keys the batch function didn't return
+    """
+
+    def __init__(self, batch_fn, default=None):
+        self.batch_fn = batch_fn
+        self.default = default
+        self.cache = {}
+        self.pending = set()
+
+    def queue(self, keys):
+        """Queue keys to be resolved with the next batch."""
+        self.pending.update(key for key in keys if key not in self.cache)
+
+    def load(self, key):
+        value = self.cache.get(key, _MISSING)
+        if value is _MISSING:
+            self.pending.add(key)
+            self.dispatch()
+            value = self.cache[key]
+        return value
+
+    def load_many(self, keys) -> list:
+        keys = list(keys)
+        self.queue(keys)
+        if self.pending:
+            self.dispatch()
+        return [self.cache[key] for key in keys]
+
+    def prime(self, key, value):
+        """Store a value that is already known, e.g. from an annotation."""
+        self.cache[key] = value
+        self.pending.discard(key)
+
+    def dispatch(self):
+        keys = list(self.pending)
+        self.pending.clear()
+        if not keys:
+            return
+        found = self.batch_fn(keys)
+        for key in keys:
+            self.cache[key] = found.get(key, self.default)
+
+
+def _load_reputations(user_ids):
+    return {
+        reputation.user_id: reputation
+        for reputation in Reputation.objects.filter(user_id__in=user_ids)
+    }
+
+
+def _load_pseudonyms(keys):
+    """Keys are (article_id, user_id, community_id) tuples."""
+    article_ids = {article_id for article_id, _, _ in keys}
+    user_ids = {user_id for _, user_id, _ in keys}
+    return {
+        (identity.article_id, identity.user_id, identity.community_id): identity
+        for identity in AnonymousIdentity.objects.filter(
+            article_id__in=article_ids, user_id__in=user_ids
+        )
+    }
+
+
+def _load_community_articles(keys):
+    """Keys are (article_id, community_id) tuples."""
+    community_ids = {community_id for _, community_id in keys if community_id}
+    if not community_ids:
+        return {}
+    return {
+        (community_article.article_id, community_article.community_id): (
+            community_article
+        )
+        for community_article in CommunityArticle.objects.filter(
+            article_id__in={article_id for article_id, _ in keys},
+            community_id__in=community_ids,
+        ).select_related("community", "assigned_moderator")
+    }
+
+
+def _load_review_comment_counts(review_ids):
+    return dict(
+        ReviewComment.objects.filter(review_id__in=review_ids, is_deleted=False)
+        .values("review_id")
+        .annotate(count=Count("id"))
+        .values_list("review_id", "count")
+    )
+
+
+def _load_review_comment_ratings(review_ids):
+    # Ratings given in the review's own scope, excluding its author's
+    return dict(
+        ReviewCommentRating.objects.filter(review_id__in=review_ids)
+        .filter(
+            Q(community_id=F("review__community_id"))
+            | Q(community__isnull=True, review__community__isnull=True)
+        )
+        .exclude(user_id=F("review__user_id"))
+        .values("review_id")
+        .annotate(avg_rating=Avg("rating"))
+        .values_list("review_id", "avg_rating")
+    )
+
+
+def _load_recent_review_versions(review_ids, limit):
+    versions = {}
+    for version in (
+        ReviewVersion.objects.filter(review_id__in=review_ids)
+        .annotate(
+            position=Window(
+                RowNumber(), partition_by=F("review_id"), order_by=F("version").desc()
+            )
+        )
+        .filter(position__lte=limit)
+        .order_by("review_id", "-version")
+    ):
+        versions.setdefault(version.review_id, []).append(version)
+    return versions
+
+
+def _load_discussion_comment_counts(discussion_ids):
+    return dict(
+        DiscussionComment.objects.filter(discussion_id__in=discussion_ids)
+        .values("discussion_id")
+        .annotate(count=Count("id"))
+        .values_list("discussion_id", "count")
+    )
+
+
+class SchemaLoaders:
+    """The batch loaders shared by the schemas of one request."""
+
+    def __init__(self):
+        self.reputations = BatchLoader(_load_reputations)
+        self.pseudonyms = BatchLoader(_load_pseudonyms)
+        self.community_articles = BatchLoader(_load_community_articles)
+        self.review_comment_counts = BatchLoader(_load_review_comment_counts, 0)
+        self.review_comment_ratings = BatchLoader(_load_review_comment_ratings, 0)
+        self.recent_review_versions = BatchLoader(
+            lambda review_ids: _load_recent_review_versions(
+                review_ids, RECENT_REVIEW_VERSIONS
+            ),
+            (),
+        )
+        self.discussion_comment_counts = BatchLoader(_load_discussion_comment_counts, 0)
+        self.article_stats = BatchLoader(get_article_stats_map)
+
+    @classmethod
+    def for_request(cls, request) -> "SchemaLoaders":
+        """Loaders cached on the request, created on first use."""
+        loaders = getattr(request, "_schema_loaders", None)
+        if loaders is None:
+            loaders = cls()
+            request._schema_loaders = loaders
+        return loaders
+
+    def reputation(self, user_id: int) -> Reputation:
+        """Reputation of a user, with the defaults if none was recorded yet."""
+        return self.reputations.load(user_id) or Reputation(user_id=user_id)
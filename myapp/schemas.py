@@ -2,16 +2,15 @@
 Common schema for all the models
 """
 
-from datetime import date
+from datetime import date, timedelta
 from enum import Enum
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
 from ninja import ModelSchema, Schema
 
-from articles.models import Article, Review, ReviewComment
-from communities.models import Community
-from posts.models import Comment, Post
-from users.models import Reputation, User
+from myapp.loaders import SchemaLoaders
+from users.counters import get_user_counters
+from users.models import User
 
 
 class Tag(Schema):
@@ -47,6 +46,7 @@ class UserStats(ModelSchema):
         user: User,
         basic_details: bool = False,
         basic_details_with_reputation: bool = False,
+        loaders: Optional[SchemaLoaders] = None,
     ):
         basic_data = {
             "id": user.id,
@@ -57,30 +57,21 @@ class UserStats(ModelSchema):
         if basic_details:
             return UserStats(**basic_data)
 
-        reputation, created = Reputation.objects.get_or_create(user=user)
         if basic_details_with_reputation:
+            reputation = (loaders or SchemaLoaders()).reputation(user.id)
             basic_data["reputation_score"] = reputation.score
             basic_data["reputation_level"] = reputation.level
             return UserStats(**basic_data)
 
-        contributed_articles = (
-            Article.objects.filter(submitter=user).count()
-            + Review.objects.filter(user=user).count()
-            + ReviewComment.objects.filter(author=user).count()
-        )
-        contributed_posts = (
-            Post.objects.filter(author=user).count()
-            + Comment.objects.filter(author=user).count()
-        )
-        community_joined = Community.objects.filter(members=user).count()
+        counters = get_user_counters(user.id)
 
         return UserStats(
             **basic_data,
             bio=user.bio,
             home_page_url=user.home_page_url,
-            contributed_articles=contributed_articles,
-            communities_joined=community_joined,
-            contributed_posts=contributed_posts,
+            contributed_articles=counters.contributed_articles,
+            communities_joined=counters.communities_joined,
+            contributed_posts=counters.contributed_posts,
         )
 
 
@@ -100,6 +91,32 @@ class DateCount(Schema):
             return obj.strftime("%Y-%m-%d")
         return obj
 
+    @classmethod
+    def cumulative(
+        cls,
+        start_date: date,
+        end_date: date,
+        counts_by_date: Dict[date, int],
+        baseline: int = 0,
+    ) -> List["DateCount"]:
+        """
+        Build a running total for every day in [start_date, end_date].
+
+        Args:
+            start_date: First day of the series
+            end_date: Last day of the series (inclusive)
+            counts_by_date: Per-day counts; missing days count as zero
+            baseline: Total accumulated before start_date
+        """
+        series = []
+        running = baseline
+        day = start_date
+        while day <= end_date:
+            running += counts_by_date.get(day, 0)
+            series.append(cls(date=day, count=running))
+            day += timedelta(days=1)
+        return series
+
 
 class PermissionCheckOut(Schema):
     has_permission: bool
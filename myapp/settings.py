@@ -15,6 +15,7 @@ from datetime import timedelta
 from pathlib import Path
 
 import dj_database_url
+from celery.schedules import crontab
 from decouple import config
 
 from myapp.constants import FIFTEEN_MINUTES
@@ -309,6 +310,53 @@ CELERY_RESULT_SERIALIZER = "json"
 CELERY_TIMEZONE = "UTC"
 BROKER_CONNECTION_RETRY_ON_STARTUP = True
 CELERY_WORKER_CONCURRENCY = 5
+CELERY_BEAT_SCHEDULE = {
+    # Daily rollups behind the article and community trend charts
+    "refresh-recent-community-daily-stats": {
+        "task": "communities.tasks.refresh_community_daily_stats",
+        "schedule": crontab(minute="*/15"),
+        "kwargs": {"days": 2},
+    },
+    "rebuild-community-daily-stats": {
+        "task": "communities.tasks.refresh_community_daily_stats",
+        "schedule": crontab(hour=2, minute=0),
+        "kwargs": {"days": None},
+    },
+    "refresh-article-daily-stats": {
+        "task": "articles.tasks.refresh_article_daily_stats",
+        "schedule": crontab(hour=2, minute=30),
+        "kwargs": {"days": 2},
+    },
+    "rebuild-related-articles": {
+        "task": "articles.tasks.refresh_related_articles",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    # Write-behind reaction counters, see articles/reaction_counts.py
+    "flush-reaction-counts": {
+        "task": "articles.tasks.flush_pending_reaction_counts",
+        "schedule": crontab(minute="*"),
+    },
+    # Pseudonyms for anonymous identities, see articles/pseudonyms.py
+    "refill-pseudonym-pool": {
+        "task": "articles.tasks.refill_pseudonyms",
+        "schedule": crontab(minute="*/5"),
+    },
+    # Reputation leaderboards, see users/leaderboard.py
+    "rebuild-leaderboards": {
+        "task": "users.tasks.refresh_leaderboards",
+        "schedule": crontab(hour=3, minute=30),
+    },
+    # Profile contribution counters, see users/counters.py
+    "reconcile-user-counters": {
+        "task": "users.tasks.reconcile_user_counters",
+        "schedule": crontab(hour=4, minute=0),
+    },
+    # Notification retention, see users/notification_retention.py
+    "sweep-notifications": {
+        "task": "users.tasks.sweep_expired_notifications",
+        "schedule": crontab(minute=15),
+    },
+}
 
 CACHES = {
     "default": {
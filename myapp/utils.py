@@ -1,8 +1,13 @@
-import base64
+import hashlib
 from typing import List, Union
 
 import pydenticon
+from django.conf import settings
 from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+IDENTICON_UPLOAD_DIR = "identicons"
 
 
 def validate_tags(tags: Union[str, List[str]], max_length: int = 25):
@@ -28,7 +33,8 @@ def validate_tags(tags: Union[str, List[str]], max_length: int = 25):
             )
 
 
-def generate_identicon(data: str) -> str:
+def render_identicon(data: str) -> bytes:
+    """Render the identicon PNG of a string, always the same for one string."""
     foreground = [
         "rgb(45,79,255)",  # Vivid Blue
         "rgb(254,180,44)",  # Bright Orange
@@ -55,8 +61,32 @@ def generate_identicon(data: str) -> str:
     background = "rgb(255,255,255)"
     padding = (20, 20, 20, 20)
     generator = pydenticon.Generator(5, 5, foreground=foreground, background=background)
-    identicon_png = generator.generate(
-        data, 200, 200, padding=padding, output_format="png"
-    )
-    identicon_base64 = base64.b64encode(identicon_png).decode("utf-8")
-    return identicon_base64
+    return generator.generate(data, 200, 200, padding=padding, output_format="png")
+
+
+def identicon_path(identicon_png: bytes) -> str:
+    """
+    Content-addressed storage path of an identicon, identical images share
+    one file.
+    """
+    digest = hashlib.sha256(identicon_png).hexdigest()
+    return f"{IDENTICON_UPLOAD_DIR}/{settings.ENVIRONMENT}/{digest}.png"
+
+
+def generate_identicon(data: str, upload: bool = True) -> str:
+    """
+    Render the identicon of a string and store it in object storage.
+
+    Args:
+        data: The string to render, e.g. a pseudonym
+        upload: Whether to upload the file now, otherwise only its future
+            URL is returned and the caller uploads it later
+
+    Returns:
+        Public URL of the identicon
+    """
+    identicon_png = render_identicon(data)
+    path = identicon_path(identicon_png)
+    if upload and not default_storage.exists(path):
+        default_storage.save(path, ContentFile(identicon_png))
+    return default_storage.url(path)
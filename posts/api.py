@@ -10,6 +10,7 @@ from django_ratelimit.decorators import ratelimit
 from ninja import Query, Router
 
 from articles.models import Reaction
+from myapp.content_types import content_type_id
 from posts.models import Comment, Post
 from posts.schemas import (
     CommentCreateSchema,
@@ -73,7 +74,7 @@ def list_posts(
         posts = posts.filter(
             id__in=HashtagRelation.objects.filter(
                 hashtag__name=hashtag,
-                content_type=ContentType.objects.get_for_model(Post),
+                content_type_id=content_type_id(Post),
             ).values_list("object_id", flat=True)
         )
 
@@ -233,7 +234,7 @@ def delete_comment(request, comment_id: int):
 
     # Delete reactions associated with the comment
     Reaction.objects.filter(
-        content_type__model="comment", object_id=comment.id
+        content_type_id=content_type_id(Comment), object_id=comment.id
     ).delete()
 
     # Logically delete the comment by clearing its content and marking it as deleted
@@ -1,5 +1,7 @@
 from django.contrib.contenttypes.fields import GenericRelation
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 
 from articles.models import Reaction
 from users.models import HashtagRelation, User
@@ -43,3 +45,34 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["created_at"]
+
+
+# Profile contribution counters (see users/counters.py)
+@receiver(post_save, sender=Post)
+def count_created_post(sender, instance, created, raw=False, **kwargs):
+    from users.counters import bump_user_counters
+
+    if created and not raw:
+        bump_user_counters(instance.author_id, posts=1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    from users.counters import bump_user_counters
+
+    bump_user_counters(instance.author_id, posts=-1)
+
+
+@receiver(post_save, sender=Comment)
+def count_created_post_comment(sender, instance, created, raw=False, **kwargs):
+    from users.counters import bump_user_counters
+
+    if created and not raw:
+        bump_user_counters(instance.author_id, post_comments=1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_post_comment(sender, instance, **kwargs):
+    from users.counters import bump_user_counters
+
+    bump_user_counters(instance.author_id, post_comments=-1)
@@ -1,8 +1,9 @@
 from typing import List, Literal, Optional
 
-from django.contrib.contenttypes.models import ContentType
 from ninja import Field, ModelSchema, Schema
 
+from articles.reaction_counts import get_reaction_counts
+from myapp.content_types import content_type_id
 from myapp.schemas import UserStats
 from posts.models import Comment, Post
 from users.models import HashtagRelation, User
@@ -35,12 +36,14 @@ class PostOut(ModelSchema):
             "author": UserStats.from_model(
                 post.author, basic_details_with_reputation=True
             ),
-            "upvotes": post.reactions.filter(vote=1).count(),
+            "upvotes": get_reaction_counts(content_type_id(Post), [post.id])[post.id][
+                "like_count"
+            ],
             "comments_count": Comment.objects.filter(post=post).count(),
             "hashtags": [
                 relation.hashtag.name
                 for relation in HashtagRelation.objects.filter(
-                    content_type=ContentType.objects.get_for_model(Post),
+                    content_type_id=content_type_id(Post),
                     object_id=post.id,
                 )
             ],
@@ -80,7 +83,9 @@ class CommentOut(ModelSchema):
             ),
             content=comment.content,
             created_at=comment.created_at,
-            upvotes=comment.reactions.filter(vote=1).count(),
+            upvotes=get_reaction_counts(content_type_id(Comment), [comment.id])[
+                comment.id
+            ]["like_count"],
             replies=[
                 CommentOut.from_orm_with_replies(reply, current_user)
                 for reply in comment.replies.all()
@@ -11,9 +11,13 @@ from ninja.responses import codes_4xx, codes_5xx
 
 # Todo: Move the Reaction model to the users app
 from articles.models import Article, Reaction, Review
+from articles.reaction_counts import get_reaction_counts
 from articles.schemas import ArticlesListOut, Message, PaginatedArticlesListResponse
 from communities.models import Community, CommunityArticle, Membership
+from communities.roles import get_community_roles, get_highest_role
 from communities.schemas import CommunityListOut, PaginatedCommunities
+from myapp.content_types import content_type_id
+from myapp.feature_flags import MAX_NOTIFICATION_PAGE_SIZE
 from myapp.schemas import Message, UserStats
 from posts.models import Post
 from users.auth import JWTAuth
@@ -23,9 +27,19 @@ from users.config_constants import (
     validate_config_value,
 )
 from users.models import Hashtag, HashtagRelation, Notification, User, UserSetting
+from users.notification_inbox import (
+    InvalidCursor,
+    get_inbox_page,
+    get_unread_count,
+    mark_notifications_read,
+)
 from users.schemas import (
     FavoriteItemSchema,
+    NotificationMarkReadIn,
+    NotificationMarkReadOut,
+    NotificationPageOut,
     NotificationSchema,
+    UnreadNotificationCountOut,
     UserArticleSchema,
     UserCommunitySchema,
     UserDetails,
@@ -375,6 +389,9 @@ def list_my_communities(
                 .values_list("community_id", "count")
             )
 
+            # Roles in every community of the page, in one query
+            roles = get_community_roles(user, community_ids, use_cache=True)
+
             # Prepare response
             results = []
             for community in paginated_communities.object_list:
@@ -388,7 +405,7 @@ def list_my_communities(
                         created_at=community.created_at,
                         num_members=members_count.get(community.id, 0),
                         num_published_articles=articles_count.get(community.id, 0),
-                        role=community.get_user_role(user),
+                        role=get_highest_role(roles[community.id]),
                     )
                 )
 
@@ -522,19 +539,20 @@ def get_my_posts(request):
             return 500, {"message": "Error retrieving your posts. Please try again."}
 
         try:
-            post_content_type = ContentType.objects.get_for_model(Post)
+            post_content_type_id = content_type_id(Post)
         except Exception as e:
             logger.error(f"Error setting up content types: {e}")
             return 500, {"message": "Error setting up content types. Please try again."}
 
+        posts = list(posts)
+        counts_by_post = get_reaction_counts(
+            post_content_type_id, [post.id for post in posts]
+        )
+
         result = []
         for post in posts:
             try:
-                likes_count = Reaction.objects.filter(
-                    content_type=post_content_type,
-                    object_id=post.id,
-                    vote=Reaction.LIKE,
-                ).count()
+                likes_count = counts_by_post[post.id]["like_count"]
 
                 # Determine the most recent action (creation or comment)
                 latest_comment = (
@@ -582,9 +600,9 @@ def get_my_favorites(request):
 
         try:
             # Get content types
-            article_type = ContentType.objects.get_for_model(Article)
-            community_type = ContentType.objects.get_for_model(Community)
-            post_type = ContentType.objects.get_for_model(Post)
+            article_type = content_type_id(Article)
+            community_type = content_type_id(Community)
+            post_type = content_type_id(Post)
         except Exception as e:
             logger.error(f"Error setting up content types: {e}")
             return 500, {"message": "Error setting up content types. Please try again."}
@@ -600,7 +618,7 @@ def get_my_favorites(request):
 
         for item in liked_items:
             try:
-                if item.content_type == article_type:
+                if item.content_type_id == article_type:
                     article: Article = item.content_object
                     favorites.append(
                         {
@@ -611,7 +629,7 @@ def get_my_favorites(request):
                             "slug": article.slug,
                         }
                     )
-                elif item.content_type == community_type:
+                elif item.content_type_id == community_type:
                     community: Community = item.content_object
                     favorites.append(
                         {
@@ -622,15 +640,16 @@ def get_my_favorites(request):
                             "slug": community.slug,
                         }
                     )
-                elif item.content_type == post_type:
+                elif item.content_type_id == post_type:
                     post = item.content_object
+                    likes = get_reaction_counts(post_type, [post.id])[post.id]
                     favorites.append(
                         {
                             "title": post.title,
                             "type": "Post",
                             "details": (
                                 f"Post by {post.author.username} · "
-                                f"{post.reactions.filter(vote=Reaction.LIKE).count()} likes"
+                                f"{likes['like_count']} likes"
                             ),
                             "tag": "Post",
                             "slug": str(post.id),
@@ -654,7 +673,7 @@ Notification API
 
 @router.get(
     "/notifications",
-    response={200: List[NotificationSchema], codes_4xx: Message, codes_5xx: Message},
+    response={200: NotificationPageOut, codes_4xx: Message, codes_5xx: Message},
     auth=JWTAuth(),
 )
 def get_notifications(
@@ -662,10 +681,26 @@ def get_notifications(
     article_slug: Optional[str] = Query(None, description="Filter by article slug"),
     community_id: Optional[int] = Query(None, description="Filter by community ID"),
     post_id: Optional[int] = Query(None, description="Filter by post ID"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the last page"),
+    limit: int = Query(20, ge=1, le=MAX_NOTIFICATION_PAGE_SIZE),
 ):
     try:
+        user_notifications = Notification.objects.filter(user=request.auth)
+
+        # Every filter narrows the inbox down
+        if article_slug:
+            user_notifications = user_notifications.filter(article__slug=article_slug)
+        if community_id:
+            user_notifications = user_notifications.filter(community_id=community_id)
+        if post_id:
+            user_notifications = user_notifications.filter(post_id=post_id)
+
         try:
-            user_notifications = Notification.objects.filter(user=request.auth)
+            notifications, next_cursor = get_inbox_page(
+                user_notifications, cursor, limit
+            )
+        except InvalidCursor:
+            return 400, {"message": "Invalid cursor. Please reload your notifications."}
         except Exception as e:
             logger.error(f"Error retrieving your notifications: {e}")
             return 500, {
@@ -673,45 +708,11 @@ def get_notifications(
             }
 
         try:
-            # Apply filters based on query parameters
-            filters = Q()
-            if article_slug:
-                filters |= Q(article__slug=article_slug)
-            if community_id:
-                filters |= Q(community_id=community_id)
-            if post_id:
-                filters |= Q(post_id=post_id)
-
-            if filters:
-                user_notifications = user_notifications.filter(filters)
-        except Exception as e:
-            logger.error(f"Error filtering notifications: {e}")
-            return 500, {"message": "Error filtering notifications. Please try again."}
-
-        try:
-            user_notifications = user_notifications.order_by("-created_at")
-        except Exception as e:
-            logger.error(f"Error sorting notifications: {e}")
-            return 500, {"message": "Error sorting notifications. Please try again."}
-
-        try:
-            notifications_list = [
-                NotificationSchema(
-                    **{
-                        "id": notif.id,
-                        "message": notif.message,
-                        "content": notif.content,
-                        "isRead": notif.is_read,
-                        "link": notif.link,
-                        "category": notif.category,
-                        "notificationType": notif.notification_type,
-                        "createdAt": notif.created_at,
-                        "expiresAt": notif.expires_at,
-                    }
-                )
-                for notif in user_notifications
-            ]
-            return 200, notifications_list
+            return 200, NotificationPageOut(
+                items=[NotificationSchema.from_model(notif) for notif in notifications],
+                next_cursor=next_cursor,
+                unread_count=get_unread_count(request.auth.id),
+            )
         except Exception as e:
             logger.error(f"Error formatting notification data: {e}")
             return 500, {
@@ -722,6 +723,45 @@ def get_notifications(
         return 500, {"message": "An unexpected error occurred. Please try again later."}
 
 
+@router.get(
+    "/notifications/unread-count",
+    response={200: UnreadNotificationCountOut, codes_4xx: Message, codes_5xx: Message},
+    auth=JWTAuth(),
+)
+def get_unread_notification_count(request):
+    try:
+        return 200, {"unread_count": get_unread_count(request.auth.id)}
+    except Exception as e:
+        logger.error(f"Error retrieving unread notification count: {e}")
+        return 500, {
+            "message": "Error retrieving unread notification count. Please try again."
+        }
+
+
+@router.post(
+    "/notifications/mark-as-read",
+    response={200: NotificationMarkReadOut, codes_4xx: Message, codes_5xx: Message},
+    auth=JWTAuth(),
+)
+def mark_notifications_as_read(request, payload: NotificationMarkReadIn):
+    """
+    Mark the given notifications, or all unread ones, as read.
+    """
+    try:
+        updated_count = mark_notifications_read(
+            request.auth.id, payload.notification_ids
+        )
+    except Exception as e:
+        logger.error(f"Error updating notification status: {e}")
+        return 500, {"message": "Error updating notification status. Please try again."}
+
+    return 200, {
+        "message": f"{updated_count} notifications marked as read.",
+        "updated_count": updated_count,
+        "unread_count": get_unread_count(request.auth.id),
+    }
+
+
 @router.post(
     "/notifications/{notification_id}/mark-as-read",
     response={200: Message, codes_4xx: Message, codes_5xx: Message},
@@ -729,31 +769,25 @@ def get_notifications(
 )
 def mark_notification_as_read(request, notification_id: int):
     try:
-        try:
-            notification = Notification.objects.get(
-                pk=notification_id, user=request.auth
-            )
-        except Notification.DoesNotExist:
-            return 404, {"message": "Notification not found."}
-        except Exception as e:
-            logger.error(f"Error retrieving notification: {e}")
-            return 500, {"message": "Error retrieving notification. Please try again."}
+        # A conditional UPDATE, so concurrent requests move the unread count once
+        updated_count = mark_notifications_read(request.auth.id, [notification_id])
+    except Exception as e:
+        logger.error(f"Error updating notification status: {e}")
+        return 500, {"message": "Error updating notification status. Please try again."}
 
-        if not notification.is_read:
-            try:
-                notification.is_read = True
-                notification.save()
-                return 200, {"message": "Notification marked as read."}
-            except Exception as e:
-                logger.error(f"Error updating notification status: {e}")
-                return 500, {
-                    "message": "Error updating notification status. Please try again."
-                }
-        else:
-            return 200, {"message": "Notification was already marked as read."}
+    if updated_count:
+        return 200, {"message": "Notification marked as read."}
+
+    try:
+        if not Notification.objects.filter(
+            pk=notification_id, user=request.auth
+        ).exists():
+            return 404, {"message": "Notification not found."}
     except Exception as e:
-        logger.error(f"An unexpected error occurred: {e}")
-        return 500, {"message": "An unexpected error occurred. Please try again later."}
+        logger.error(f"Error retrieving notification: {e}")
+        return 500, {"message": "Error retrieving notification. Please try again."}
+
+    return 200, {"message": "Notification was already marked as read."}
 
 
 """
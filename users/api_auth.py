@@ -20,7 +20,7 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from myapp.schemas import Message
 from myapp.services.send_emails import send_email_task
-from users.models import Reputation, User
+from users.models import User
 from users.schemas import (
     LogInSchemaIn,
     LogInSchemaOut,
@@ -147,15 +147,6 @@ def activate(request: HttpRequest, token: str):
         if user.is_active:
             return 400, {"message": "Account already activated. You can now log in."}
 
-        try:
-            # Create Reputation object for the user
-            Reputation.objects.get_or_create(user=user)
-        except Exception as e:
-            logger.error(f"Error setting up user reputation: {e}")
-            return 500, {
-                "message": "Error setting up user reputation. Please try again."
-            }
-
         try:
             user.is_active = True
             user.save()
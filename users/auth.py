@@ -5,14 +5,45 @@ from ninja.errors import HttpError
 from ninja.security import HttpBearer
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from users.auth_cache import (
+    cache_auth_user,
+    get_auth_user_version,
+    get_cached_auth_user,
+)
 
 # Module-level logger
 logger = logging.getLogger(__name__)
 
 
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves users through users/auth_cache.py
+    instead of loading the row on every request.
+    """
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None:
+            return super().get_user(validated_token)
+
+        # Read before loading, so a change committing meanwhile wins
+        version = get_auth_user_version(user_id)
+        user = get_cached_auth_user(user_id, version)
+        if user is None:
+            # Raises for unknown and inactive users, which are never cached
+            user = super().get_user(validated_token)
+            cache_auth_user(user, version)
+        return user
+
+
+# Stateless, shared by all requests
+jwt_authentication = CachedJWTAuthentication()
+
+
 class JWTAuth(HttpBearer):
     def authenticate(self, request: HttpRequest, token):
-        jwt_authentication = JWTAuthentication()
         try:
             validated_token = jwt_authentication.get_validated_token(token)
             user = jwt_authentication.get_user(validated_token)
@@ -43,7 +74,6 @@ def OptionalJWTAuth(request: HttpRequest):
     if token is None or token == "null":
         return True
 
-    jwt_authentication = JWTAuthentication()
     try:
         validated_token = jwt_authentication.get_validated_token(token)
         user = jwt_authentication.get_user(validated_token)
@@ -0,0 +1,110 @@
+"""
+Short-lived cache of the users behind validated access tokens.
+
+Every authenticated request used to load its user row from the database.
+Users are now cached per auth version, a per-user counter kept with the
+content versions of myapp/conditional.py under the ``auth_user:<id>`` scope
+and bumped once any save or delete of the user commits, i.e. on password
+changes, deactivation and profile updates.
+
+A request reads the version with one cache round trip, then looks for
+``(user_id, version)`` in a small in-process LRU and, on a miss, for the
+pickled user in the shared cache. Only when both miss is the row loaded
+from the database. Entries of older versions are never read again and
+simply expire. When the cache is unavailable the version is unknown, so
+the user is always loaded from the database.
+"""
+
+import copy
+import logging
+
+from django.core.cache import cache
+
+from myapp.cache import LocalLRUCache
+from myapp.conditional import bump_content_versions, get_content_versions
+
+logger = logging.getLogger(__name__)
+
+AUTH_USER_CACHE_PREFIX = "auth_user"
+# Shared cache TTL, versions make invalidation immediate
+AUTH_USER_CACHE_TTL = 300  # 5 minutes
+# Per-process copies, bounded so idle users do not pile up in memory
+LOCAL_CACHE_TTL = 60
+LOCAL_CACHE_SIZE = 1024
+
+_local_users = LocalLRUCache(LOCAL_CACHE_SIZE, LOCAL_CACHE_TTL)
+
+
+def _scope(user_id) -> str:
+    return f"{AUTH_USER_CACHE_PREFIX}:{user_id}"
+
+
+def _cache_key(user_id, version) -> str:
+    return f"{AUTH_USER_CACHE_PREFIX}:{user_id}:{version}"
+
+
+def get_auth_user_version(user_id):
+    """
+    Read the current auth version of a user.
+
+    Returns:
+        The version, or None if the cache is unavailable
+    """
+    versions = get_content_versions(_scope(user_id))
+    return None if versions is None else versions[_scope(user_id)]
+
+
+def get_cached_auth_user(user_id, version):
+    """
+    Look up a user cached at the given auth version.
+
+    Args:
+        user_id: The user's ID
+        version: Auth version from get_auth_user_version
+
+    Returns:
+        A copy of the cached user that the caller may modify, or None
+    """
+    if version is None:
+        return None
+
+    key = (user_id, version)
+    user = _local_users.get(key)
+    if user is None:
+        try:
+            user = cache.get(_cache_key(user_id, version))
+        except Exception as e:
+            logger.warning(f"Failed to read cached user {user_id}: {e}")
+            return None
+        if user is None:
+            return None
+        _local_users.set(key, user)
+
+    # Views assign to request.auth before saving, keep the shared copy clean
+    return copy.copy(user)
+
+
+def cache_auth_user(user, version):
+    """
+    Cache a user freshly loaded from the database at the version read
+    before loading it.
+    """
+    if version is None:
+        return
+
+    user = copy.copy(user)
+    _local_users.set((user.pk, version), user)
+    try:
+        cache.set(_cache_key(user.pk, version), user, timeout=AUTH_USER_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Failed to cache user {user.pk}: {e}")
+
+
+def invalidate_auth_user(user_id):
+    """Move the user to a new auth version once the transaction commits."""
+    bump_content_versions(_scope(user_id))
+
+
+def clear_local_auth_users():
+    """Drop the in-process copies, e.g. between tests."""
+    _local_users.clear()
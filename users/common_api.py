@@ -3,7 +3,7 @@ A common API for HashTags, Reactions, and Bookmarks
 """
 
 import logging
-from typing import Literal, Optional
+from typing import List, Literal, Optional
 from urllib.parse import unquote
 
 from django.contrib.contenttypes.models import ContentType
@@ -16,23 +16,35 @@ from ninja.responses import codes_4xx, codes_5xx
 
 # Todo: Move the Reaction model to the users app
 from articles.models import Article, Reaction
+from articles.reaction_counts import get_reaction_counts
+from articles.stats import record_article_reaction
 from communities.models import Community
-from myapp.schemas import Message, PermissionCheckOut
+from myapp.content_types import content_type_id, get_content_type_by_label
+from myapp.feature_flags import MAX_LEADERBOARD_SIZE
+from myapp.schemas import Message, PermissionCheckOut, UserStats
 from posts.models import Post
 from posts.schemas import PaginatedPostsResponse, PostOut
 from users.auth import JWTAuth, OptionalJWTAuth
+from users.leaderboard import get_around, get_community_total, get_rank, get_top
 from users.models import Bookmark, Hashtag, HashtagRelation, User
 from users.schemas import (
     BookmarkContentTypeEnum,
     BookmarkFilterTypeEnum,
     BookmarkSchema,
+    BookmarkStatusBatchIn,
+    BookmarkStatusBatchItem,
     BookmarkStatusResponseSchema,
     BookmarkToggleResponseSchema,
     BookmarkToggleSchema,
     ContentTypeEnum,
     HashtagOut,
+    LeaderboardEntryOut,
+    LeaderboardOut,
+    MyLeaderboardOut,
     PaginatedBookmarksResponseSchema,
     PaginatedHashtagOut,
+    ReactionCountBatchIn,
+    ReactionCountBatchItem,
     ReactionCountOut,
     ReactionIn,
     ReactionOut,
@@ -115,46 +127,41 @@ def check_permission(
 Bookmarks API
 """
 
-# Cache content types to avoid repeated DB lookups
-_content_type_cache: dict[str, ContentType] = {}
-
 
 def get_content_type(content_type_value: str) -> ContentType:
     """
-    Get ContentType from cache or database.
-    Uses module-level cache for performance.
+    Get ContentType from an ``app_label.model`` value, resolved through the
+    process-wide content type ids (see myapp/content_types.py).
+    """
+    if content_type_value.count(".") != 1:
+        raise ValueError("Invalid content type format. Must be 'app_label.model'")
+    return get_content_type_by_label(content_type_value)
 
-    IMPORTANT: Model names in Django ContentType are stored in lowercase.
-    This function ensures we always query with lowercase model names.
+
+def get_content_types_for_items(items) -> dict:
     """
-    if content_type_value in _content_type_cache:
-        return _content_type_cache[content_type_value]
+    Group the object IDs of batch items by content type.
 
-    try:
-        app_label, model = content_type_value.split(".")
-        # Django stores model names in lowercase in ContentType table
-        content_type = ContentType.objects.get(app_label=app_label, model=model.lower())
-        _content_type_cache[content_type_value] = content_type
-        return content_type
-    except ValueError:
-        raise ValueError("Invalid content type format. Must be 'app_label.model'")
-    except ContentType.DoesNotExist:
-        raise ContentType.DoesNotExist(
-            f"Content type {content_type_value} does not exist"
+    Args:
+        items: Objects with ``content_type`` enum and ``object_id`` attributes
+
+    Returns:
+        Dict mapping the content type value to a (ContentType, object IDs) pair
+    """
+    object_ids_by_type = {}
+    for item in items:
+        object_ids_by_type.setdefault(item.content_type.value, set()).add(
+            item.object_id
         )
-    except Exception as e:
-        raise Exception(f"Error retrieving content type: {str(e)}")
+    return {
+        value: (get_content_type(value), sorted(object_ids))
+        for value, object_ids in object_ids_by_type.items()
+    }
 
 
 def get_content_type_for_model(model_class) -> ContentType:
-    """
-    Get ContentType for a model class with caching.
-    This is a cached wrapper around ContentType.objects.get_for_model().
-    """
-    cache_key = f"{model_class._meta.app_label}.{model_class._meta.model_name}"
-    if cache_key not in _content_type_cache:
-        _content_type_cache[cache_key] = ContentType.objects.get_for_model(model_class)
-    return _content_type_cache[cache_key]
+    """Get the ContentType of a model class from the process-wide cache."""
+    return get_content_type_by_label(model_class)
 
 
 def _validate_bookmarkable_object(content_type_value: str, object_id: int) -> bool:
@@ -302,6 +309,72 @@ def get_bookmark_status(request, content_type: BookmarkContentTypeEnum, object_i
         return 500, {"message": "An unexpected error occurred. Please try again later."}
 
 
+@router.post(
+    "/bookmarks/status",
+    response={
+        200: List[BookmarkStatusBatchItem],
+        codes_4xx: Message,
+        codes_5xx: Message,
+    },
+    auth=OptionalJWTAuth,
+    summary="Get bookmark status of several items",
+    description="Check which of the given items are bookmarked by the current user.",
+)
+def get_bookmark_status_batch(request, payload: BookmarkStatusBatchIn):
+    """Batch variant of get_bookmark_status, one query per content type."""
+    try:
+        user: Optional[User] = (
+            request.auth
+            if request.auth and not isinstance(request.auth, bool)
+            else None
+        )
+
+        if not user:
+            return 200, [
+                BookmarkStatusBatchItem(
+                    content_type=item.content_type,
+                    object_id=item.object_id,
+                    is_bookmarked=None,
+                )
+                for item in payload.items
+            ]
+
+        try:
+            content_types = get_content_types_for_items(payload.items)
+        except (ValueError, ContentType.DoesNotExist):
+            return 400, {
+                "message": "Content type does not exist. Please check and try again."
+            }
+        except Exception as e:
+            logger.error(f"Error retrieving content types: {e}")
+            return 500, {"message": "Error retrieving content type. Please try again."}
+
+        try:
+            bookmarked = set()
+            for value, (content_type, object_ids) in content_types.items():
+                bookmarked.update(
+                    (value, object_id)
+                    for object_id in Bookmark.objects.filter(
+                        user=user, content_type=content_type, object_id__in=object_ids
+                    ).values_list("object_id", flat=True)
+                )
+        except Exception as e:
+            logger.error(f"Error checking bookmark status: {e}")
+            return 500, {"message": "Error checking bookmark status. Please try again."}
+
+        return 200, [
+            BookmarkStatusBatchItem(
+                content_type=item.content_type,
+                object_id=item.object_id,
+                is_bookmarked=(item.content_type.value, item.object_id) in bookmarked,
+            )
+            for item in payload.items
+        ]
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        return 500, {"message": "An unexpected error occurred. Please try again later."}
+
+
 @router.get(
     "/bookmarks",
     response={
@@ -481,11 +554,20 @@ def post_reaction(request, reaction: ReactionIn):
                 "message": "Error checking existing reactions. Please try again."
             }
 
+        is_article = content_type == get_content_type_for_model(Article)
+
         if existing_reaction:
             if existing_reaction.vote == reaction.vote.value:
                 # User is clicking the same reaction type, so remove it
                 try:
-                    existing_reaction.delete()
+                    with transaction.atomic():
+                        existing_reaction.delete()
+                        if is_article:
+                            record_article_reaction(
+                                reaction.object_id,
+                                old_vote=existing_reaction.vote,
+                                reacted_at=existing_reaction.created_at,
+                            )
                     return 200, ReactionOut(
                         id=None,
                         user_id=request.auth.id,
@@ -501,8 +583,17 @@ def post_reaction(request, reaction: ReactionIn):
             else:
                 # User is changing their reaction from like to dislike or vice versa
                 try:
+                    old_vote = existing_reaction.vote
                     existing_reaction.vote = reaction.vote.value
-                    existing_reaction.save()
+                    with transaction.atomic():
+                        existing_reaction.save()
+                        if is_article:
+                            record_article_reaction(
+                                reaction.object_id,
+                                old_vote=old_vote,
+                                new_vote=existing_reaction.vote,
+                                reacted_at=existing_reaction.created_at,
+                            )
                     return 200, ReactionOut(
                         id=existing_reaction.id,
                         user_id=existing_reaction.user_id,
@@ -518,12 +609,19 @@ def post_reaction(request, reaction: ReactionIn):
         else:
             # User is reacting for the first time
             try:
-                new_reaction = Reaction.objects.create(
-                    user=request.auth,
-                    content_type=content_type,
-                    object_id=reaction.object_id,
-                    vote=reaction.vote.value,
-                )
+                with transaction.atomic():
+                    new_reaction = Reaction.objects.create(
+                        user=request.auth,
+                        content_type=content_type,
+                        object_id=reaction.object_id,
+                        vote=reaction.vote.value,
+                    )
+                    if is_article:
+                        record_article_reaction(
+                            reaction.object_id,
+                            new_vote=new_reaction.vote,
+                            reacted_at=new_reaction.created_at,
+                        )
                 return 200, ReactionOut(
                     id=new_reaction.id,
                     user_id=new_reaction.user_id,
@@ -561,16 +659,9 @@ def get_reaction_count(request, content_type: ContentTypeEnum, object_id: int):
             return 500, {"message": "Error retrieving content type. Please try again."}
 
         try:
-            reactions = Reaction.objects.filter(
-                content_type=content_type, object_id=object_id
-            )
-        except Exception as e:
-            logger.error(f"Error retrieving reactions: {e}")
-            return 500, {"message": "Error retrieving reactions. Please try again."}
-
-        try:
-            likes = reactions.filter(vote=VoteEnum.LIKE.value).count()
-            dislikes = reactions.filter(vote=VoteEnum.DISLIKE.value).count()
+            counts = get_reaction_counts(content_type.id, [object_id])[object_id]
+            likes = counts["like_count"]
+            dislikes = counts["dislike_count"]
         except Exception as e:
             logger.error(f"Error counting reactions: {e}")
             return 500, {"message": "Error counting reactions. Please try again."}
@@ -587,7 +678,9 @@ def get_reaction_count(request, content_type: ContentTypeEnum, object_id: int):
 
         if current_user:
             try:
-                user_reaction_obj = reactions.filter(user=current_user).first()
+                user_reaction_obj = Reaction.objects.filter(
+                    content_type=content_type, object_id=object_id, user=current_user
+                ).first()
                 if user_reaction_obj:
                     user_reaction = VoteEnum(user_reaction_obj.vote)
             except Exception as e:
@@ -605,6 +698,176 @@ def get_reaction_count(request, content_type: ContentTypeEnum, object_id: int):
         return 500, {"message": "An unexpected error occurred. Please try again later."}
 
 
+@router.post(
+    "/reaction_count",
+    response={
+        200: List[ReactionCountBatchItem],
+        codes_4xx: Message,
+        codes_5xx: Message,
+    },
+    auth=OptionalJWTAuth,
+)
+def get_reaction_count_batch(request, payload: ReactionCountBatchIn):
+    """
+    Batch variant of get_reaction_count, one query and one counter read per
+    content type, plus one query per content type for the viewer's votes.
+    """
+    try:
+        try:
+            content_types = get_content_types_for_items(payload.items)
+        except (ValueError, ContentType.DoesNotExist):
+            return 400, {
+                "message": "Content type does not exist. Please check and try again."
+            }
+        except Exception as e:
+            logger.error(f"Error retrieving content types: {e}")
+            return 500, {"message": "Error retrieving content type. Please try again."}
+
+        current_user: Optional[User] = (
+            request.auth
+            if request.auth and not isinstance(request.auth, bool)
+            else None
+        )
+
+        try:
+            counts = {}
+            votes = {}
+            for value, (content_type, object_ids) in content_types.items():
+                for object_id, object_counts in get_reaction_counts(
+                    content_type.id, object_ids
+                ).items():
+                    counts[(value, object_id)] = object_counts
+                if current_user:
+                    for object_id, vote in Reaction.objects.filter(
+                        user=current_user,
+                        content_type=content_type,
+                        object_id__in=object_ids,
+                    ).values_list("object_id", "vote"):
+                        votes[(value, object_id)] = VoteEnum(vote)
+        except Exception as e:
+            logger.error(f"Error counting reactions: {e}")
+            return 500, {"message": "Error counting reactions. Please try again."}
+
+        items = []
+        for item in payload.items:
+            key = (item.content_type.value, item.object_id)
+            items.append(
+                ReactionCountBatchItem(
+                    content_type=item.content_type,
+                    object_id=item.object_id,
+                    likes=counts[key]["like_count"],
+                    dislikes=counts[key]["dislike_count"],
+                    user_reaction=votes.get(key),
+                )
+            )
+        return 200, items
+    except Exception as e:
+        logger.error(f"An unexpected error occurred: {e}")
+        return 500, {"message": "An unexpected error occurred. Please try again later."}
+
+
+"""
+Leaderboard API
+"""
+
+
+def leaderboard_entries(entries) -> list:
+    """Attach the users to (rank, user_id, score) leaderboard entries."""
+    users = User.objects.in_bulk([user_id for _, user_id, _ in entries])
+    return [
+        LeaderboardEntryOut(
+            rank=rank,
+            score=score,
+            user=UserStats.from_model(users[user_id], basic_details=True),
+        )
+        for rank, user_id, score in entries
+        if user_id in users
+    ]
+
+
+def get_leaderboard_community(community_id: int, user):
+    """
+    Community whose leaderboard the user may see.
+
+    Returns:
+        The community, or a (status, payload) error tuple
+    """
+    community = Community.objects.filter(id=community_id).first()
+    if community is None:
+        return 404, {"message": "Community not found."}
+    if community.type != Community.PUBLIC and not (user and community.is_member(user)):
+        return 403, {"message": "You are not a member of this community."}
+    return community
+
+
+@router.get(
+    "/leaderboard",
+    response={200: LeaderboardOut, codes_4xx: Message, codes_5xx: Message},
+    auth=OptionalJWTAuth,
+)
+def get_leaderboard(
+    request,
+    community_id: Optional[int] = Query(None),
+    limit: int = Query(10, ge=1, le=MAX_LEADERBOARD_SIZE),
+):
+    """
+    Get the users with the highest reputation, globally or in a community.
+    """
+    try:
+        user = None if isinstance(request.auth, bool) else request.auth
+
+        community_score = None
+        if community_id is not None:
+            community = get_leaderboard_community(community_id, user)
+            if isinstance(community, tuple):
+                return community
+            community_score = get_community_total(community.id)
+
+        return 200, LeaderboardOut(
+            entries=leaderboard_entries(get_top(limit, community_id)),
+            community_score=community_score,
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving leaderboard: {e}")
+        return 500, {"message": "Error retrieving leaderboard. Please try again."}
+
+
+@router.get(
+    "/leaderboard/me",
+    response={200: MyLeaderboardOut, codes_4xx: Message, codes_5xx: Message},
+    auth=JWTAuth(),
+)
+def get_my_leaderboard_rank(
+    request,
+    community_id: Optional[int] = Query(None),
+    radius: int = Query(5, ge=0, le=MAX_LEADERBOARD_SIZE // 2),
+):
+    """
+    Get the current user's rank and the users ranked around them.
+    """
+    try:
+        user = request.auth
+
+        if community_id is not None:
+            community = get_leaderboard_community(community_id, user)
+            if isinstance(community, tuple):
+                return community
+
+        position = get_rank(user.id, community_id)
+        if position is None:
+            return 200, MyLeaderboardOut(rank=None, score=0, entries=[])
+
+        rank, score = position
+        return 200, MyLeaderboardOut(
+            rank=rank,
+            score=score,
+            entries=leaderboard_entries(get_around(user.id, radius, community_id)),
+        )
+    except Exception as e:
+        logger.error(f"Error retrieving leaderboard rank: {e}")
+        return 500, {"message": "Error retrieving leaderboard rank. Please try again."}
+
+
 """
 Hashtags API
 """
@@ -710,7 +973,7 @@ def list_my_posts(
                 if hashtag_id:
                     post_ids = HashtagRelation.objects.filter(
                         hashtag_id=hashtag_id,
-                        content_type=ContentType.objects.get_for_model(Post),
+                        content_type_id=content_type_id(Post),
                     ).values_list("object_id", flat=True)
                     posts = posts.filter(id__in=post_ids)
             except Exception as e:
@@ -748,4 +1011,4 @@ def list_my_posts(
             return 500, {"message": "Error formatting post data. Please try again."}
     except Exception as e:
         logger.error(f"An unexpected error occurred: {e}")
-        return 500, {"message": "An unexpected error occurred. Please try again later."}
\ No newline at end of file
+        return 500, {"message": "An unexpected error occurred. Please try again later."}
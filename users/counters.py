@@ -0,0 +1,146 @@
+"""
+Helpers for the denormalized UserCounters table.
+
+The create and delete receivers of articles, reviews, review comments,
+posts, post comments and memberships call ``bump_user_counters`` inside the
+writing transaction, so profile stats are read from a single row instead of
+six COUNT queries. Counters are never created by a bump: rows are created
+with the user, and a bump racing a user deletion must not bring the row
+back. ``rebuild_user_counters`` recomputes the rows from the source tables
+and runs nightly to repair any drift.
+"""
+
+from django.db.models import Count, F
+from django.utils import timezone
+
+from users.models import UserCounters
+
+COUNTER_FIELDS = (
+    "articles",
+    "reviews",
+    "review_comments",
+    "posts",
+    "post_comments",
+    "communities_joined",
+)
+
+
+def bump_user_counters(user_id: int, **deltas):
+    """
+    Atomically apply counter deltas to a user's counters row.
+
+    Args:
+        user_id: ID of the user
+        **deltas: Field name to increment (negative values decrement)
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas or user_id is None:
+        return
+
+    unknown = set(deltas) - set(COUNTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown user counter fields: {sorted(unknown)}")
+
+    UserCounters.objects.filter(user_id=user_id).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + delta for field, delta in deltas.items()},
+    )
+
+
+def _counted_querysets():
+    from articles.models import Article, Review, ReviewComment
+    from communities.models import Membership
+    from posts.models import Comment, Post
+
+    return {
+        "articles": (Article.objects.all(), "submitter_id"),
+        "reviews": (Review.objects.all(), "user_id"),
+        "review_comments": (ReviewComment.objects.all(), "author_id"),
+        "posts": (Post.objects.all(), "author_id"),
+        "post_comments": (Comment.objects.all(), "author_id"),
+        "communities_joined": (Membership.objects.all(), "user_id"),
+    }
+
+
+def compute_user_counters(user_ids=None) -> dict:
+    """
+    Recompute the counters from the source tables.
+
+    Args:
+        user_ids: Only compute these users, all users if None
+
+    Returns:
+        Dict mapping user_id to a dict of COUNTER_FIELDS. Users without any
+        contribution are left out.
+    """
+    counters = {}
+    for field, (queryset, user_field) in _counted_querysets().items():
+        if user_ids is not None:
+            queryset = queryset.filter(**{f"{user_field}__in": list(user_ids)})
+        for user_id, count in (
+            queryset.values(user_field)
+            .annotate(count=Count("pk"))
+            .values_list(user_field, "count")
+            .order_by()
+        ):
+            counters.setdefault(user_id, dict.fromkeys(COUNTER_FIELDS, 0))[
+                field
+            ] = count
+    return counters
+
+
+def get_user_counters(user_id: int) -> UserCounters:
+    """
+    Counters of a user, computed without being stored if the row is missing.
+    """
+    counters = UserCounters.objects.filter(user_id=user_id).first()
+    if counters is None:
+        values = compute_user_counters([user_id]).get(user_id, {})
+        counters = UserCounters(user_id=user_id, **values)
+    return counters
+
+
+def rebuild_user_counters(user_ids=None, dry_run: bool = False, batch_size=1000):
+    """
+    Compare the stored counters with recomputed values and repair drift.
+
+    Args:
+        user_ids: Only reconcile these users, all users if None
+        dry_run: Only report the drifted users
+        batch_size: Number of rows written per query
+
+    Returns:
+        List of the user IDs whose counters were missing or drifted
+    """
+    from users.models import User
+
+    expected = compute_user_counters(user_ids)
+    users = User.objects.all()
+    stored = UserCounters.objects.all()
+    if user_ids is not None:
+        users = users.filter(id__in=list(user_ids))
+        stored = stored.filter(user_id__in=list(user_ids))
+    stored = {counters.user_id: counters for counters in stored}
+
+    empty = dict.fromkeys(COUNTER_FIELDS, 0)
+    missing, drifted = [], []
+    for user_id in users.values_list("id", flat=True).iterator():
+        values = expected.get(user_id, empty)
+        counters = stored.get(user_id)
+        if counters is None:
+            missing.append(UserCounters(user_id=user_id, **values))
+        elif any(getattr(counters, field) != values[field] for field in COUNTER_FIELDS):
+            for field in COUNTER_FIELDS:
+                setattr(counters, field, values[field])
+            counters.updated_at = timezone.now()
+            drifted.append(counters)
+
+    if not dry_run:
+        UserCounters.objects.bulk_create(
+            missing, batch_size=batch_size, ignore_conflicts=True
+        )
+        UserCounters.objects.bulk_update(
+            drifted, [*COUNTER_FIELDS, "updated_at"], batch_size=batch_size
+        )
+
+    return sorted(counters.user_id for counters in missing + drifted)
@@ -0,0 +1,557 @@
+"""
+Reputation leaderboards kept in Redis sorted sets.
+
+``leaderboard:global`` ranks every user by reputation score and
+``leaderboard:community:<id>`` ranks the members of one community. The
+``leaderboard:community_totals`` set holds the summed score of each
+community's members, so community reputation is a single ZSCORE. Rank,
+top-N and around-me reads are ZREVRANK / ZREVRANGE calls, O(log n) in the
+size of the board.
+
+Members are zero-padded user ids. Redis orders equal scores by member in
+reverse lexicographic order, so ties rank by descending user id, as in the
+Postgres fallback.
+
+Score changes and membership changes are applied as increments once their
+transaction commits. The boards are only trusted while the built marker set
+by ``rebuild_leaderboards`` exists, so after a Redis flush, or while Redis is
+unavailable, reads fall back to Postgres until
+``python manage.py rebuild_leaderboards`` (also run nightly) restores them.
+
+While a rebuild runs, every write also records the users and communities it
+touched. Increments made after the rebuild read Postgres would otherwise be
+lost when the rebuilt boards replace the live ones, so the rebuild re-reads
+those users and communities once the boards are swapped.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Q, Sum
+from django_redis import get_redis_connection
+
+from communities.models import Membership
+from users.models import Reputation
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "leaderboard"
+GLOBAL_KEY = f"{KEY_PREFIX}:global"
+COMMUNITY_TOTALS_KEY = f"{KEY_PREFIX}:community_totals"
+# Versioned with the member format, boards in an older format are not
+# trusted until rebuilt
+BUILT_KEY = f"{KEY_PREFIX}:built:2"
+REBUILDING_KEY = f"{KEY_PREFIX}:rebuilding"
+DIRTY_USERS_KEY = f"{KEY_PREFIX}:dirty:users"
+DIRTY_COMMUNITIES_KEY = f"{KEY_PREFIX}:dirty:communities"
+# Writes stop recording what they touched if a rebuild dies
+REBUILD_TTL = 2 * 60 * 60  # 2 hours
+MAX_REPAIR_ROUNDS = 10
+
+
+def _community_key(community_id: int) -> str:
+    return f"{KEY_PREFIX}:community:{community_id}"
+
+
+def _board_key(community_id=None) -> str:
+    return GLOBAL_KEY if community_id is None else _community_key(community_id)
+
+
+def _member(user_id) -> str:
+    return f"{int(user_id):012d}"
+
+
+def _redis():
+    return get_redis_connection("default")
+
+
+def _is_built(redis) -> bool:
+    return bool(redis.exists(BUILT_KEY))
+
+
+"""
+Writes
+"""
+
+# KEYS: rebuilding marker, dirty set. ARGV: ids to add to the set.
+MARK_DIRTY_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    redis.call("SADD", KEYS[2], unpack(ARGV))
+end
+"""
+
+
+def _mark_dirty(pipeline, dirty_key: str, *ids):
+    """Queue recording ids for the running rebuild, if any, to re-read."""
+    pipeline.eval(MARK_DIRTY_SCRIPT, 2, REBUILDING_KEY, dirty_key, *ids)
+
+
+def record_reputation_change(user_id: int, delta: int):
+    """
+    Add a score delta to the user's entries on all boards once the current
+    transaction commits.
+    """
+    if not delta:
+        return
+
+    def push():
+        try:
+            community_ids = list(
+                Membership.objects.filter(user_id=user_id).values_list(
+                    "community_id", flat=True
+                )
+            )
+            pipeline = _redis().pipeline(transaction=True)
+            pipeline.zincrby(GLOBAL_KEY, delta, _member(user_id))
+            for community_id in community_ids:
+                pipeline.zincrby(_community_key(community_id), delta, _member(user_id))
+                pipeline.zincrby(COMMUNITY_TOTALS_KEY, delta, community_id)
+            _mark_dirty(pipeline, DIRTY_USERS_KEY, user_id)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Failed to update leaderboards of user {user_id}: {e}")
+
+    transaction.on_commit(push)
+
+
+def record_user_added(user_id: int, score: int = 0):
+    """
+    Put a new user on the global board once the transaction commits, so
+    they have a rank before their first score change.
+    """
+
+    def push():
+        try:
+            pipeline = _redis().pipeline(transaction=True)
+            pipeline.zadd(GLOBAL_KEY, {_member(user_id): score}, nx=True)
+            _mark_dirty(pipeline, DIRTY_USERS_KEY, user_id)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Failed to add user {user_id} to leaderboard: {e}")
+
+    transaction.on_commit(push)
+
+
+def record_user_removed(user_id: int):
+    """Drop a deleted user from the global board once the transaction commits."""
+
+    def push():
+        try:
+            pipeline = _redis().pipeline(transaction=True)
+            pipeline.zrem(GLOBAL_KEY, _member(user_id))
+            _mark_dirty(pipeline, DIRTY_USERS_KEY, user_id)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(f"Failed to remove user {user_id} from leaderboard: {e}")
+
+    transaction.on_commit(push)
+
+
+# Members join a community board with their global score, and the community
+# total moves by the scores entering or leaving. Atomic as a script, so
+# concurrent score changes are never lost in between.
+# KEYS: global board, community board, totals. ARGV: community id, joined,
+# user ids.
+MEMBERSHIP_SCRIPT = """
+local moved = 0
+for i = 3, #ARGV do
+    if ARGV[2] == "1" then
+        local score = tonumber(redis.call("ZSCORE", KEYS[1], ARGV[i]) or 0)
+        local previous = redis.call("ZSCORE", KEYS[2], ARGV[i])
+        if not previous then
+            redis.call("ZADD", KEYS[2], score, ARGV[i])
+            moved = moved + score
+        end
+    else
+        local score = redis.call("ZSCORE", KEYS[2], ARGV[i])
+        if score then
+            redis.call("ZREM", KEYS[2], ARGV[i])
+            moved = moved - tonumber(score)
+        end
+    end
+end
+if moved ~= 0 then
+    redis.call("ZINCRBY", KEYS[3], moved, ARGV[1])
+end
+return moved
+"""
+
+
+def record_membership_change(community_id: int, user_ids, joined: bool):
+    """
+    Add users to or remove them from a community board, moving the
+    community total by their scores, once the transaction commits.
+    """
+    user_ids = list(user_ids)
+    if not user_ids:
+        return
+
+    def push():
+        try:
+            pipeline = _redis().pipeline(transaction=True)
+            pipeline.eval(
+                MEMBERSHIP_SCRIPT,
+                3,
+                GLOBAL_KEY,
+                _community_key(community_id),
+                COMMUNITY_TOTALS_KEY,
+                community_id,
+                int(joined),
+                *(_member(user_id) for user_id in user_ids),
+            )
+            _mark_dirty(pipeline, DIRTY_COMMUNITIES_KEY, community_id)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(
+                f"Failed to update leaderboard of community {community_id}: {e}"
+            )
+
+    transaction.on_commit(push)
+
+
+def record_community_removed(community_id: int):
+    """Drop a deleted community's board once the transaction commits."""
+
+    def push():
+        try:
+            pipeline = _redis().pipeline(transaction=True)
+            pipeline.delete(_community_key(community_id))
+            pipeline.zrem(COMMUNITY_TOTALS_KEY, community_id)
+            _mark_dirty(pipeline, DIRTY_COMMUNITIES_KEY, community_id)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(
+                f"Failed to remove leaderboard of community {community_id}: {e}"
+            )
+
+    transaction.on_commit(push)
+
+
+# Sets a user's score on a community board, moving the community total by
+# the difference. KEYS: community board, totals. ARGV: community id, member,
+# score.
+SET_MEMBER_SCRIPT = """
+local previous = tonumber(redis.call("ZSCORE", KEYS[1], ARGV[2]) or 0)
+redis.call("ZADD", KEYS[1], ARGV[3], ARGV[2])
+redis.call("ZINCRBY", KEYS[2], tonumber(ARGV[3]) - previous, ARGV[1])
+"""
+
+# Ends dirty tracking only if nothing was recorded since the last repair.
+# KEYS: rebuilding marker, dirty users, dirty communities.
+FINISH_REBUILD_SCRIPT = """
+if redis.call("SCARD", KEYS[2]) + redis.call("SCARD", KEYS[3]) > 0 then
+    return 0
+end
+redis.call("DEL", KEYS[1])
+return 1
+"""
+
+
+def _repair_users(redis, user_ids):
+    scores = dict(
+        Reputation.objects.filter(user_id__in=user_ids).values_list("user_id", "score")
+    )
+    memberships = Membership.objects.filter(user_id__in=user_ids).values_list(
+        "user_id", "community_id"
+    )
+
+    pipeline = redis.pipeline(transaction=False)
+    for user_id in user_ids:
+        if user_id in scores:
+            pipeline.zadd(GLOBAL_KEY, {_member(user_id): scores[user_id]})
+        else:
+            pipeline.zrem(GLOBAL_KEY, _member(user_id))
+    for user_id, community_id in memberships:
+        pipeline.eval(
+            SET_MEMBER_SCRIPT,
+            2,
+            _community_key(community_id),
+            COMMUNITY_TOTALS_KEY,
+            community_id,
+            _member(user_id),
+            scores.get(user_id, 0),
+        )
+    pipeline.execute()
+
+
+def _repair_communities(redis, community_ids):
+    for community_id in community_ids:
+        scores = {
+            _member(user_id): score or 0
+            for user_id, score in Membership.objects.filter(
+                community_id=community_id
+            ).values_list("user_id", "user__reputation__score")
+        }
+        key = _community_key(community_id)
+        temporary_key = f"{KEY_PREFIX}:repair:{key}"
+        if scores:
+            redis.delete(temporary_key)
+            redis.zadd(temporary_key, scores)
+        pipeline = redis.pipeline(transaction=True)
+        if scores:
+            pipeline.rename(temporary_key, key)
+            pipeline.zadd(COMMUNITY_TOTALS_KEY, {community_id: sum(scores.values())})
+        else:
+            pipeline.delete(key)
+            pipeline.zrem(COMMUNITY_TOTALS_KEY, community_id)
+        pipeline.execute()
+
+
+def _repair_dirty(redis) -> int:
+    """
+    Re-read the users and communities written to since the rebuild started,
+    until no new ones are recorded, then stop recording.
+
+    Returns:
+        Number of users and communities re-read
+    """
+    repaired = 0
+    for _ in range(MAX_REPAIR_ROUNDS):
+        pipeline = redis.pipeline(transaction=True)
+        pipeline.smembers(DIRTY_USERS_KEY)
+        pipeline.smembers(DIRTY_COMMUNITIES_KEY)
+        pipeline.delete(DIRTY_USERS_KEY, DIRTY_COMMUNITIES_KEY)
+        user_ids, community_ids, _ = pipeline.execute()
+        if not user_ids and not community_ids:
+            if redis.eval(
+                FINISH_REBUILD_SCRIPT,
+                3,
+                REBUILDING_KEY,
+                DIRTY_USERS_KEY,
+                DIRTY_COMMUNITIES_KEY,
+            ):
+                return repaired
+            continue
+        # Communities first, their boards are replaced as a whole
+        _repair_communities(redis, [int(value) for value in community_ids])
+        _repair_users(redis, [int(value) for value in user_ids])
+        repaired += len(user_ids) + len(community_ids)
+
+    logger.warning(
+        f"Leaderboards still changing after {MAX_REPAIR_ROUNDS} repair rounds, "
+        "the next rebuild corrects what was missed"
+    )
+    redis.delete(REBUILDING_KEY, DIRTY_USERS_KEY, DIRTY_COMMUNITIES_KEY)
+    return repaired
+
+
+def rebuild_leaderboards(batch_size: int = 5000) -> dict:
+    """
+    Rebuild every board from Postgres.
+
+    Boards are written under temporary keys and swapped in with one MULTI
+    block, so readers never see a partial board. Users and communities
+    written to during the rebuild are then re-read, so no score change made
+    in the meantime is lost with the replaced boards.
+
+    Returns:
+        Dict with the number of users and communities ranked, and of those
+        re-read after the swap
+    """
+    redis = _redis()
+    temporary = f"{KEY_PREFIX}:rebuild"
+    final_keys = {}
+
+    # From here on every write records what it touched
+    pipeline = redis.pipeline(transaction=True)
+    pipeline.delete(DIRTY_USERS_KEY, DIRTY_COMMUNITIES_KEY)
+    pipeline.set(REBUILDING_KEY, 1, ex=REBUILD_TTL)
+    pipeline.execute()
+
+    def stage(final_key, scores):
+        temporary_key = f"{temporary}:{final_key}"
+        if temporary_key not in final_keys:
+            redis.delete(temporary_key)
+            final_keys[temporary_key] = final_key
+        if scores:
+            redis.zadd(temporary_key, scores)
+
+    batch = {}
+    users = 0
+    for user_id, score in Reputation.objects.values_list("user_id", "score").iterator(
+        chunk_size=batch_size
+    ):
+        batch[_member(user_id)] = score
+        users += 1
+        if len(batch) >= batch_size:
+            stage(GLOBAL_KEY, batch)
+            batch = {}
+    stage(GLOBAL_KEY, batch)
+
+    current_id, scores = None, {}
+    for community_id, user_id, score in (
+        Membership.objects.values_list(
+            "community_id", "user_id", "user__reputation__score"
+        )
+        .order_by("community_id")
+        .iterator(chunk_size=batch_size)
+    ):
+        if community_id != current_id or len(scores) >= batch_size:
+            if current_id is not None:
+                stage(_community_key(current_id), scores)
+            current_id, scores = community_id, {}
+        scores[_member(user_id)] = score or 0
+    if current_id is not None:
+        stage(_community_key(current_id), scores)
+
+    totals = dict(
+        Membership.objects.values("community_id")
+        .annotate(total=Sum("user__reputation__score"))
+        .values_list("community_id", "total")
+    )
+    stage(COMMUNITY_TOTALS_KEY, {key: total or 0 for key, total in totals.items()})
+
+    stale = [
+        key
+        for key in redis.scan_iter(f"{KEY_PREFIX}:community:*")
+        if (key.decode() if isinstance(key, bytes) else key) not in final_keys.values()
+    ]
+    pipeline = redis.pipeline(transaction=True)
+    for temporary_key, final_key in final_keys.items():
+        if redis.exists(temporary_key):
+            pipeline.rename(temporary_key, final_key)
+        else:
+            pipeline.delete(final_key)
+    if stale:
+        pipeline.delete(*stale)
+    pipeline.set(BUILT_KEY, 1)
+    pipeline.execute()
+
+    return {
+        "users": users,
+        "communities": len(totals),
+        "repaired": _repair_dirty(redis),
+    }
+
+
+"""
+Reads
+"""
+
+
+def _community_members(community_id):
+    return Reputation.objects.filter(
+        user__member_communities__id=community_id
+    ).distinct()
+
+
+def _db_board(community_id=None):
+    if community_id is None:
+        return Reputation.objects.all()
+    return _community_members(community_id)
+
+
+def _as_entries(rows, first_rank: int) -> list:
+    return [
+        (first_rank + offset, int(member), int(score))
+        for offset, (member, score) in enumerate(rows)
+    ]
+
+
+def get_top(limit: int = 10, community_id=None) -> list:
+    """
+    Highest ranked users of a board.
+
+    Args:
+        limit: Number of entries
+        community_id: Community board to read, the global board if None
+
+    Returns:
+        List of (rank, user_id, score) tuples, ranks starting at 1
+    """
+    try:
+        redis = _redis()
+        if _is_built(redis):
+            return _as_entries(
+                redis.zrevrange(
+                    _board_key(community_id), 0, limit - 1, withscores=True
+                ),
+                1,
+            )
+    except Exception as e:
+        logger.warning(f"Failed to read leaderboard: {e}")
+
+    rows = _db_board(community_id).order_by("-score", "-user_id")[:limit]
+    return _as_entries(rows.values_list("user_id", "score"), 1)
+
+
+def get_rank(user_id: int, community_id=None):
+    """
+    Rank and score of a user on a board.
+
+    Returns:
+        (rank, score) tuple, ranks starting at 1, or None if the user is not
+        on the board
+    """
+    try:
+        redis = _redis()
+        if _is_built(redis):
+            pipeline = redis.pipeline(transaction=False)
+            pipeline.zrevrank(_board_key(community_id), _member(user_id))
+            pipeline.zscore(_board_key(community_id), _member(user_id))
+            rank, score = pipeline.execute()
+            return None if rank is None else (rank + 1, int(score))
+    except Exception as e:
+        logger.warning(f"Failed to read leaderboard rank: {e}")
+
+    board = _db_board(community_id)
+    reputation = board.filter(user_id=user_id).first()
+    if reputation is None:
+        return None
+    # Same order as the sorted sets: score, then user id, descending
+    higher = board.filter(
+        Q(score__gt=reputation.score) | Q(score=reputation.score, user_id__gt=user_id)
+    ).count()
+    return higher + 1, reputation.score
+
+
+def get_around(user_id: int, radius: int = 5, community_id=None) -> list:
+    """
+    Entries ranked within ``radius`` places of a user, the user included.
+
+    Returns:
+        List of (rank, user_id, score) tuples, empty if the user is not on
+        the board
+    """
+    try:
+        redis = _redis()
+        if _is_built(redis):
+            key = _board_key(community_id)
+            rank = redis.zrevrank(key, _member(user_id))
+            if rank is None:
+                return []
+            start = max(rank - radius, 0)
+            return _as_entries(
+                redis.zrevrange(key, start, rank + radius, withscores=True),
+                start + 1,
+            )
+    except Exception as e:
+        logger.warning(f"Failed to read leaderboard: {e}")
+
+    position = get_rank(user_id, community_id)
+    if position is None:
+        return []
+    start = max(position[0] - 1 - radius, 0)
+    rows = _db_board(community_id).order_by("-score", "-user_id")[
+        start : position[0] + radius
+    ]
+    return _as_entries(rows.values_list("user_id", "score"), start + 1)
+
+
+def get_community_total(community_id: int) -> int:
+    """Summed reputation score of a community's members."""
+    try:
+        redis = _redis()
+        if _is_built(redis):
+            return int(redis.zscore(COMMUNITY_TOTALS_KEY, community_id) or 0)
+    except Exception as e:
+        logger.warning(f"Failed to read community reputation: {e}")
+
+    return (
+        Reputation.objects.filter(
+            user__in=Membership.objects.filter(community_id=community_id).values(
+                "user_id"
+            )
+        ).aggregate(Sum("score"))["score__sum"]
+        or 0
+    )
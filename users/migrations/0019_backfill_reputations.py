@@ -0,0 +1,26 @@
+# Generated by Django 5.0.14 on 2026-10-18 22:39
+
+from django.db import migrations
+
+
+def create_missing_reputations(apps, schema_editor):
+    # Reputations are created on signup from now on
+    User = apps.get_model("users", "User")
+    Reputation = apps.get_model("users", "Reputation")
+    user_ids = User.objects.filter(reputation__isnull=True).values_list("id", flat=True)
+    Reputation.objects.bulk_create(
+        [Reputation(user_id=user_id) for user_id in user_ids.iterator()],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0018_uploadedimage"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_missing_reputations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.0.14 on 2026-10-18 22:52
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_user_counters(apps, schema_editor):
+    # Mirrors users.counters.compute_user_counters
+    User = apps.get_model("users", "User")
+    UserCounters = apps.get_model("users", "UserCounters")
+    counted = {
+        "articles": (apps.get_model("articles", "Article"), "submitter_id"),
+        "reviews": (apps.get_model("articles", "Review"), "user_id"),
+        "review_comments": (apps.get_model("articles", "ReviewComment"), "author_id"),
+        "posts": (apps.get_model("posts", "Post"), "author_id"),
+        "post_comments": (apps.get_model("posts", "Comment"), "author_id"),
+        "communities_joined": (
+            apps.get_model("communities", "Membership"),
+            "user_id",
+        ),
+    }
+
+    counters = {}
+    for field, (model, user_field) in counted.items():
+        for user_id, count in (
+            model.objects.values(user_field)
+            .annotate(count=Count("pk"))
+            .values_list(user_field, "count")
+            .order_by()
+        ):
+            counters.setdefault(user_id, {})[field] = count
+
+    UserCounters.objects.bulk_create(
+        [
+            UserCounters(user_id=user_id, **counters.get(user_id, {}))
+            for user_id in User.objects.values_list("id", flat=True).iterator()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0019_backfill_reputations"),
+        ("articles", "0041_reaction_target"),
+        ("communities", "0018_communitydailystats"),
+        ("posts", "0002_comment_is_deleted_post_is_deleted"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserCounters",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="counters",
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("articles", models.IntegerField(default=0)),
+                ("reviews", models.IntegerField(default=0)),
+                ("review_comments", models.IntegerField(default=0)),
+                ("posts", models.IntegerField(default=0)),
+                ("post_comments", models.IntegerField(default=0)),
+                ("communities_joined", models.IntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "db_table": "user_counters",
+            },
+        ),
+        migrations.RunPython(build_user_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0.14 on 2026-10-18 22:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0041_reaction_target"),
+        ("communities", "0018_communitydailystats"),
+        ("posts", "0002_comment_is_deleted_post_is_deleted"),
+        ("users", "0020_usercounters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                fields=["user", "-created_at", "-id"], name="notification_inbox"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", False)),
+                fields=["user"],
+                name="notification_unread",
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.14 on 2026-10-18 23:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("articles", "0041_reaction_target"),
+        ("communities", "0018_communitydailystats"),
+        ("posts", "0002_comment_is_deleted_post_is_deleted"),
+        ("users", "0021_notification_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("expires_at__isnull", False)),
+                fields=["expires_at"],
+                name="notification_expiry",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="notification",
+            index=models.Index(
+                condition=models.Q(("is_read", True)),
+                fields=["created_at"],
+                name="notification_read_age",
+            ),
+        ),
+    ]
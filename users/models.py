@@ -10,11 +10,16 @@ from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 from django.db import models
-from django.db.models import Sum
+from django.db.models import Case, F, Value, When
+from django.db.models.lookups import GreaterThanOrEqual
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.timezone import now, timedelta
 from django.utils.translation import gettext_lazy as _
 
 from myapp import settings
+from myapp.conditional import bump_content_versions
+from users.auth_cache import invalidate_auth_user
 
 
 class UserManager(BaseUserManager):
@@ -83,6 +88,13 @@ class User(AbstractUser):
         return self.id
 
 
+# Password changes, deactivation and profile updates all go through save()
+# (see users/auth_cache.py)
+@receiver([post_save, post_delete], sender=User)
+def invalidate_cached_auth_user(sender, instance, **kwargs):
+    invalidate_auth_user(instance.pk)
+
+
 class Notification(models.Model):
     CATEGORY_CHOICES = [
         ("posts", "Posts"),
@@ -121,6 +133,38 @@ class Notification(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Inbox pages, keyset paginated on (created_at, id)
+            models.Index(
+                fields=["user", "-created_at", "-id"], name="notification_inbox"
+            ),
+            # Unread counts when the cached counter is missing
+            models.Index(
+                fields=["user"],
+                name="notification_unread",
+                condition=models.Q(is_read=False),
+            ),
+            # Retention sweeps (see users/notification_retention.py)
+            models.Index(
+                fields=["expires_at"],
+                name="notification_expiry",
+                condition=models.Q(expires_at__isnull=False),
+            ),
+            models.Index(
+                fields=["created_at"],
+                name="notification_read_age",
+                condition=models.Q(is_read=True),
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the unread counter receiver tell whether a save read it
+        instance._loaded_is_read = instance.__dict__.get("is_read")
+        return instance
+
     def __str__(self):
         return (
             f"{self.category.title()} - "
@@ -132,6 +176,32 @@ class Notification(models.Model):
         self.expires_at = now() + timedelta(days=days)
 
 
+# Cached unread counts (see users/notification_inbox.py)
+@receiver(post_save, sender=Notification)
+def count_saved_notification(sender, instance, created, raw=False, **kwargs):
+    from users.notification_inbox import record_unread_change
+
+    if raw:
+        return
+    if created:
+        delta = int(not instance.is_read)
+    else:
+        loaded = getattr(instance, "_loaded_is_read", None)
+        if loaded is None:
+            return
+        delta = int(loaded) - int(instance.is_read)
+    record_unread_change(instance.user_id, delta)
+    instance._loaded_is_read = instance.is_read
+
+
+@receiver(post_delete, sender=Notification)
+def count_deleted_notification(sender, instance, **kwargs):
+    from users.notification_inbox import record_unread_change
+
+    if not instance.is_read:
+        record_unread_change(instance.user_id, -1)
+
+
 class Hashtag(models.Model):
     name = models.CharField(max_length=25, unique=True)
 
@@ -189,14 +259,67 @@ class Reputation(models.Model):
         "Guru": 1000,
     }
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the leaderboard receiver tell how much a save moved the score
+        instance._loaded_score = instance.__dict__.get("score")
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self._loaded_score = self.__dict__.get("score")
+
     def add_reputation(self, action: ActionType) -> None:
         """
         Add reputation points based on the action performed
         """
-        points = getattr(self, action, 0)
-        self.score += points
-        self.update_level()
-        self.save()
+        self.award(self.user_id, action)
+        self.refresh_from_db(fields=["score", "level"])
+
+    @classmethod
+    def level_for_score(cls, score) -> Case:
+        """
+        SQL expression of the level matching a score expression, the
+        database counterpart of update_level
+        """
+        return Case(
+            *(
+                When(GreaterThanOrEqual(score, threshold), then=Value(level))
+                for level, threshold in sorted(
+                    cls.LEVELS.items(), key=lambda x: x[1], reverse=True
+                )
+            ),
+            default=Value("Novice"),
+            output_field=models.CharField(),
+        )
+
+    @classmethod
+    def award(cls, user_id: int, action: ActionType) -> None:
+        """
+        Atomically add the points of an action to a user's reputation.
+
+        Score and level are computed by the UPDATE itself, so concurrent
+        awards never overwrite each other.
+        """
+        points = getattr(cls, action, 0)
+        score = F("score") + points
+        updated = cls.objects.filter(user_id=user_id).update(
+            score=score, level=cls.level_for_score(score)
+        )
+        if not updated:
+            # Users from before reputations were created on signup
+            cls.objects.get_or_create(user_id=user_id)
+            cls.objects.filter(user_id=user_id).update(
+                score=score, level=cls.level_for_score(score)
+            )
+        from articles.models import bump_author_article_versions
+        from users.leaderboard import record_reputation_change
+
+        # Updates skip the save receivers
+        record_reputation_change(user_id, points)
+        if points:
+            bump_author_article_versions(user_id)
 
     def update_level(self) -> None:
         """
@@ -226,24 +349,96 @@ class Reputation(models.Model):
         """
         Return the top users by reputation score
         """
-        return cls.objects.order_by("-score")[:limit]
+        from users.leaderboard import get_top
+
+        user_ids = [user_id for _, user_id, _ in get_top(limit)]
+        reputations = cls.objects.in_bulk(user_ids, field_name="user_id")
+        return [reputations[user_id] for user_id in user_ids if user_id in reputations]
 
     @classmethod
     def calculate_community_reputation(cls, community) -> int:
         """
         Calculate the total reputation of a community based on its members
         """
-        return (
-            cls.objects.filter(user__in=community.members.all()).aggregate(
-                Sum("score")
-            )["score__sum"]
-            or 0
-        )
+        from users.leaderboard import get_community_total
+
+        return get_community_total(community.id)
 
     def __str__(self) -> str:
         return f"{self.user.username} - {self.level} ({self.score} points)"
 
 
+@receiver(post_save, sender=User)
+def create_user_reputation(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Reputation.objects.get_or_create(user=instance)
+
+
+# Leaderboards (see users/leaderboard.py)
+@receiver(post_save, sender=Reputation)
+def rank_saved_reputation(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    from users.leaderboard import record_reputation_change, record_user_added
+
+    if created:
+        record_user_added(instance.user_id, instance.score)
+        return
+    loaded = getattr(instance, "_loaded_score", None)
+    if loaded is None:
+        return
+    record_reputation_change(instance.user_id, instance.score - loaded)
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Reputation)
+def unrank_deleted_reputation(sender, instance, **kwargs):
+    from users.leaderboard import record_user_removed
+
+    record_user_removed(instance.user_id)
+
+
+class UserCounters(models.Model):
+    """
+    Per-user contribution counters behind the profile stats, maintained
+    incrementally by the create and delete receivers of the counted models
+    and reconciled nightly (see users/counters.py).
+    """
+
+    user = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="counters"
+    )
+    articles = models.IntegerField(default=0)
+    reviews = models.IntegerField(default=0)
+    review_comments = models.IntegerField(default=0)
+    posts = models.IntegerField(default=0)
+    post_comments = models.IntegerField(default=0)
+    communities_joined = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "user_counters"
+
+    @property
+    def contributed_articles(self) -> int:
+        """Submitted, reviewed or commented articles"""
+        return self.articles + self.reviews + self.review_comments
+
+    @property
+    def contributed_posts(self) -> int:
+        """Posts created or commented"""
+        return self.posts + self.post_comments
+
+    def __str__(self):
+        return f"Counters for user {self.user_id}"
+
+
+@receiver(post_save, sender=User)
+def create_user_counters(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        UserCounters.objects.get_or_create(user=instance)
+
+
 class Bookmark(models.Model):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="bookmarks", db_index=True
@@ -282,6 +477,13 @@ class Bookmark(models.Model):
         return f"{self.user.username} - Bookmark for {self.content_object}"
 
 
+# Bookmark status is part of the payloads validated per user
+# (see myapp/conditional.py)
+@receiver([post_save, post_delete], sender=Bookmark)
+def bump_bookmark_user_version(sender, instance, **kwargs):
+    bump_content_versions(f"user:{instance.user_id}")
+
+
 class UserSetting(models.Model):
     """
     Model to store user-specific configuration settings.
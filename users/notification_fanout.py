@@ -0,0 +1,265 @@
+"""
+Notification fan-out to many recipients.
+
+A notification is described once by a template, the fields shared by every
+row, and sent to the users matched by a recipient query, e.g. every admin
+and moderator of a community. Both are plain dicts, so the fan-out can run
+in a Celery worker:
+
+    notify_recipients(
+        {"category": "communities", "notification_type": "article_submitted",
+         "message": "...", "community_id": community.id},
+        {"community_id": community.id, "roles": ["admins", "moderators"],
+         "exclude_user_ids": [request.auth.id]},
+    )
+
+Recipient ids are streamed from the database in chunks, in id order. Each
+chunk is written with one ``bulk_create``, moves the cached unread counts in
+one Redis pipeline, and, only if the template has an ``email_subject``,
+emails the recipients who enabled email notifications, with their settings
+loaded in bulk.
+
+Chunks commit one by one. A fan-out that fails part way raises
+``FanOutInterrupted`` with the last recipient already notified, and a
+retry resumes after it, so nobody is notified or emailed twice.
+"""
+
+import logging
+from datetime import datetime
+from urllib.parse import urljoin
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.html import escape
+
+from communities.models import Community
+from users.config_constants import UserConfigKey
+from users.models import Notification, User
+from users.notification_inbox import record_unread_changes
+from users.settings_cache import prefetch_user_settings
+
+logger = logging.getLogger(__name__)
+
+FANOUT_CHUNK_SIZE = 1000
+
+TEMPLATE_FIELDS = {
+    "category",
+    "notification_type",
+    "message",
+    "content",
+    "link",
+    "community_id",
+    "article_id",
+    "post_id",
+    "expires_at",
+}
+EMAIL_FIELDS = {"email_subject", "email_heading"}
+RECIPIENT_ROLES = {
+    "admins": Community.admins.through,
+    "moderators": Community.moderators.through,
+    "reviewers": Community.reviewers.through,
+    "members": Community.members.through,
+}
+
+
+class FanOutInterrupted(Exception):
+    """A fan-out failed after notifying the recipients up to ``after_id``."""
+
+    def __init__(self, after_id):
+        super().__init__(f"Notification fan-out interrupted after user {after_id}")
+        self.after_id = after_id
+
+
+def validate_fanout(template: dict, recipients: dict):
+    """
+    Check a template and recipient query before they are queued, so
+    mistakes surface in the request rather than in the worker.
+
+    Raises:
+        ValueError: If either dict has unknown keys or misses required ones
+    """
+    unknown = set(template) - TEMPLATE_FIELDS - EMAIL_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown notification template fields: {sorted(unknown)}")
+    missing = {"category", "notification_type", "message"} - set(template)
+    if missing:
+        raise ValueError(f"Missing notification template fields: {sorted(missing)}")
+
+    unknown = set(recipients) - {
+        "user_ids",
+        "community_id",
+        "roles",
+        "exclude_user_ids",
+    }
+    if unknown:
+        raise ValueError(f"Unknown recipient query fields: {sorted(unknown)}")
+    if "community_id" in recipients:
+        roles = set(recipients.get("roles") or [])
+        if not roles or roles - set(RECIPIENT_ROLES):
+            raise ValueError(f"Roles must be some of {sorted(RECIPIENT_ROLES)}")
+    elif "user_ids" not in recipients:
+        raise ValueError("Recipient query needs user_ids or community_id")
+
+
+def recipient_ids(recipients: dict, after_id=None):
+    """
+    Active users matched by a recipient query, without duplicates.
+
+    Args:
+        recipients: ``user_ids``, or a ``community_id`` with the ``roles``
+            to notify, and optional ``exclude_user_ids``
+        after_id: Only match users with a greater id, to resume a fan-out
+
+    Returns:
+        Queryset of user ids, ordered by id
+    """
+    users = User.objects.filter(is_active=True)
+    if "community_id" in recipients:
+        # One semi-join per role, so users holding several roles appear once
+        roles = Q()
+        for role in recipients["roles"]:
+            roles |= Q(
+                id__in=RECIPIENT_ROLES[role]
+                .objects.filter(community_id=recipients["community_id"])
+                .values("user_id")
+            )
+        users = users.filter(roles)
+    if "user_ids" in recipients:
+        users = users.filter(id__in=list(recipients["user_ids"]))
+    if recipients.get("exclude_user_ids"):
+        users = users.exclude(id__in=list(recipients["exclude_user_ids"]))
+    if after_id is not None:
+        users = users.filter(id__gt=after_id)
+    return users.order_by("id").values_list("id", flat=True)
+
+
+def _chunks(ids, chunk_size: int):
+    chunk = []
+    for user_id in ids.iterator(chunk_size=chunk_size):
+        chunk.append(user_id)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _send_emails(template: dict, user_ids: list) -> int:
+    from myapp.services.send_emails import get_frontend_domain, send_email_task
+
+    settings = prefetch_user_settings(user_ids)
+    enabled = [
+        user_id
+        for user_id, user_settings in settings.items()
+        if user_settings.get(UserConfigKey.ENABLE_EMAIL_NOTIFICATIONS.value)
+    ]
+    if not enabled:
+        return 0
+
+    link = urljoin(get_frontend_domain(), template.get("link") or "/")
+    sent = 0
+    for first_name, username, email in (
+        User.objects.filter(id__in=enabled)
+        .exclude(email="")
+        .values_list("first_name", "username", "email")
+    ):
+        send_email_task.delay(
+            subject=template["email_subject"],
+            html_template_name="review_comment_notification.html",
+            context={
+                "recipient_name": first_name or username,
+                "notification_type": template.get(
+                    "email_heading", template["email_subject"]
+                ),
+                "message_text": escape(template["message"]),
+                "content_preview": template.get("content"),
+                "article_link": link,
+            },
+            recipient_list=[email],
+        )
+        sent += 1
+    return sent
+
+
+def fan_out_notification(
+    template: dict,
+    recipients: dict,
+    chunk_size: int = FANOUT_CHUNK_SIZE,
+    after_id=None,
+) -> dict:
+    """
+    Create one notification per recipient, a chunk at a time.
+
+    Args:
+        template: Notification fields shared by every row, plus optional
+            ``email_subject`` and ``email_heading`` to email the recipients
+            who enabled email notifications
+        recipients: Recipient query, see ``recipient_ids``
+        chunk_size: Number of recipients written per ``bulk_create``
+        after_id: Resume after this recipient, as reported by
+            ``FanOutInterrupted``
+
+    Returns:
+        Dict with the number of notifications created and emails queued
+
+    Raises:
+        FanOutInterrupted: If a chunk fails, the earlier chunks are committed
+    """
+    validate_fanout(template, recipients)
+    fields = {key: value for key, value in template.items() if key in TEMPLATE_FIELDS}
+    if isinstance(fields.get("expires_at"), str):
+        fields["expires_at"] = parse_datetime(fields["expires_at"])
+
+    report = {"notified": 0, "emailed": 0}
+    try:
+        for chunk in _chunks(recipient_ids(recipients, after_id), chunk_size):
+            with transaction.atomic():
+                Notification.objects.bulk_create(
+                    [Notification(user_id=user_id, **fields) for user_id in chunk]
+                )
+                # bulk_create skips the save receivers
+                record_unread_changes({user_id: 1 for user_id in chunk})
+            report["notified"] += len(chunk)
+            after_id = chunk[-1]
+
+            if "email_subject" in template:
+                try:
+                    report["emailed"] += _send_emails(template, chunk)
+                except Exception as e:
+                    logger.error(f"Failed to queue notification emails: {e}")
+    except Exception as e:
+        raise FanOutInterrupted(after_id) from e
+    return report
+
+
+def notify_recipients(template: dict, recipients: dict):
+    """
+    Queue a notification fan-out once the current transaction commits.
+
+    The fan-out runs in a Celery worker. If the task cannot be queued it
+    runs in the calling process instead, where a failure is only logged.
+
+    Raises:
+        ValueError: If the template or recipient query is invalid
+    """
+    from users.tasks import fan_out_notifications
+
+    validate_fanout(template, recipients)
+    template = {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in template.items()
+    }
+
+    def enqueue():
+        try:
+            fan_out_notifications.delay(template, recipients)
+        except Exception as e:
+            logger.warning(f"Failed to queue notification fan-out, running inline: {e}")
+            try:
+                fan_out_notification(template, recipients)
+            except FanOutInterrupted as e:
+                # Raising would fail a request whose transaction has committed
+                logger.error(f"{e}: {e.__cause__}")
+
+    transaction.on_commit(enqueue)
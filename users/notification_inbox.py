@@ -0,0 +1,208 @@
+"""
+Notification inbox pages and cached unread counts.
+
+Inbox pages are keyset paginated on ``(created_at, id)``, newest first, and
+read through the ``notification_inbox`` index, so a page costs the same for
+a user with ten notifications as for one with a million. Cursors are opaque
+strings encoding the position of the last notification of a page.
+
+Each user's unread count is an integer in Redis, moved by the notification
+receivers and the bulk mark-read path once their transaction commits. Only
+an existing counter is moved. A missing counter is seeded from the partial
+``notification_unread`` index on the next read and expires after a day, so
+drift never outlives it. Without Redis the count is read from that index.
+
+Seeding first claims the key with a short-lived token, then counts, then
+stores the count only if the token is still there. A change committed
+meanwhile finds the token and deletes it instead of moving the counter, so
+a count that may have missed the change is never cached.
+"""
+
+import base64
+import logging
+import uuid
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from django_redis import get_redis_connection
+
+from users.models import Notification
+
+logger = logging.getLogger(__name__)
+
+UNREAD_KEY_PREFIX = "notifications:unread"
+UNREAD_COUNT_TTL = 24 * 60 * 60  # 1 day
+SEED_TOKEN_PREFIX = "seed:"
+# Longer than counting the unread notifications of any user
+SEED_TOKEN_TTL = 10
+
+# Moves the counter only if it exists, a missing one is seeded on read. A
+# seed in progress is discarded, its count may miss this change.
+INCR_IF_EXISTS_SCRIPT = """
+local value = redis.call("GET", KEYS[1])
+if not value then
+    return nil
+end
+if string.sub(value, 1, 5) == "seed:" then
+    redis.call("DEL", KEYS[1])
+    return nil
+end
+return redis.call("INCRBY", KEYS[1], ARGV[1])
+"""
+
+# Stores a seeded count if no change discarded the seed. KEYS: counter.
+# ARGV: seed token, count, TTL.
+STORE_SEED_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    redis.call("SET", KEYS[1], ARGV[2], "EX", ARGV[3])
+    return 1
+end
+return 0
+"""
+
+
+def _unread_key(user_id: int) -> str:
+    return f"{UNREAD_KEY_PREFIX}:{user_id}"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(notification: Notification) -> str:
+    position = f"{notification.created_at.isoformat()}|{notification.id}"
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Returns:
+        The (created_at, id) position encoded in the cursor
+
+    Raises:
+        InvalidCursor: If the cursor was not produced by encode_cursor
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, notification_id = (
+            base64.urlsafe_b64decode(padded.encode()).decode().split("|")
+        )
+        created_at = datetime.fromisoformat(created_at)
+        if timezone.is_naive(created_at):
+            raise ValueError("Cursor timestamp has no timezone")
+        return created_at, int(notification_id)
+    except ValueError as e:
+        raise InvalidCursor(str(e))
+    except Exception as e:
+        raise InvalidCursor(f"Malformed cursor: {e}")
+
+
+def get_inbox_page(queryset, cursor: str = None, limit: int = 20) -> tuple:
+    """
+    Read one page of notifications, newest first.
+
+    Args:
+        queryset: The user's notifications, already filtered
+        cursor: Cursor of the previous page, None for the first page
+        limit: Page size
+
+    Returns:
+        (notifications, next_cursor) tuple, next_cursor is None on the last
+        page
+
+    Raises:
+        InvalidCursor: If the cursor is malformed
+    """
+    if cursor:
+        created_at, notification_id = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(created_at__lt=created_at)
+            | Q(created_at=created_at, id__lt=notification_id)
+        )
+
+    notifications = list(queryset.order_by("-created_at", "-id")[: limit + 1])
+    if len(notifications) <= limit:
+        return notifications, None
+    notifications = notifications[:limit]
+    return notifications, encode_cursor(notifications[-1])
+
+
+def record_unread_change(user_id: int, delta: int):
+    """Move the user's cached unread count once the transaction commits."""
+    record_unread_changes({user_id: delta})
+
+
+def record_unread_changes(deltas: dict):
+    """
+    Move the cached unread counts of several users in one pipeline once the
+    transaction commits.
+
+    Args:
+        deltas: Dict mapping user ids to unread count deltas
+    """
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    def push():
+        try:
+            pipeline = get_redis_connection("default").pipeline(transaction=False)
+            for user_id, delta in deltas.items():
+                pipeline.eval(INCR_IF_EXISTS_SCRIPT, 1, _unread_key(user_id), delta)
+            pipeline.execute()
+        except Exception as e:
+            logger.warning(
+                f"Failed to update unread counts of {len(deltas)} users: {e}"
+            )
+
+    transaction.on_commit(push)
+
+
+def get_unread_count(user_id: int) -> int:
+    """Number of unread notifications of a user."""
+    key = _unread_key(user_id)
+    redis, token = None, None
+    try:
+        redis = get_redis_connection("default")
+        cached = redis.get(key)
+        if cached is None:
+            token = f"{SEED_TOKEN_PREFIX}{uuid.uuid4().hex}"
+            # Another request may be seeding already, it caches the count
+            if not redis.set(key, token, ex=SEED_TOKEN_TTL, nx=True):
+                token = None
+        elif not cached.startswith(SEED_TOKEN_PREFIX.encode()):
+            return max(int(cached), 0)
+    except Exception as e:
+        logger.warning(f"Failed to read unread count of user {user_id}: {e}")
+
+    count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+    if token is not None:
+        try:
+            redis.eval(STORE_SEED_SCRIPT, 1, key, token, count, UNREAD_COUNT_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to cache unread count of user {user_id}: {e}")
+    return count
+
+
+def mark_notifications_read(user_id: int, notification_ids=None) -> int:
+    """
+    Mark several notifications of a user as read with a single UPDATE.
+
+    Args:
+        user_id: The user's ID
+        notification_ids: IDs to mark, all unread notifications if None
+
+    Returns:
+        Number of notifications that were unread
+    """
+    unread = Notification.objects.filter(user_id=user_id, is_read=False)
+    if notification_ids is not None:
+        unread = unread.filter(id__in=list(notification_ids))
+
+    with transaction.atomic():
+        updated = unread.update(is_read=True)
+        # Updates skip the save receivers
+        record_unread_change(user_id, -updated)
+    return updated
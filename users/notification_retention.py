@@ -0,0 +1,105 @@
+"""
+Retention sweeper for the Notification table.
+
+Two kinds of rows are removed:
+- notifications whose ``expires_at`` has passed
+- read notifications older than ``READ_RETENTION_DAYS``
+
+Rows are deleted in batches of ids selected through the partial
+``notification_expiry`` and ``notification_read_age`` indexes, one short
+transaction per batch, so the sweep never holds locks on a large part of
+the table. Deleting unread notifications keeps the cached unread counts in
+step through the usual delete receiver.
+
+Runs hourly through Celery beat and on demand with
+``python manage.py sweep_notifications``.
+"""
+
+import logging
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import Notification
+
+logger = logging.getLogger(__name__)
+
+READ_RETENTION_DAYS = 90
+SWEEP_BATCH_SIZE = 1000
+# Stop after this long, the next run picks up where this one stopped
+SWEEP_TIME_BUDGET_SECONDS = 300
+
+
+def expired_notifications(now=None):
+    now = now or timezone.now()
+    return Notification.objects.filter(expires_at__isnull=False, expires_at__lt=now)
+
+
+def old_read_notifications(now=None, read_retention_days=READ_RETENTION_DAYS):
+    now = now or timezone.now()
+    return Notification.objects.filter(
+        is_read=True, created_at__lt=now - timedelta(days=read_retention_days)
+    )
+
+
+def _delete_in_batches(queryset, batch_size, deadline, pause) -> tuple:
+    deleted = 0
+    while time.monotonic() < deadline:
+        ids = list(queryset.order_by().values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return deleted, True
+        with transaction.atomic():
+            deleted += (
+                Notification.objects.filter(id__in=ids)
+                .delete()[1]
+                .get(Notification._meta.label, 0)
+            )
+        if len(ids) < batch_size:
+            return deleted, True
+        if pause:
+            time.sleep(pause)
+    return deleted, False
+
+
+def sweep_notifications(
+    read_retention_days: int = READ_RETENTION_DAYS,
+    batch_size: int = SWEEP_BATCH_SIZE,
+    time_budget: float = SWEEP_TIME_BUDGET_SECONDS,
+    pause: float = 0,
+    dry_run: bool = False,
+) -> dict:
+    """
+    Delete expired and old read notifications.
+
+    Args:
+        read_retention_days: Age after which read notifications are deleted
+        batch_size: Number of rows deleted per transaction
+        time_budget: Seconds after which the sweep stops between batches
+        pause: Seconds to sleep between batches, e.g. to spare replicas
+        dry_run: Only count the rows that would be deleted
+
+    Returns:
+        Dict with the rows removed per kind, whether the sweep finished
+        within its time budget and the seconds it took
+    """
+    started = time.monotonic()
+    now = timezone.now()
+    sweeps = {
+        "expired": expired_notifications(now),
+        "read": old_read_notifications(now, read_retention_days),
+    }
+
+    report = {"completed": True}
+    for kind, queryset in sweeps.items():
+        if dry_run:
+            report[kind] = queryset.count()
+            continue
+        report[kind], completed = _delete_in_batches(
+            queryset, batch_size, started + time_budget, pause
+        )
+        report["completed"] = report["completed"] and completed
+
+    report["seconds"] = round(time.monotonic() - started, 3)
+    return report
@@ -7,10 +7,12 @@ from datetime import date, datetime
 from enum import Enum
 from typing import List, Optional
 
-from django.contrib.contenttypes.models import ContentType
-from ninja import ModelSchema, Schema
+from ninja import Field, ModelSchema, Schema
 
 from articles.models import Article, Review, ReviewComment
+from myapp.content_types import content_type_id
+from myapp.feature_flags import MAX_STATUS_BATCH_SIZE
+from myapp.schemas import UserStats
 from users.config_constants import UserConfigKey, UserConfigType
 from users.models import HashtagRelation, Reputation, User
 
@@ -122,8 +124,7 @@ class UserDetails(ModelSchema):
 
     @staticmethod
     def resolve_user(user: User):
-        # Todo: Create Reputation once a user is created
-        reputation, created = Reputation.objects.get_or_create(user=user)
+        reputation = Reputation.objects.filter(user=user).first() or Reputation()
 
         return {
             "id": user.id,
@@ -142,7 +143,7 @@ class UserDetails(ModelSchema):
             "research_interests": [
                 relation.hashtag.name
                 for relation in HashtagRelation.objects.filter(
-                    content_type=ContentType.objects.get_for_model(User),
+                    content_type_id=content_type_id(User),
                     object_id=user.id,
                 )
             ],
@@ -241,6 +242,44 @@ class NotificationSchema(Schema):
     createdAt: datetime
     expiresAt: datetime | None
 
+    @staticmethod
+    def from_model(notification):
+        return NotificationSchema(
+            id=notification.id,
+            message=notification.message,
+            content=notification.content,
+            isRead=notification.is_read,
+            link=notification.link,
+            category=notification.category,
+            notificationType=notification.notification_type,
+            createdAt=notification.created_at,
+            expiresAt=notification.expires_at,
+        )
+
+
+class NotificationPageOut(Schema):
+    items: List[NotificationSchema]
+    # Pass as `cursor` to get the next page, None on the last page
+    next_cursor: Optional[str] = None
+    unread_count: int
+
+
+class UnreadNotificationCountOut(Schema):
+    unread_count: int
+
+
+class NotificationMarkReadIn(Schema):
+    # Mark all unread notifications when omitted
+    notification_ids: Optional[List[int]] = Field(
+        None, max_length=MAX_STATUS_BATCH_SIZE
+    )
+
+
+class NotificationMarkReadOut(Schema):
+    message: str
+    updated_count: int
+    unread_count: int
+
 
 """
 Reaction Schemas
@@ -290,6 +329,20 @@ class ReactionCountOut(Schema):
     user_reaction: VoteEnum | None
 
 
+class ReactionTarget(Schema):
+    content_type: ContentTypeEnum
+    object_id: int
+
+
+class ReactionCountBatchIn(Schema):
+    items: List[ReactionTarget] = Field(..., max_length=MAX_STATUS_BATCH_SIZE)
+
+
+class ReactionCountBatchItem(ReactionCountOut):
+    content_type: ContentTypeEnum
+    object_id: int
+
+
 """
 Hashtag Schemas
 """
@@ -342,6 +395,20 @@ class BookmarkStatusResponseSchema(Schema):
     is_bookmarked: Optional[bool]
 
 
+class BookmarkTarget(Schema):
+    content_type: BookmarkContentTypeEnum
+    object_id: int
+
+
+class BookmarkStatusBatchIn(Schema):
+    items: List[BookmarkTarget] = Field(..., max_length=MAX_STATUS_BATCH_SIZE)
+
+
+class BookmarkStatusBatchItem(BookmarkStatusResponseSchema):
+    content_type: BookmarkContentTypeEnum
+    object_id: int
+
+
 class BookmarkFilterTypeEnum(str, Enum):
     """Enum for filtering bookmarks by type."""
 
@@ -402,3 +469,26 @@ class UserSettingsResetResponseSchema(Schema):
 
     message: str
     reset_count: int
+
+
+"""
+Leaderboard Schemas
+"""
+
+
+class LeaderboardEntryOut(Schema):
+    rank: int
+    score: int
+    user: UserStats
+
+
+class LeaderboardOut(Schema):
+    entries: List[LeaderboardEntryOut]
+    # Summed score of the community's members, community boards only
+    community_score: Optional[int] = None
+
+
+class MyLeaderboardOut(Schema):
+    rank: Optional[int]
+    score: int
+    entries: List[LeaderboardEntryOut]
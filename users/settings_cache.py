@@ -5,15 +5,27 @@ This module provides caching for user settings with:
 - Immediate cache invalidation on settings change
 - Fallback to database on cache miss
 - Helper functions for checking specific settings
+- Bulk lookups with one MGET / MSET round trip for many users
 - Graceful degradation if Redis is unavailable
+
+Settings are cached in two tiers: a small in-process LRU in front of the
+shared Redis cache. Invalidations are published on a Redis channel that
+every process listens to, evicting its local copy. The local tier is only
+used while the process is subscribed, so a lost connection can never leave
+stale settings behind.
 """
 
 import logging
+import os
+import threading
+import time
 from typing import Any, Dict, Optional
 
 from django.core.cache import caches
 from django.core.cache.backends.base import InvalidCacheBackendError
+from django_redis import get_redis_connection
 
+from myapp.cache import LocalLRUCache
 from users.config_constants import (
     UserConfigKey,
     get_all_config_metadata,
@@ -28,6 +40,16 @@ USER_SETTINGS_CACHE_PREFIX = "user_settings"
 # Cache TTL: 1 hour - settings don't change frequently but we want
 # reasonable freshness. Invalidation handles immediate updates.
 USER_SETTINGS_CACHE_TTL = 3600  # 1 hour
+# In-process tier, the TTL bounds staleness should an invalidation be missed
+LOCAL_CACHE_TTL = 60
+LOCAL_CACHE_SIZE = 4096
+INVALIDATION_CHANNEL = f"{USER_SETTINGS_CACHE_PREFIX}:invalidated"
+LISTENER_RETRY_SECONDS = 30
+
+_local_settings = LocalLRUCache(LOCAL_CACHE_SIZE, LOCAL_CACHE_TTL)
+_listening = threading.Event()
+_listener_lock = threading.Lock()
+_listener_pid = None
 
 
 def _get_cache_key(user_id: int) -> str:
@@ -52,6 +74,53 @@ def _get_cache():
         return None
 
 
+def _listen_for_invalidations(local: LocalLRUCache):
+    """Evict local copies of invalidated settings, resubscribing on errors."""
+    while True:
+        try:
+            pubsub = get_redis_connection(CACHE_NAME).pubsub(
+                ignore_subscribe_messages=True
+            )
+            pubsub.subscribe(INVALIDATION_CHANNEL)
+            _listening.set()
+            for message in pubsub.listen():
+                local.delete(int(message["data"]))
+        except Exception as e:
+            logger.warning(f"User settings invalidation listener stopped: {e}")
+        finally:
+            # Invalidations may be missed from here on
+            _listening.clear()
+            local.clear()
+        time.sleep(LISTENER_RETRY_SECONDS)
+
+
+def _get_local_cache() -> Optional[LocalLRUCache]:
+    """
+    Get the in-process tier, starting this process's invalidation listener
+    on first use.
+
+    Returns:
+        The local cache, or None while invalidations cannot be received
+    """
+    global _listener_pid
+
+    if _listener_pid != os.getpid():
+        with _listener_lock:
+            if _listener_pid != os.getpid():
+                # Forked workers inherit the cache but not the listener
+                _listening.clear()
+                _local_settings.clear()
+                threading.Thread(
+                    target=_listen_for_invalidations,
+                    args=(_local_settings,),
+                    name="user-settings-invalidations",
+                    daemon=True,
+                ).start()
+                _listener_pid = os.getpid()
+
+    return _local_settings if _listening.is_set() else None
+
+
 def get_user_settings_from_cache(user_id: int) -> Optional[Dict[str, Any]]:
     """
     Get user settings from cache.
@@ -62,17 +131,69 @@ def get_user_settings_from_cache(user_id: int) -> Optional[Dict[str, Any]]:
     Returns:
         Dictionary of settings or None if not in cache
     """
+    local = _get_local_cache()
+    if local is not None:
+        settings = local.get(user_id)
+        if settings is not None:
+            return dict(settings)
+
     cache = _get_cache()
     if cache is None:
         return None
 
     try:
         cache_key = _get_cache_key(user_id)
-        return cache.get(cache_key)
+        settings = cache.get(cache_key)
     except Exception as e:
         logger.error(f"Error getting user settings from cache: {e}")
         return None
 
+    if settings is not None and local is not None:
+        local.set(user_id, settings)
+    return settings
+
+
+def get_many_user_settings_from_cache(
+    user_ids: list[int],
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Get the cached settings of several users, local hits first, then one
+    MGET for the rest.
+
+    Args:
+        user_ids: List of user IDs
+
+    Returns:
+        Dictionary mapping user_id to settings, for cached users only
+    """
+    result = {}
+    local = _get_local_cache()
+    missing = []
+    for user_id in user_ids:
+        settings = None if local is None else local.get(user_id)
+        if settings is not None:
+            result[user_id] = dict(settings)
+        else:
+            missing.append(user_id)
+
+    cache = _get_cache()
+    if not missing or cache is None:
+        return result
+
+    try:
+        cached = cache.get_many([_get_cache_key(user_id) for user_id in missing])
+    except Exception as e:
+        logger.error(f"Error getting user settings from cache: {e}")
+        return result
+
+    for user_id in missing:
+        settings = cached.get(_get_cache_key(user_id))
+        if settings is not None:
+            result[user_id] = settings
+            if local is not None:
+                local.set(user_id, settings)
+    return result
+
 
 def set_user_settings_in_cache(user_id: int, settings: Dict[str, Any]) -> bool:
     """
@@ -93,16 +214,50 @@ def set_user_settings_in_cache(user_id: int, settings: Dict[str, Any]) -> bool:
         cache_key = _get_cache_key(user_id)
         cache.set(cache_key, settings, timeout=USER_SETTINGS_CACHE_TTL)
         logger.debug(f"Cached settings for user {user_id}")
-        return True
     except Exception as e:
         logger.error(f"Error setting user settings in cache: {e}")
         return False
 
+    local = _get_local_cache()
+    if local is not None:
+        local.set(user_id, settings)
+    return True
+
+
+def set_many_user_settings_in_cache(settings_by_user: Dict[int, Dict[str, Any]]):
+    """
+    Cache the settings of several users with one MSET round trip.
+
+    Args:
+        settings_by_user: Dictionary mapping user_id to settings
+    """
+    cache = _get_cache()
+    if cache is None or not settings_by_user:
+        return
+
+    try:
+        cache.set_many(
+            {
+                _get_cache_key(user_id): settings
+                for user_id, settings in settings_by_user.items()
+            },
+            timeout=USER_SETTINGS_CACHE_TTL,
+        )
+    except Exception as e:
+        logger.error(f"Error setting user settings in cache: {e}")
+        return
+
+    local = _get_local_cache()
+    if local is not None:
+        for user_id, settings in settings_by_user.items():
+            local.set(user_id, settings)
+
 
 def invalidate_user_settings_cache(user_id: int) -> bool:
     """
     Invalidate (delete) user settings from cache.
-    Should be called whenever settings are updated or reset.
+    Should be called whenever settings are updated or reset. Other processes
+    drop their local copies through the invalidation channel.
 
     Args:
         user_id: The user's ID
@@ -110,6 +265,8 @@ def invalidate_user_settings_cache(user_id: int) -> bool:
     Returns:
         True if successful, False otherwise
     """
+    _local_settings.delete(user_id)
+
     cache = _get_cache()
     if cache is None:
         return False
@@ -118,11 +275,17 @@ def invalidate_user_settings_cache(user_id: int) -> bool:
         cache_key = _get_cache_key(user_id)
         cache.delete(cache_key)
         logger.debug(f"Invalidated settings cache for user {user_id}")
-        return True
     except Exception as e:
         logger.error(f"Error invalidating user settings cache: {e}")
         return False
 
+    try:
+        get_redis_connection(CACHE_NAME).publish(INVALIDATION_CHANNEL, user_id)
+    except Exception as e:
+        # Other processes keep their copies for at most LOCAL_CACHE_TTL
+        logger.warning(f"Error publishing settings invalidation: {e}")
+    return True
+
 
 def get_user_settings(user_id: int) -> Dict[str, Any]:
     """
@@ -237,7 +400,12 @@ def get_users_with_email_notifications_enabled(user_ids: list[int]) -> list[int]
     Returns:
         List of user IDs that have email notifications enabled
     """
-    return [user_id for user_id in user_ids if is_email_notifications_enabled(user_id)]
+    settings = prefetch_user_settings(user_ids)
+    return [
+        user_id
+        for user_id in user_ids
+        if settings[user_id].get(UserConfigKey.ENABLE_EMAIL_NOTIFICATIONS)
+    ]
 
 
 def prefetch_user_settings(user_ids: list[int]) -> Dict[int, Dict[str, Any]]:
@@ -254,16 +422,9 @@ def prefetch_user_settings(user_ids: list[int]) -> Dict[int, Dict[str, Any]]:
     # Import here to avoid circular imports
     from users.models import UserSetting
 
-    result = {}
-    users_to_fetch = []
-
-    # Check cache first for each user
-    for user_id in user_ids:
-        cached = get_user_settings_from_cache(user_id)
-        if cached is not None:
-            result[user_id] = cached
-        else:
-            users_to_fetch.append(user_id)
+    # Check cache first, in one round trip for all users
+    result = get_many_user_settings_from_cache(user_ids)
+    users_to_fetch = [user_id for user_id in user_ids if user_id not in result]
 
     if not users_to_fetch:
         return result
@@ -282,14 +443,16 @@ def prefetch_user_settings(user_ids: list[int]) -> Dict[int, Dict[str, Any]]:
             settings_by_user[setting.user_id][setting.config_name] = setting.value
 
         # Merge with defaults and cache
+        fetched = {}
         for user_id in users_to_fetch:
             user_settings = {}
             for config_name, metadata in config_metadata.items():
                 user_settings[config_name] = settings_by_user[user_id].get(
                     config_name, metadata["default_value"]
                 )
-            result[user_id] = user_settings
-            set_user_settings_in_cache(user_id, user_settings)
+            fetched[user_id] = user_settings
+        result.update(fetched)
+        set_many_user_settings_in_cache(fetched)
 
     except Exception as e:
         logger.error(f"Error prefetching user settings: {e}")
@@ -0,0 +1,82 @@
+import logging
+
+from celery import shared_task
+
+from users.counters import rebuild_user_counters
+from users.leaderboard import rebuild_leaderboards
+from users.notification_fanout import FanOutInterrupted, fan_out_notification
+from users.notification_retention import sweep_notifications
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=3)
+def refresh_leaderboards(self):
+    """
+    Rebuild the reputation leaderboards from Postgres, repairing increments
+    lost while Redis was unavailable.
+    """
+    try:
+        ranked = rebuild_leaderboards()
+        logger.info(f"Rebuilt leaderboards: {ranked}")
+        return ranked
+    except Exception as e:
+        logger.error(f"Error rebuilding leaderboards: {e}")
+        raise self.retry(exc=e, countdown=60)
+
+
+@shared_task(bind=True, max_retries=3)
+def reconcile_user_counters(self):
+    """
+    Recompute the profile contribution counters and repair any drift.
+    """
+    try:
+        repaired = rebuild_user_counters()
+        if repaired:
+            logger.warning(f"Repaired drifted counters of {len(repaired)} users")
+        return len(repaired)
+    except Exception as e:
+        logger.error(f"Error reconciling user counters: {e}")
+        raise self.retry(exc=e, countdown=60)
+
+
+@shared_task(bind=True, max_retries=3)
+def sweep_expired_notifications(self):
+    """
+    Delete expired and old read notifications within the sweep time budget.
+    """
+    try:
+        report = sweep_notifications()
+        logger.info(
+            f"Swept notifications: {report['expired']} expired, "
+            f"{report['read']} old read removed in {report['seconds']}s"
+            + ("" if report["completed"] else ", more left for the next run")
+        )
+        return report
+    except Exception as e:
+        logger.error(f"Error sweeping notifications: {e}")
+        raise self.retry(exc=e, countdown=60)
+
+
+@shared_task(bind=True, max_retries=3)
+def fan_out_notifications(self, template, recipients, after_id=None):
+    """
+    Create a notification for every recipient of a fan-out, resuming after
+    ``after_id`` on retries.
+    """
+    try:
+        report = fan_out_notification(template, recipients, after_id=after_id)
+        logger.info(
+            f"Fanned out {template['notification_type']} notification: "
+            f"{report['notified']} notified, {report['emailed']} emailed"
+        )
+        return report
+    except FanOutInterrupted as e:
+        logger.error(f"Error fanning out notification: {e}: {e.__cause__}")
+        # The chunks before the failure are committed, skip their recipients
+        raise self.retry(
+            exc=e,
+            countdown=60,
+            args=(template, recipients),
+            kwargs={"after_id": e.after_id},
+        )
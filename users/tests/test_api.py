@@ -0,0 +1,115 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from ninja.testing import TestClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from communities.models import Community
+from users.api import router
+from users.models import Notification, User
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class NotificationAPITest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        self.community = Community.objects.create(
+            name="Test Community", description="Description", type="public"
+        )
+        self.notifications = [
+            Notification.objects.create(
+                user=self.user,
+                community=self.community if index % 2 else None,
+                category="communities",
+                notification_type="join_request_received",
+                message=f"Notification {index}",
+            )
+            for index in range(25)
+        ]
+        self.client = TestClient(router)
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+
+    def get_inbox(self, query=""):
+        response = self.client.get(f"/notifications?{query}", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cursor_pagination(self):
+        # Warm the auth cache so every captured page skips the user lookup
+        self.get_inbox("limit=1")
+        seen = []
+        cursor = None
+        query_counts = []
+        while True:
+            query = "limit=10" + (f"&cursor={cursor}" if cursor else "")
+            with CaptureQueriesContext(connection) as queries:
+                page = self.get_inbox(query)
+            query_counts.append(len(queries))
+            seen += [item["id"] for item in page["items"]]
+            self.assertEqual(page["unread_count"], 25)
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+        self.assertEqual(
+            seen, [notification.id for notification in reversed(self.notifications)]
+        )
+        self.assertEqual(len(query_counts), 3)
+        self.assertEqual(len(set(query_counts)), 1)
+
+        response = self.client.get("/notifications?cursor=bogus", headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+    def test_filters_narrow_the_inbox(self):
+        page = self.get_inbox(f"community_id={self.community.id}&limit=100")
+        self.assertEqual(len(page["items"]), 12)
+
+        page = self.get_inbox(f"community_id={self.community.id}&post_id=1")
+        self.assertEqual(page["items"], [])
+
+    def test_mark_as_read(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/notifications/{self.notifications[0].id}/mark-as-read",
+                headers=self.headers,
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get_inbox("limit=1")["unread_count"], 24)
+
+        # Repeats do not move the unread count again
+        response = self.client.post(
+            f"/notifications/{self.notifications[0].id}/mark-as-read",
+            headers=self.headers,
+        )
+        self.assertEqual(
+            response.json(), {"message": "Notification was already marked as read."}
+        )
+        response = self.client.post(
+            "/notifications/0/mark-as-read", headers=self.headers
+        )
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.post(
+            "/notifications/mark-as-read",
+            json={"notification_ids": [n.id for n in self.notifications[:5]]},
+            headers=self.headers,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated_count"], 4)
+        self.assertEqual(response.json()["unread_count"], 20)
+
+        response = self.client.post(
+            "/notifications/mark-as-read", json={}, headers=self.headers
+        )
+        self.assertEqual(response.json()["updated_count"], 20)
+
+        response = self.client.get("/notifications/unread-count", headers=self.headers)
+        self.assertEqual(response.json(), {"unread_count": 0})
@@ -0,0 +1,61 @@
+from django.test import TestCase, override_settings
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.auth import jwt_authentication
+from users.auth_cache import clear_local_auth_users
+from users.models import User
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CachedAuthUserTest(TestCase):
+    def setUp(self):
+        clear_local_auth_users()
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        self.token = jwt_authentication.get_validated_token(
+            str(AccessToken.for_user(self.user))
+        )
+
+    def tearDown(self):
+        clear_local_auth_users()
+
+    def authenticate(self):
+        return jwt_authentication.get_user(self.token)
+
+    def test_user_is_loaded_once(self):
+        with self.assertNumQueries(1):
+            first = self.authenticate()
+        with self.assertNumQueries(0):
+            second = self.authenticate()
+
+        self.assertEqual(second, self.user)
+        # Each request gets its own instance
+        self.assertIsNot(first, second)
+
+        clear_local_auth_users()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.authenticate().username, "testuser")
+
+    def test_saving_the_user_invalidates_it(self):
+        self.authenticate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.bio = "Updated bio"
+            self.user.set_password("new-password")
+            self.user.save()
+        with self.assertNumQueries(1):
+            user = self.authenticate()
+        self.assertEqual(user.bio, "Updated bio")
+        self.assertTrue(user.check_password("new-password"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
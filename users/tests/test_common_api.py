@@ -0,0 +1,213 @@
+from unittest.mock import patch
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from ninja.testing import TestClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from articles.models import Article, Reaction
+from articles.reaction_counts import rebuild_reaction_counts
+from communities.models import Community
+from myapp.content_types import content_type_id
+from users.common_api import get_content_type, get_content_type_for_model
+from users.common_api import router as common_router
+from users.leaderboard import GLOBAL_KEY, _member, get_rank, get_top
+from users.models import Bookmark, Reputation, User
+
+
+class StatusBatchAPITest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        self.other = User.objects.create_user(
+            username="other", email="other@example.com", password="password123"
+        )
+        self.articles = [
+            Article.objects.create(
+                title=f"Test Article {index}",
+                abstract="This is a test abstract.",
+                authors=[{"value": "Author One", "label": "Author One"}],
+                submission_type="Public",
+                submitter=self.user,
+                faqs=[],
+            )
+            for index in range(3)
+        ]
+        self.community = Community.objects.create(
+            name="Test Community", description="Description", type="public"
+        )
+        article_ct = get_content_type_for_model(Article)
+        for user, vote in ((self.user, Reaction.LIKE), (self.other, Reaction.DISLIKE)):
+            Reaction.objects.create(
+                user=user,
+                content_type=article_ct,
+                object_id=self.articles[0].id,
+                vote=vote,
+            )
+        Reaction.objects.create(
+            user=self.other,
+            content_type=get_content_type_for_model(Community),
+            object_id=self.community.id,
+            vote=Reaction.LIKE,
+        )
+        rebuild_reaction_counts()
+        Bookmark.objects.create(
+            user=self.user, content_type=article_ct, object_id=self.articles[1].id
+        )
+
+        self.client = TestClient(common_router)
+        self.headers = {"Authorization": f"Bearer {AccessToken.for_user(self.user)}"}
+        self.items = [
+            {"content_type": "articles.article", "object_id": article.id}
+            for article in self.articles
+        ] + [{"content_type": "communities.community", "object_id": self.community.id}]
+
+    def test_reaction_counts_batch(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                "/reaction_count", json={"items": self.items}, headers=self.headers
+            )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        self.assertEqual(
+            [(item["likes"], item["dislikes"], item["user_reaction"]) for item in data],
+            [(1, 1, Reaction.LIKE), (0, 0, None), (0, 0, None), (1, 0, None)],
+        )
+        self.assertEqual(data[3]["object_id"], self.community.id)
+        # Counters and votes per content type, plus the viewer
+        self.assertLessEqual(len(queries), 5)
+
+        anonymous = self.client.post("/reaction_count", json={"items": self.items})
+        self.assertEqual(anonymous.status_code, 200)
+        self.assertIsNone(anonymous.json()[0]["user_reaction"])
+
+    def test_bookmark_status_batch(self):
+        response = self.client.post(
+            "/bookmarks/status", json={"items": self.items}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [item["is_bookmarked"] for item in response.json()],
+            [False, True, False, False],
+        )
+
+        anonymous = self.client.post("/bookmarks/status", json={"items": self.items})
+        self.assertEqual(
+            [item["is_bookmarked"] for item in anonymous.json()], [None] * 4
+        )
+
+    def test_batch_size_is_limited(self):
+        items = [{"content_type": "articles.article", "object_id": 1}] * 101
+        response = self.client.post(
+            "/reaction_count", json={"items": items}, headers=self.headers
+        )
+        self.assertEqual(response.status_code, 422)
+
+
+class ContentTypeIdsTest(TestCase):
+    def test_ids_are_resolved_from_the_process_cache(self):
+        expected = ContentType.objects.get_for_model(Article).id
+        content_type_id(Article)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(content_type_id(Article), expected)
+            self.assertEqual(content_type_id("Articles.Article"), expected)
+            self.assertEqual(get_content_type("articles.article").id, expected)
+
+        with self.assertRaises(ContentType.DoesNotExist):
+            content_type_id("articles.nothing")
+        with self.assertRaises(ValueError):
+            get_content_type("article")
+
+
+class LeaderboardAPITest(TestCase):
+    # Redis is not available in tests, so these exercise the Postgres fallback
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f"user{index}",
+                email=f"user{index}@example.com",
+                password="password123",
+            )
+            for index in range(5)
+        ]
+        for index, user in enumerate(self.users):
+            Reputation.objects.filter(user=user).update(score=index * 10)
+        self.community = Community.objects.create(
+            name="Private Community", description="Description", type="private"
+        )
+        self.community.members.add(self.users[1], self.users[3])
+
+        self.client = TestClient(common_router)
+        self.headers = {
+            "Authorization": f"Bearer {AccessToken.for_user(self.users[3])}"
+        }
+
+    def test_global_top(self):
+        response = self.client.get("/leaderboard?limit=3")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [
+                (entry["rank"], entry["user"]["username"], entry["score"])
+                for entry in response.json()["entries"]
+            ],
+            [(1, "user4", 40), (2, "user3", 30), (3, "user2", 20)],
+        )
+        self.assertIsNone(response.json()["community_score"])
+
+    def test_community_board_requires_membership(self):
+        path = f"/leaderboard?community_id={self.community.id}"
+        self.assertEqual(self.client.get(path).status_code, 403)
+
+        response = self.client.get(path, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [entry["user"]["username"] for entry in response.json()["entries"]],
+            ["user3", "user1"],
+        )
+        self.assertEqual(response.json()["community_score"], 40)
+        self.assertEqual(Reputation.calculate_community_reputation(self.community), 40)
+
+    def test_my_rank_and_neighbours(self):
+        response = self.client.get("/leaderboard/me?radius=1", headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["rank"], data["score"]), (2, 30))
+        self.assertEqual(
+            [(entry["rank"], entry["user"]["username"]) for entry in data["entries"]],
+            [(1, "user4"), (2, "user3"), (3, "user2")],
+        )
+
+        response = self.client.get(
+            f"/leaderboard/me?community_id={self.community.id}", headers=self.headers
+        )
+        self.assertEqual(response.json()["rank"], 1)
+
+    def test_ties_rank_by_descending_user_id_like_redis(self):
+        Reputation.objects.filter(user__in=self.users[3:]).update(score=30)
+        ranked = [entry[1] for entry in get_top(limit=2)]
+        self.assertEqual(ranked, [self.users[4].id, self.users[3].id])
+        self.assertEqual(get_rank(self.users[3].id), (2, 30))
+
+        # Redis orders equal scores by member, in reverse lexicographic order
+        members = sorted((_member(user_id) for user_id in ranked), reverse=True)
+        self.assertEqual([int(member) for member in members], ranked)
+        self.assertGreater(_member(10), _member(9))
+
+    def test_new_users_join_the_global_board(self):
+        with patch("users.leaderboard._redis") as redis:
+            with self.captureOnCommitCallbacks(execute=True):
+                user = User.objects.create_user(
+                    username="newcomer",
+                    email="newcomer@example.com",
+                    password="password123",
+                )
+        pipeline = redis.return_value.pipeline.return_value
+        pipeline.zadd.assert_called_once_with(
+            GLOBAL_KEY, {_member(user.id): 0}, nx=True
+        )
+        pipeline.zincrby.assert_not_called()
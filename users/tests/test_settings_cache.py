@@ -0,0 +1,71 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from myapp.cache import LocalLRUCache
+from users.config_constants import UserConfigKey
+from users.models import User, UserSetting
+from users.settings_cache import (
+    get_user_settings,
+    get_users_with_email_notifications_enabled,
+    invalidate_user_settings_cache,
+    prefetch_user_settings,
+)
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class UserSettingsCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(
+                username=f"user{index}",
+                email=f"user{index}@example.com",
+                password="password123",
+            )
+            for index in range(5)
+        ]
+        self.user_ids = [user.id for user in self.users]
+        UserSetting.objects.create(
+            user=self.users[3],
+            config_name=UserConfigKey.ENABLE_EMAIL_NOTIFICATIONS.value,
+            value=True,
+        )
+
+    def test_bulk_lookups_read_and_write_in_one_round_trip(self):
+        with patch.object(
+            cache, "get_many", wraps=cache.get_many
+        ) as get_many, patch.object(
+            cache, "set_many", wraps=cache.set_many
+        ) as set_many:
+            with self.assertNumQueries(1):
+                settings = prefetch_user_settings(self.user_ids)
+            with self.assertNumQueries(0):
+                enabled = get_users_with_email_notifications_enabled(self.user_ids)
+
+        self.assertEqual(set(settings), set(self.user_ids))
+        self.assertEqual(enabled, [self.users[3].id])
+        self.assertEqual(get_many.call_count, 2)
+        set_many.assert_called_once()
+
+    def test_local_tier_is_invalidated(self):
+        local = LocalLRUCache(size=10, ttl=60)
+        with patch("users.settings_cache._local_settings", local), patch(
+            "users.settings_cache._get_local_cache", return_value=local
+        ):
+            get_user_settings(self.users[3].id)
+            cache.clear()
+            with self.assertNumQueries(0):
+                settings = get_user_settings(self.users[3].id)
+            self.assertTrue(settings[UserConfigKey.ENABLE_EMAIL_NOTIFICATIONS])
+
+            UserSetting.objects.filter(user=self.users[3]).delete()
+            invalidate_user_settings_cache(self.users[3].id)
+            with self.assertNumQueries(1):
+                settings = get_user_settings(self.users[3].id)
+            self.assertFalse(settings[UserConfigKey.ENABLE_EMAIL_NOTIFICATIONS])
@@ -1,13 +1,32 @@
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
 from django.db import IntegrityError
 from django.test import TestCase
 from django.utils.timezone import now, timedelta
 
-from articles.models import Article
+from articles.models import Article, Review, ReviewComment
 from communities.models import Community
+from myapp.schemas import UserStats
+from posts.models import Comment as PostComment
 from posts.models import Post
-from users.models import Bookmark, Hashtag, HashtagRelation, Reputation
+from users.config_constants import UserConfigKey
+from users.counters import rebuild_user_counters
+from users.models import (
+    Bookmark,
+    Hashtag,
+    HashtagRelation,
+    Reputation,
+    UserCounters,
+    UserSetting,
+)
+from users.notification_fanout import (
+    FanOutInterrupted,
+    fan_out_notification,
+    notify_recipients,
+)
+from users.notification_retention import sweep_notifications
 
 from ..models import Notification
 
@@ -208,6 +227,166 @@ class NotificationModelTest(TestCase):
         self.assertIsNone(notification.article)
 
 
+class NotificationRetentionTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+
+    def notify(self, age_days=0, is_read=False, expires_in_days=None):
+        notification = Notification.objects.create(
+            user=self.user,
+            category="users",
+            notification_type="article_commented",
+            message="Message",
+            is_read=is_read,
+            expires_at=(
+                None
+                if expires_in_days is None
+                else now() + timedelta(days=expires_in_days)
+            ),
+        )
+        # created_at is auto_now_add
+        Notification.objects.filter(pk=notification.pk).update(
+            created_at=now() - timedelta(days=age_days)
+        )
+        return notification
+
+    def test_sweep_removes_expired_and_old_read_rows(self):
+        kept = [
+            self.notify(age_days=400),
+            self.notify(age_days=10, is_read=True),
+            self.notify(expires_in_days=1),
+        ]
+        for _ in range(3):
+            self.notify(expires_in_days=-1)
+        self.notify(age_days=100, is_read=True)
+        self.notify(age_days=200, is_read=True, expires_in_days=-5)
+
+        self.assertEqual(sweep_notifications(dry_run=True)["expired"], 4)
+        report = sweep_notifications(batch_size=2)
+        self.assertEqual((report["expired"], report["read"]), (4, 1))
+        self.assertTrue(report["completed"])
+        self.assertEqual(
+            set(Notification.objects.values_list("id", flat=True)),
+            {notification.id for notification in kept},
+        )
+
+    def test_sweep_stops_at_time_budget(self):
+        self.notify(expires_in_days=-1)
+        report = sweep_notifications(time_budget=0)
+        self.assertEqual(report["expired"], 0)
+        self.assertFalse(report["completed"])
+        self.assertTrue(Notification.objects.exists())
+
+
+class NotificationFanOutTest(TestCase):
+    def setUp(self):
+        self.users = [
+            User.objects.create_user(
+                username=f"user{index}",
+                email=f"user{index}@example.com",
+                password="password123",
+            )
+            for index in range(6)
+        ]
+        self.community = Community.objects.create(
+            name="Test Community", description="Description", type="public"
+        )
+        self.community.admins.add(*self.users[:3])
+        self.community.moderators.add(*self.users[2:4])
+        self.community.members.add(*self.users)
+        self.template = {
+            "category": "communities",
+            "notification_type": "article_submitted",
+            "message": "New article submitted",
+            "community_id": self.community.id,
+            "link": "/community/Test Community/submissions",
+        }
+
+    def test_notifies_every_recipient_once(self):
+        recipients = {
+            "community_id": self.community.id,
+            "roles": ["admins", "moderators"],
+            "exclude_user_ids": [self.users[0].id],
+        }
+        # The id cursor, then one insert per chunk wrapped in a savepoint
+        with self.assertNumQueries(7):
+            report = fan_out_notification(self.template, recipients, chunk_size=2)
+
+        self.assertEqual(report, {"notified": 3, "emailed": 0})
+        self.assertEqual(
+            sorted(Notification.objects.values_list("user_id", flat=True)),
+            [user.id for user in self.users[1:4]],
+        )
+        self.assertFalse(
+            Notification.objects.exclude(
+                community=self.community, message="New article submitted"
+            ).exists()
+        )
+
+    def test_interrupted_fan_out_resumes_after_committed_chunks(self):
+        recipients = {"community_id": self.community.id, "roles": ["members"]}
+        with patch(
+            "users.notification_fanout.record_unread_changes",
+            side_effect=[None, ConnectionError],
+        ):
+            with self.assertRaises(FanOutInterrupted) as interrupted:
+                fan_out_notification(self.template, recipients, chunk_size=2)
+        self.assertEqual(interrupted.exception.after_id, self.users[1].id)
+        self.assertEqual(Notification.objects.count(), 2)
+
+        report = fan_out_notification(
+            self.template,
+            recipients,
+            chunk_size=2,
+            after_id=interrupted.exception.after_id,
+        )
+        self.assertEqual(report["notified"], len(self.users) - 2)
+        self.assertEqual(
+            sorted(Notification.objects.values_list("user_id", flat=True)),
+            [user.id for user in self.users],
+        )
+
+    def test_emails_only_users_who_enabled_them(self):
+        UserSetting.objects.create(
+            user=self.users[1],
+            config_name=UserConfigKey.ENABLE_EMAIL_NOTIFICATIONS.value,
+            value=True,
+        )
+        template = {**self.template, "email_subject": "New submission"}
+
+        with patch("myapp.services.send_emails.send_email_task.delay") as delay:
+            report = fan_out_notification(
+                template, {"community_id": self.community.id, "roles": ["admins"]}
+            )
+
+        self.assertEqual(report, {"notified": 3, "emailed": 1})
+        self.assertEqual(
+            delay.call_args.kwargs["recipient_list"], ["user1@example.com"]
+        )
+
+    def test_notify_recipients_validates_and_runs_after_commit(self):
+        with self.assertRaises(ValueError):
+            notify_recipients(self.template, {"community_id": self.community.id})
+        with self.assertRaises(ValueError):
+            notify_recipients({**self.template, "user": 1}, {"user_ids": [1]})
+
+        with patch(
+            "users.tasks.fan_out_notifications.delay", side_effect=ConnectionError
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                notify_recipients(
+                    {**self.template, "expires_at": now() + timedelta(days=1)},
+                    {"user_ids": [user.id for user in self.users[4:]]},
+                )
+                self.assertFalse(Notification.objects.exists())
+
+        self.assertEqual(
+            Notification.objects.filter(expires_at__isnull=False).count(), 2
+        )
+
+
 class HashtagModelTest(TestCase):
     def setUp(self):
         self.hashtag_data = {
@@ -265,7 +444,7 @@ class ReputationModelTest(TestCase):
         self.user = User.objects.create_user(
             username="testuser", email="testuser@example.com", password="password123"
         )
-        self.reputation = Reputation.objects.create(user=self.user)
+        self.reputation = Reputation.objects.get(user=self.user)
 
     def test_create_reputation(self):
         self.assertEqual(self.reputation.user, self.user)
@@ -298,6 +477,28 @@ class ReputationModelTest(TestCase):
         )
         self.assertEqual(self.reputation.level, "Contributor")
 
+    def test_award_is_atomic(self):
+        stale = Reputation.objects.get(user=self.user)
+        Reputation.award(self.user.id, "CREATE_COMMUNITY")
+        stale.add_reputation("SUBMIT_ARTICLE")
+        self.assertEqual(
+            stale.score, Reputation.CREATE_COMMUNITY + Reputation.SUBMIT_ARTICLE
+        )
+
+        Reputation.objects.filter(user=self.user).update(score=195)
+        Reputation.award(self.user.id, "REVIEW_ARTICLE")
+        self.reputation.refresh_from_db()
+        self.assertEqual(
+            (self.reputation.score, self.reputation.level), (200, "Expert")
+        )
+
+    def test_award_creates_missing_reputation(self):
+        self.reputation.delete()
+        Reputation.award(self.user.id, "SUBMIT_ARTICLE")
+        self.assertEqual(
+            Reputation.objects.get(user=self.user).score, Reputation.SUBMIT_ARTICLE
+        )
+
     def test_update_level(self):
         self.reputation.score = 200
         self.reputation.update_level()
@@ -327,8 +528,10 @@ class ReputationModelTest(TestCase):
         user3 = User.objects.create_user(
             username="testuser3", email="testuser3@example.com", password="password123"
         )
-        reputation2 = Reputation.objects.create(user=user2, score=300)
-        reputation3 = Reputation.objects.create(user=user3, score=150)
+        Reputation.objects.filter(user=user2).update(score=300)
+        Reputation.objects.filter(user=user3).update(score=150)
+        reputation2 = Reputation.objects.get(user=user2)
+        reputation3 = Reputation.objects.get(user=user3)
 
         top_users = Reputation.get_top_users(limit=2)
         self.assertEqual(len(top_users), 2)
@@ -342,7 +545,7 @@ class ReputationModelTest(TestCase):
             username="testuser2", email="testuser2@example.com", password="password123"
         )
         community.members.add(user2)
-        Reputation.objects.create(user=user2, score=300)
+        Reputation.objects.filter(user=user2).update(score=300)
 
         total_reputation = Reputation.calculate_community_reputation(community)
         self.assertEqual(total_reputation, 300)
@@ -386,3 +589,69 @@ class BookmarkModelTest(TestCase):
         Bookmark.objects.create(**self.bookmark_data)
         with self.assertRaises(IntegrityError):
             Bookmark.objects.create(**self.bookmark_data)
+
+
+class UserCountersTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", email="testuser@example.com", password="password123"
+        )
+        self.article = Article.objects.create(
+            title="Test Article",
+            abstract="This is a test abstract.",
+            authors=["Author One"],
+            submission_type="Public",
+            submitter=self.user,
+            faqs=[],
+        )
+        self.review = Review.objects.create(
+            article=self.article,
+            user=self.user,
+            rating=5,
+            subject="Great Article",
+            content="This is a great article.",
+        )
+        ReviewComment.objects.create(
+            review=self.review, author=self.user, content="Comment"
+        )
+        self.post = Post.objects.create(
+            author=self.user, title="Test Post", content="Content"
+        )
+        PostComment.objects.create(post=self.post, author=self.user, content="Reply")
+        self.community = Community.objects.create(name="Test Community")
+        self.community.members.add(self.user)
+
+    def get_stats(self):
+        stats = UserStats.from_model(self.user)
+        return (
+            stats.contributed_articles,
+            stats.contributed_posts,
+            stats.communities_joined,
+        )
+
+    def test_counters_follow_writes(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_stats(), (3, 2, 1))
+
+        self.review.delete()
+        self.post.delete()
+        self.community.members.remove(self.user)
+        # The review's comment and the post's reply went with them
+        self.assertEqual(self.get_stats(), (1, 0, 0))
+        self.assertEqual(rebuild_user_counters(), [])
+
+    def test_rebuild_repairs_drift(self):
+        UserCounters.objects.filter(user=self.user).update(articles=7)
+        other = User.objects.create_user(
+            username="other", email="other@example.com", password="password123"
+        )
+        UserCounters.objects.filter(user=other).delete()
+
+        self.assertEqual(
+            rebuild_user_counters(dry_run=True), sorted([self.user.id, other.id])
+        )
+        self.assertEqual(UserCounters.objects.get(user=self.user).articles, 7)
+
+        rebuild_user_counters()
+        self.assertEqual(self.get_stats(), (3, 2, 1))
+        self.assertTrue(UserCounters.objects.filter(user=other).exists())